@@ -0,0 +1,434 @@
+# app/api/server.py
+import asyncio
+import datetime
+import json
+import struct
+import threading
+import urllib.parse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
+
+from app.api import websocket as ws
+from app.core.data_bus import SAMPLES, DETECTIONS, ALERTS, READINGS
+
+TOPICS = (SAMPLES, DETECTIONS, ALERTS, READINGS)
+HISTORY_FIELDS = ("depth", "velocity", "flow_rate", "fr", "state")
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _parse_time(value, name):
+    """
+    接受 ISO 格式 (2025-01-01T08:00:00 / 2025-01-01 08:00 / 2025-01-01，可带时区如 +08:00 / Z)
+    或毫秒时间戳 (与返回的 time 列相同)，转为数据库中的文本格式 (本机本地时间)；
+    不带时区的 ISO 时间按本机本地时间解释
+    """
+    if value is None:
+        return None
+    try:
+        if value.lstrip("-").isdigit():
+            dt = datetime.datetime.fromtimestamp(int(value) / 1000.0)
+        else:
+            if value[-1:] in ("Z", "z"):  # Python 3.10 的 fromisoformat 不接受 "Z" 后缀
+                value = value[:-1] + "+00:00"
+            dt = datetime.datetime.fromisoformat(value)
+            if dt.tzinfo is not None:
+                dt = dt.astimezone().replace(tzinfo=None)
+        return dt.strftime("%Y-%m-%d %H:%M:%S")
+    except (ValueError, OverflowError, OSError):
+        raise HttpError(400, f"{name} 不是有效的时间: {value}") from None
+
+
+def _utc_offset_ms(local_ms):
+    """本地时间 (按 UTC 解释的毫秒数) 所在时刻的本机 UTC 偏移 (毫秒)"""
+    naive = datetime.datetime(1970, 1, 1) + datetime.timedelta(milliseconds=int(local_ms))
+    return int(naive.astimezone().utcoffset().total_seconds() * 1000)
+
+
+def _epoch_ms(times):
+    """
+    数据库中的本地时间 (datetime64) -> 毫秒时间戳，与实时推送的 ts (time.time()) 同一时钟
+    范围内 UTC 偏移不变时整体平移；跨夏令时切换时按小时分别取偏移
+    """
+    import numpy as np
+    ms = times.astype("datetime64[ms]").astype("int64")
+    if len(ms) == 0:
+        return ms
+    first, last = _utc_offset_ms(ms[0]), _utc_offset_ms(ms[-1])
+    if first == last:
+        return ms - first
+    hours, inverse = np.unique(ms // 3_600_000, return_inverse=True)
+    offsets = np.array([_utc_offset_ms(h * 3_600_000) for h in hours], dtype=np.int64)
+    return ms - offsets[inverse]
+
+
+def _state_codes(states):
+    """流态字符串列 -> (类别列表, uint8 编码)，只有少数几种取值"""
+    import numpy as np
+    categories = {}
+    codes = np.fromiter((categories.setdefault(s, len(categories)) for s in states),
+                        dtype=np.uint8, count=len(states))
+    return list(categories), codes
+
+
+def encode_history_json(data, fields):
+    """
+    列式 JSON：{"rows", "columns": {"time": [毫秒时间戳], 字段: [...]}}，流态为类别 + 编码
+    time 为 Unix 毫秒时间戳 (UTC)，与 /ws 推送的 ts 可直接比较
+    """
+    columns = {"time": _epoch_ms(data["time"]).tolist()}
+    for f in fields:
+        if f == "state":
+            categories, codes = _state_codes(data["state"])
+            columns["state"] = {"categories": categories, "codes": codes.tolist()}
+        else:
+            columns[f] = data[f].tolist()
+    return _dumps({"rows": len(data["time"]), "time_unit": "ms", "columns": columns}).encode()
+
+
+def encode_history_binary(data, fields):
+    """
+    二进制列格式：<u4 头长度> + JSON 头 + 补齐到 8 字节 + 各列小端原始数据
+    头中给出每列的 name / dtype / offset / nbytes (offset 相对数据区起点)，
+    time 为 <i8 Unix 毫秒时间戳 (UTC)，state 为 <u1 编码 (类别列表在头的 categories 中)
+    """
+    arrays = [("time", _epoch_ms(data["time"]).astype("<i8", copy=False))]
+    categories = {}
+    for f in fields:
+        if f == "state":
+            categories["state"], codes = _state_codes(data["state"])
+            arrays.append(("state", codes))
+        else:
+            arrays.append((f, data[f].astype("<f8", copy=False)))
+    columns, offset = [], 0
+    for name, arr in arrays:
+        columns.append({"name": name, "dtype": arr.dtype.str, "offset": offset, "nbytes": arr.nbytes})
+        offset += arr.nbytes
+    header = _dumps({"rows": len(data["time"]), "time_unit": "ms", "columns": columns,
+                     "categories": categories}).encode()
+    pad = -(4 + len(header)) % 8
+    return b"".join([struct.pack("<I", len(header)), header, b" " * pad] + [arr.tobytes() for _, arr in arrays])
+
+
+class _Client:
+    """
+    一个 WebSocket 客户端的发送队列
+    正常时逐批推送；积压超过 max_pending 批 (客户端或网络太慢) 时丢弃积压，
+    降级为每个站点的每个主题只保留最新一条，发送追上后自动恢复逐批推送
+    stations 为 None 时接收全部站点
+    """
+
+    def __init__(self, writer, topics, stations, max_pending):
+        self.writer = writer
+        self.topics = topics
+        self.stations = stations
+        self.max_pending = max_pending
+        self.pending = deque()
+        self.latest = {}
+        self.lagging = False
+        self.dropped = 0
+        self.wakeup = asyncio.Event()
+
+    def offer(self, station, topic, frame, latest_frame):
+        if topic not in self.topics or (self.stations is not None and station not in self.stations):
+            return
+        if not self.lagging and len(self.pending) < self.max_pending:
+            self.pending.append(frame)
+        else:
+            if not self.lagging:
+                self.lagging = True
+                self.dropped += len(self.pending)
+                self.pending.clear()
+            elif (station, topic) in self.latest:
+                self.dropped += 1
+            self.latest[station, topic] = latest_frame()
+        self.wakeup.set()
+
+    async def send_loop(self):
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            while self.pending or self.latest:
+                frame = self.pending.popleft() if self.pending else self.latest.popitem()[1]
+                self.writer.write(frame)
+                await self.writer.drain()  # 客户端读得慢时在这里等待，不影响其他客户端
+            self.lagging = False
+
+
+class ApiServer:
+    """
+    局域网 HTTP / WebSocket 接口 (asyncio，只依赖标准库)，运行在独立线程的事件循环中
+    - GET /api/status   运行状态
+    - GET /api/stations 站点列表
+    - GET /api/latest   某站点各主题的最新数据 (?station=)
+    - GET /api/history  某站点 monitor_logs 时间范围查询 (?station=&start=&end=&limit=&fields=&format=json|binary)，
+                        start / end 为 ISO 时间 (可带时区) 或毫秒时间戳，返回的 time 列为 Unix 毫秒时间戳
+    - GET /ws           WebSocket 实时推送 (?topics=samples,detections,alerts,readings&stations=a,b)
+    station 缺省为第一个站点；实时推送缺省推送全部站点，每批消息带 station 字段
+    实时数据按 batch_ms 从各站点的数据总线批量取出，每批只编码一次后分发给所有客户端；
+    采集线程只做总线发布，不感知客户端数量
+    stations: 站点编号 -> 带 station / db / bus 属性的对象 (采集服务的 StationRuntime)
+    """
+
+    def __init__(self, stations, status=None, host="127.0.0.1", port=8765, batch_ms=100,
+                 max_pending=32, history_limit=200000):
+        self.stations = stations
+        self.default_station = next(iter(stations))
+        self.status = status
+        self.host = host
+        self.port = port
+        self.batch_interval = batch_ms / 1000.0
+        self.max_pending = max_pending
+        self.history_limit = history_limit
+        self.clients = set()
+        self.routes = {"/": self._index, "/api/status": self._status, "/api/stations": self._stations,
+                       "/api/latest": self._latest, "/api/history": self._history}
+        # 数据库查询与大块编码放到线程池，事件循环只做网络收发
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="api-db")
+        self._connections = {}  # 进行中的连接处理任务 -> writer，关闭服务时据此断开
+        self._loop = None
+        self._stopping = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    # ---------- 生命周期 ----------
+    def start(self):
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._main()), name="api", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+
+    def stop(self, timeout=5.0):
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._executor.shutdown(wait=False)
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        try:
+            server = await asyncio.start_server(self._handle, self.host, self.port, backlog=512)
+        except OSError as e:
+            print(f"Warning: 接口服务启动失败 ({self.host}:{self.port}): {e}")
+            self._ready.set()
+            return
+        self.port = server.sockets[0].getsockname()[1]  # port=0 时取实际端口
+        broadcaster = asyncio.create_task(self._broadcast())
+        self._ready.set()
+        async with server:
+            await self._stopping.wait()
+            broadcaster.cancel()
+            server.close()  # 不再接受新连接
+            # Python 3.12 起退出 async with 时 wait_closed 会等待所有连接断开，须在此之前关闭：
+            # 关闭连接后等待各连接自行收尾 (WebSocket 读到 EOF 后退出)，超时仍未结束的直接取消并中断
+            for writer in list(self._connections.values()):
+                writer.close()
+            if self._connections:
+                await asyncio.wait(list(self._connections), timeout=2)
+            for task, writer in list(self._connections.items()):
+                task.cancel()
+                writer.transport.abort()
+
+    # ---------- 实时推送 ----------
+    async def _broadcast(self):
+        subs = [(sid, t, rt.bus.subscribe(t, mode="all", maxlen=65536))
+                for sid, rt in self.stations.items() for t in TOPICS]
+        layouts = {}
+        bus = self.stations[self.default_station].bus  # 各站点总线的主题类型相同
+        for t in TOPICS:
+            names = [f.name for f in bus.topic(t).msg_type.__dataclass_fields__.values()]
+            layouts[t] = (names, attrgetter(*names))
+        try:
+            while True:
+                await asyncio.sleep(self.batch_interval)
+                for station, topic, sub in subs:
+                    batch = sub.poll()
+                    if not batch or not self.clients:
+                        continue
+                    names, get = layouts[topic]
+                    frame = ws.encode_frame(_dumps({"station": station, "topic": topic, "fields": names,
+                                                    "items": [get(m) for m in batch]}))
+                    latest = []
+
+                    def latest_frame(station=station, topic=topic, names=names, get=get, last=batch[-1]):
+                        # 只有出现降级客户端时才编码，并且每批只编码一次
+                        if not latest:
+                            latest.append(ws.encode_frame(_dumps({"station": station, "topic": topic,
+                                                                  "fields": names, "items": [get(last)],
+                                                                  "mode": "latest"})))
+                        return latest[0]
+                    for client in list(self.clients):
+                        client.offer(station, topic, frame, latest_frame)
+        finally:
+            for _, _, sub in subs:
+                sub.close()
+
+    async def _websocket(self, reader, writer, headers, query):
+        topics = set(query.get("topics", ",".join(TOPICS)).split(","))
+        if not topics <= set(TOPICS):
+            raise HttpError(400, f"未知的主题: {', '.join(sorted(topics - set(TOPICS)))}")
+        stations = None
+        if "stations" in query:
+            stations = set(query["stations"].split(","))
+            if not stations <= self.stations.keys():
+                raise HttpError(400, f"未知的站点: {', '.join(sorted(stations - self.stations.keys()))}")
+        writer.write(ws.handshake_response(headers))
+        await writer.drain()
+
+        client = _Client(writer, topics, stations, self.max_pending)
+        self.clients.add(client)
+        sender = asyncio.create_task(client.send_loop())
+        try:
+            while not sender.done():
+                op, data = await ws.read_message(reader)
+                if op == ws.OP_CLOSE:
+                    break
+                if op == ws.OP_PING:
+                    client.pending.appendleft(ws.encode_frame(data, ws.OP_PONG))
+                    client.wakeup.set()
+                elif op == ws.OP_TEXT:
+                    # 客户端可发送 {"topics": [...], "stations": [...]} 修改订阅
+                    msg = json.loads(data)
+                    if isinstance(msg, dict) and "topics" in msg:
+                        client.topics = set(msg["topics"]) & set(TOPICS)
+                    if isinstance(msg, dict) and "stations" in msg:
+                        client.stations = None if msg["stations"] is None else set(msg["stations"])
+        except (asyncio.IncompleteReadError, ConnectionError, ws.ProtocolError, ValueError):
+            pass
+        finally:
+            self.clients.discard(client)
+            sender.cancel()
+            await ws.close(writer)
+
+    # ---------- HTTP ----------
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            await self._serve(reader, writer)
+        finally:
+            self._connections.pop(task, None)
+
+    async def _serve(self, reader, writer):
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 10)
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, _ = lines[0].split(" ", 2)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError,
+                ConnectionError, ValueError):
+            writer.close()
+            return
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                k, v = line.split(":", 1)
+                headers[k.strip().lower()] = v.strip()
+        url = urllib.parse.urlsplit(target)
+        query = dict(urllib.parse.parse_qsl(url.query))
+
+        try:
+            if method != "GET":
+                raise HttpError(405, f"不支持的方法: {method}")
+            if url.path == "/ws":
+                if not ws.is_upgrade(headers):
+                    raise HttpError(400, "需要 WebSocket 升级请求")
+                await self._websocket(reader, writer, headers, query)
+                return
+            route = self.routes.get(url.path)
+            if route is None:
+                raise HttpError(404, f"未知的路径: {url.path}")
+            status, ctype, body = 200, *await route(query)
+        except HttpError as e:
+            status, ctype, body = e.status, "application/json", _dumps({"error": e.message}).encode()
+        except ws.ProtocolError as e:
+            status, ctype, body = 400, "application/json", _dumps({"error": str(e)}).encode()
+        except Exception as e:
+            status, ctype, body = 500, "application/json", _dumps({"error": str(e)}).encode()
+
+        try:
+            writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                         f"Content-Type: {ctype}\r\n"
+                         f"Content-Length: {len(body)}\r\n"
+                         "Access-Control-Allow-Origin: *\r\n"
+                         "Connection: close\r\n\r\n".encode() + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def _index(self, query):
+        return "application/json", _dumps({"endpoints": sorted(self.routes) + ["/ws"],
+                                           "topics": list(TOPICS)}).encode()
+
+    def _station(self, query):
+        sid = query.get("station", self.default_station)
+        rt = self.stations.get(sid)
+        if rt is None:
+            raise HttpError(404, f"未知的站点: {sid}")
+        return sid, rt
+
+    async def _status(self, query):
+        sid, rt = self._station(query)
+        st = dict(self.status()) if self.status is not None else {}
+        st.update(clients=len(self.clients), lagging=sum(c.lagging for c in self.clients),
+                  station=sid, bus=rt.bus.stats())
+        return "application/json", _dumps(st).encode()
+
+    async def _stations(self, query):
+        out = [{"id": sid, "name": rt.station.name, "camera": rt.station.has_camera}
+               for sid, rt in self.stations.items()]
+        return "application/json", _dumps(out).encode()
+
+    async def _latest(self, query):
+        sid, rt = self._station(query)
+        out = {"station": sid}
+        for t in TOPICS:
+            msgs = rt.bus.topic(t).last(20 if t in (ALERTS, READINGS) else 1)
+            out[t] = [{k: getattr(m, k) for k in m.__dataclass_fields__} for m in msgs]
+        return "application/json", _dumps(out).encode()
+
+    async def _history(self, query):
+        _, rt = self._station(query)
+        start = _parse_time(query.get("start"), "start")
+        end = _parse_time(query.get("end"), "end")
+        try:
+            limit = min(int(query.get("limit", self.history_limit)), self.history_limit)
+        except ValueError:
+            raise HttpError(400, "limit 必须是整数") from None
+        if limit < 0:
+            raise HttpError(400, "limit 不能为负数")
+        fields = query.get("fields", ",".join(HISTORY_FIELDS)).split(",")
+        unknown = set(fields) - set(HISTORY_FIELDS)
+        if unknown:
+            raise HttpError(400, f"未知的字段: {', '.join(sorted(unknown))}")
+        fmt = query.get("format", "json")
+        if fmt not in ("json", "binary"):
+            raise HttpError(400, "format 只能是 json 或 binary")
+
+        def run():
+            data = rt.db.get_history_range(start, end, limit)
+            if fmt == "binary":
+                return "application/octet-stream", encode_history_binary(data, fields)
+            return "application/json", encode_history_json(data, fields)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, run)
+
+
+def create_api_server(service):
+    """按 AppConfig 为采集服务创建接口服务 (尚未启动)"""
+    from app.config import AppConfig
+    return ApiServer(service.stations, status=service.status, host=AppConfig.API_HOST, port=AppConfig.API_PORT,
+                     batch_ms=AppConfig.API_BATCH_MS, max_pending=AppConfig.API_CLIENT_QUEUE,
+                     history_limit=AppConfig.API_HISTORY_LIMIT)
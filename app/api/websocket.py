@@ -0,0 +1,102 @@
+# app/api/websocket.py
+"""
+最小的 WebSocket (RFC 6455) 服务端实现，只依赖标准库
+- 握手、帧编码 / 解码 (文本、二进制、ping/pong、close，支持分片)
+- 服务端发出的帧不加掩码，编码一次即可原样写给所有客户端
+"""
+import asyncio
+import base64
+import hashlib
+
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONT = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def is_upgrade(headers):
+    return ("websocket" in headers.get("upgrade", "").lower()
+            and "upgrade" in headers.get("connection", "").lower()
+            and "sec-websocket-key" in headers)
+
+
+def handshake_response(headers):
+    """根据请求头生成 101 响应 (版本不支持时抛出 ProtocolError)"""
+    if headers.get("sec-websocket-version") != "13":
+        raise ProtocolError("仅支持 WebSocket 版本 13")
+    key = headers["sec-websocket-key"].strip()
+    accept = base64.b64encode(hashlib.sha1((key + GUID).encode()).digest()).decode()
+    return ("HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode()
+
+
+def encode_frame(payload, opcode=OP_TEXT):
+    """编码一个完整 (FIN) 的服务端帧"""
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    n = len(payload)
+    if n < 126:
+        header = bytes((0x80 | opcode, n))
+    elif n < 1 << 16:
+        header = bytes((0x80 | opcode, 126)) + n.to_bytes(2, "big")
+    else:
+        header = bytes((0x80 | opcode, 127)) + n.to_bytes(8, "big")
+    return header + payload
+
+
+def _unmask(data, mask):
+    # 整块按大整数异或，比逐字节循环快两个数量级
+    n = len(data)
+    key = int.from_bytes((mask * (n // 4 + 1))[:n], "little")
+    return (int.from_bytes(data, "little") ^ key).to_bytes(n, "little")
+
+
+async def read_message(reader, max_size=1 << 20):
+    """
+    读取一条完整消息 (合并分片)，返回 (opcode, payload)
+    控制帧 (ping/pong/close) 可夹在分片之间，遇到时立即返回
+    """
+    opcode, chunks, size = None, [], 0
+    while True:
+        b1, b2 = await reader.readexactly(2)
+        fin, op = b1 & 0x80, b1 & 0x0F
+        if not b2 & 0x80:
+            raise ProtocolError("客户端帧必须加掩码")
+        n = b2 & 0x7F
+        if n == 126:
+            n = int.from_bytes(await reader.readexactly(2), "big")
+        elif n == 127:
+            n = int.from_bytes(await reader.readexactly(8), "big")
+        size += n
+        if size > max_size:
+            raise ProtocolError("消息过大")
+        mask = await reader.readexactly(4)
+        data = _unmask(await reader.readexactly(n), mask) if n else b""
+        if op >= OP_CLOSE:
+            return op, data
+        if op != OP_CONT:
+            opcode = op
+        elif opcode is None:
+            raise ProtocolError("意外的续帧")
+        chunks.append(data)
+        if fin:
+            return opcode, b"".join(chunks)
+
+
+async def close(writer, code=1000):
+    try:
+        writer.write(encode_frame(code.to_bytes(2, "big"), OP_CLOSE))
+        await asyncio.wait_for(writer.drain(), 1.0)
+    except (ConnectionError, asyncio.TimeoutError):
+        pass
+    writer.close()
@@ -14,4 +14,129 @@ class AppConfig:
     WINDOW_TITLE = "明渠非均匀流流量监测系统"
     WINDOW_WIDTH = 1600
     WINDOW_HEIGHT = 900
-    USE_MOCK_CAMERA = False # 如果没有摄像头改为 True
\ No newline at end of file
+    USE_MOCK_CAMERA = False # 如果没有摄像头改为 True
+
+    # --- 采集帧率 ---
+    TARGET_FPS = 30              # 目标帧率
+    HIDDEN_FPS = 5               # 看板不可见时的帧率
+    STANDBY_FPS = 10             # 传感器关闭时的循环频率
+    CPU_SATURATION = 90          # 主机 CPU 占用 (%) 超过此值时降频
+    CPU_SATURATED_FPS = 10
+
+    # --- 采集源 ---
+    CAMERA_SOURCE = 0            # 摄像头序号 / 视频文件路径 / 图片文件夹路径
+    REPLAY_LOOP = False          # 回放源播放完毕后循环
+    REPLAY_MAX_SPEED = False     # 回放源不按时间戳等待，尽可能快地处理
+
+    # --- AI 识别后端 ---
+    AI_BACKEND = "hsv"           # "hsv" (颜色阈值) 或 "yolo" (深度模型)
+    YOLO_WEIGHTS = "yolov8n.pt"  # 需替换为浮萍专用权重 (COCO 预训练权重没有浮萍类别，加载时会失败并继续使用 HSV)
+    YOLO_IMGSZ = 320             # 固定输入尺寸，CPU 上 320 可稳定 >10 FPS
+    YOLO_THREADS = 4             # torch 计算线程数
+    YOLO_EXPORT = None           # None / "onnx" / "torchscript"
+    YOLO_CONF = 0.35
+    YOLO_CLASSES = ["duckweed"]  # 只保留这些类别名 (不区分大小写)，None 表示权重中的全部类别
+
+    # --- 高分辨率分块并行检测 (HSV 后端) ---
+    TILE_MIN_PIXELS = 1280 * 720 # 超过此像素数的画面才分块
+    TILE_SIZE = 512
+    TILE_OVERLAP = 32            # 相邻分块重叠像素 (需大于形态学运算半径)
+    TILE_WORKERS = None          # 线程数，None 表示 CPU 核数
+
+    # --- 漂浮物跟踪 ---
+    DETECT_EVERY_K = 3           # 每 k 帧做一次完整检测，其余帧外推轨迹
+    TRACK_LINE_X = 0.5           # 虚拟计数线位置 (画面宽度比例)
+    TRACK_PX_PER_METER = None    # 水面像素/米标定，None 时漂移速度以 px/s 显示
+
+    # --- 运动门控 ---
+    MOTION_GATE_ENABLED = True   # 画面无变化时跳过检测，复用上次结果
+    MOTION_SENSITIVITY = 0.5     # 0~1，越大越敏感 (每个摄像头可单独设置)
+
+    # --- 报警录像 ---
+    CLIP_RECORDER_ENABLED = True
+    CLIP_DIR = "clips"
+    CLIP_PRE_SECONDS = 5.0       # 预录时长 (报警前)
+    CLIP_POST_SECONDS = 5.0      # 后录时长 (报警后)
+    CLIP_MAX_BUFFER_MB = 64      # 预录环形缓冲的内存上限
+    CLIP_JPEG_QUALITY = 80       # 缓冲帧 JPEG 压缩质量，None 表示缓存原始帧
+
+    # --- 图像测速 (水面流速) ---
+    VELOCIMETRY_ENABLED = True        # 需先标定 (IMAGE_PTS/WORLD_PTS 或 PX_PER_METER)，未标定时不计算
+    VELOCIMETRY_ROI = None            # (x, y, w, h)，建议只框选水面区域
+    VELOCIMETRY_SCALE = 0.5           # 光流计算前的降采样比例
+    VELOCIMETRY_IMAGE_PTS = None      # 地平面标定：图像上 4 个参考点 (像素)
+    VELOCIMETRY_WORLD_PTS = None      # 地平面标定：对应的水面坐标 (米)
+    VELOCIMETRY_PX_PER_METER = None   # 无单应标定时的简易比例尺
+    VELOCITY_MIN_CONFIDENCE = 0.5     # 置信度低于此值时不采用实测流速
+
+    # --- 水尺水位识别 ---
+    STAGE_ROI = None                  # 水尺所在竖条 (x, y, w, h)，None 表示不启用
+    STAGE_ROWS = (0, 400)             # ROI 内两条标定刻度所在的行
+    STAGE_LEVELS = (5.0, 0.0)         # 对应的水深读数 (m)
+    STAGE_MEDIAN_WINDOW = 15          # 时间中值滤波窗口 (帧)
+    STAGE_MIN_CONFIDENCE = 0.4
+
+    # --- 看板系统日志 ---
+    EVENT_LOG_CAPACITY = 500          # 日志最多保留的条数 (环形缓冲)
+    EVENT_LOG_FLUSH_MS = 250          # 批量刷新视图的间隔
+    EVENT_LOG_SPILL = False           # 被淘汰的日志转存到 alerts 表
+
+    # --- 界面渲染 (与 150 ms 数据节拍解耦，只重绘可见控件) ---
+    RENDER_FPS_2D = 20                # 2D 断面图最高刷新率
+    RENDER_FPS_3D = 4                 # 3D 模型重绘较重，单独限速
+    RENDER_FPS_METRICS = 10           # 指标卡片与状态栏文字
+
+    # --- 工况模拟 ---
+    SIM_ANALYSIS_FPS = 8              # 拖动滑块时分析与比能曲线的最高刷新率
+
+    # --- 性能埋点 (分段耗时统计) ---
+    PERF_ENABLED = False              # 启动时开启统计 (运行时可在看板按 F12 切换并显示浮层)
+    PERF_SNAPSHOT_PATH = None         # 周期性追加 JSON 快照的文件 (JSON Lines)，None 表示不导出
+    PERF_SNAPSHOT_INTERVAL = 10.0     # 快照间隔 (秒)
+
+    # --- 数据总线 (各主题保留的历史条数) ---
+    BUS_SAMPLE_HISTORY = 24000        # 看板 150 ms 节拍约 1 小时
+    BUS_DETECTION_HISTORY = 9000      # 30 FPS 约 5 分钟
+    BUS_ALERT_HISTORY = 500
+    BUS_READING_HISTORY = 20000       # 传感器读数
+    BUS_RECENT = 500                  # 每个主题保留的消息对象条数 (更长的历史只保留数值列)
+
+    # --- 数据节拍 / 采集服务 ---
+    MONITOR_INTERVAL = 0.15           # 水力计算与入库的节拍 (秒)
+    HEADLESS_STATUS_INTERVAL = 10.0   # 无头模式下打印运行状态的间隔 (秒)
+    DB_FLUSH_INTERVAL = 1.0           # 监测记录攒批入库的间隔 (秒)
+    DB_MAX_PENDING = 100000           # 写库失败时最多积压的记录行数 (超出丢弃最旧的)
+    PIPELINE_MAX_ERRORS = 100         # 采集流水线连续出错的帧数达到此值时停止并标记失败
+
+    # --- 多站点 ---
+    # 每个站点: id, name, camera (采集源；缺省按 CAMERA_SOURCE，False 表示没有摄像头，只接传感器)，
+    # 以及可选的渠道参数 bottom_width / side_slope / bed_slope / roughness / surface_coef、db_path
+    # 为空时只有一个默认站点 (数据库为 canal_data.db)；传感器配置用 "station" 指定所属站点
+    STATIONS = []
+    STATION_DB_DIR = "stations"       # 其他站点的分片数据库目录 (每站一个 SQLite 文件)
+
+    # --- HTTP / WebSocket 接口 ---
+    API_ENABLED = False               # 采集服务启动时同时开启局域网接口 (无头模式可用 --api 开启)
+    API_HOST = "127.0.0.1"            # 对局域网开放时改为 "0.0.0.0"
+    API_PORT = 8765
+    API_BATCH_MS = 100                # 实时数据合批推送的间隔 (毫秒)
+    API_CLIENT_QUEUE = 32             # 每个客户端最多积压的批数，超过后降级为只推最新值
+    API_HISTORY_LIMIT = 200000        # 单次历史查询最多返回的记录数
+
+    # --- 传感器接入 ---
+    SENSORS_ENABLED = False           # 采集服务启动时同时接入传感器 (无头模式可用 --sensors 开启)
+    SENSOR_SIMULATE = True            # 在本机按下方地址启动模拟设备 (无真实传感器时调试用)
+    SENSOR_BATCH_MS = 200             # 读数合批交给水力计算与入库的间隔 (毫秒)
+    SENSOR_TTL = 5.0                  # 超过此时长 (秒) 没有新读数时不再采用该物理量
+    SENSOR_BACKOFF = (0.5, 30.0)      # 断线重连的等待时间范围 (秒)，每次失败加倍
+    SENSOR_TIMEOUT = 3.0              # 连接 / 请求超时 (秒)
+    # type: serial (按行 ASCII，url 为串口设备或 tcp://主机:端口 的串口服务器)
+    #       modbus (Modbus-TCP 读保持寄存器，registers: 物理量 -> (地址, 比例))
+    #       udp    (监听端口，每个报文一行或多行 ASCII)
+    # fields: 报文中的键 -> 物理量 (缺省键名即物理量名)；station: 所属站点 (缺省为第一个站点)
+    SENSORS = [
+        {"type": "serial", "name": "level-1", "url": "tcp://127.0.0.1:7001", "fields": {"H": "depth"}},
+        {"type": "modbus", "name": "flowmeter-1", "host": "127.0.0.1", "port": 5020, "unit": 1,
+         "registers": {"depth": (0, 0.001), "velocity": (1, 0.001)}, "interval": 1.0},
+        {"type": "udp", "name": "radar-1", "port": 7002, "fields": {"V": "velocity"}},
+    ]
@@ -1,56 +1,116 @@
 # app/core/ai_engine.py
 import cv2
-import numpy as np
 import datetime
+import time
+
+from app.config import AppConfig
+from app.core.detectors import create_detector
+from app.core.tracker import DebrisTracker
+from app.core.motion_gate import MotionGate
 
 class AIEngine:
-    def __init__(self):
-        # 定义绿色的 HSV 范围 (根据光线可能需要微调)
-        # H: 色相 (35-85 覆盖了大部分植物绿)
-        # S: 饱和度 (43-255)
-        # V: 亮度 (46-255)
-        self.lower_green = np.array([35, 43, 46])
-        self.upper_green = np.array([85, 255, 255])
-
-    def detect(self, frame):
+    def __init__(self, backend=None, motion_sensitivity=None, on_event=None):
+        # 检测后端 (hsv / yolo)，可在运行时切换
+        # 先以 HSV 运行，配置的后端与运行时切换一样在采集线程首帧加载，加载失败时继续使用 HSV
+        self.backend_name = "hsv"
+        self.detector = create_detector(self.backend_name)
+        self._requested = backend or AppConfig.AI_BACKEND
+        # on_event(level, message)：后端切换结果 (采集线程中调用)
+        self.on_event = on_event
+
+        # 多目标跟踪：每 k 帧做一次完整检测，其余帧外推轨迹
+        self.detect_every = max(1, int(AppConfig.DETECT_EVERY_K))
+        # 外推不超过一个检测间隔，检测被跳过 (过载) 时轨迹停在原处而不是一直漂移
+        self.tracker = DebrisTracker(px_per_meter=AppConfig.TRACK_PX_PER_METER,
+                                     max_horizon=self.detect_every / AppConfig.TARGET_FPS)
+        self._frame_idx = 0
+
+        # 运动门控：静止画面 (夜间、平静水面) 跳过检测，CPU 随场景活跃度变化
+        self.motion_gate = None
+        if AppConfig.MOTION_GATE_ENABLED:
+            sens = AppConfig.MOTION_SENSITIVITY if motion_sensitivity is None else motion_sensitivity
+            self.motion_gate = MotionGate(sensitivity=sens)
+
+    def set_backend(self, name):
+        """请求切换后端 (GUI 线程调用，实际切换发生在采集线程下一帧)"""
+        self._requested = name
+
+    @property
+    def requested_backend(self):
+        """当前请求的后端；加载失败后恢复为正在使用的后端 (界面据此同步选择框)"""
+        return self._requested
+
+    def _report(self, level, message):
+        if self.on_event is not None:
+            self.on_event(level, message)
+
+    def _apply_backend(self):
+        name = self._requested
+        if name == self.backend_name:
+            return
+        try:
+            detector = create_detector(name)
+            detector.load()
+        except Exception as e:
+            # 缺少 torch/ultralytics、权重文件或所需类别时继续使用当前后端
+            # 加载期间界面可能又选了别的后端，只在请求未变时撤销
+            if self._requested == name:
+                self._requested = self.backend_name
+            self._report("ERROR", f"检测后端 {name.upper()} 加载失败，继续使用 "
+                                  f"{self.backend_name.upper()}: {type(e).__name__}: {e}")
+            return
+        old, self.detector = self.detector, detector
+        old.close()
+        self.backend_name = name
+        self._report("INFO", f"识别后端已切换为 {name.upper()}")
+
+    def close(self):
+        self.detector.close()
+
+    def detect(self, frame, ts=None, skip_detection=False):
         """
-        检测绿色浮萍，并绘制 HUD 界面
+        检测浮萍，并绘制 HUD 界面
+        ts: 帧时间戳 (秒)，回放时使用帧时间，保证漂移速度与回放倍速无关
+        skip_detection: 过载时为 True，本帧只外推轨迹
         返回: (处理后的图像, 识别到的物体数量, 警报信息)
         """
-        # 1. 转换颜色空间 BGR -> HSV
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        
-        # 2. 创建绿色掩膜 (Mask)
-        mask = cv2.inRange(hsv, self.lower_green, self.upper_green)
-        
-        # 3. 腐蚀与膨胀 (去除噪点)
-        mask = cv2.erode(mask, None, iterations=2)
-        mask = cv2.dilate(mask, None, iterations=2)
-        
-        # 4. 寻找轮廓
-        contours, _ = cv2.findContours(mask.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        detected_count = 0
+        if self._requested != self.backend_name:
+            self._apply_backend()
+
+        if ts is None:
+            ts = time.monotonic()
+        if self.tracker.line_x is None:
+            self.tracker.line_x = frame.shape[1] * AppConfig.TRACK_LINE_X
+
+        # 5. 检测 / 跟踪 (跳帧期间只外推；画面静止时轨迹保持不动，沿用上次结果)
+        new_tracks = []
+        if not skip_detection and self._frame_idx % self.detect_every == 0:
+            if self.motion_gate is None or self.motion_gate.check(frame):
+                boxes = self.detector.detect(frame)
+                new_tracks = self.tracker.update(boxes, ts)
+        else:
+            self.tracker.predict(ts)
+        self._frame_idx += 1
+
+        tracks = self.tracker.active_tracks()
+        detected_count = len(tracks)
         alert_msg = None
-        
-        # 5. 绘制结果
-        for c in contours:
-            # 过滤掉太小的噪点 (面积 < 500 忽略)
-            area = cv2.contourArea(c)
-            if area < 500:
-                continue
-            
-            detected_count += 1
-            
-            # 获取边界框
-            (x, y, w, h) = cv2.boundingRect(c)
-            # 画框 (绿色)
-            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-            # 标文字
-            cv2.putText(frame, f"Duckweed: {int(area)}px", (x, y - 10),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
-
-        # 6. 绘制 HUD (工业风格覆盖层)
+
+        # 6. 绘制结果
+        for t in tracks:
+            x, y, w, h = (int(v) for v in t.box)
+            # 画框 (绿色)，已过线的目标用青色
+            color = (255, 255, 0) if t.crossed else (0, 255, 0)
+            cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+            # 标文字：持久 ID + 类别
+            cv2.putText(frame, f"#{t.id} {t.label}", (x, y - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+
+        # 虚拟计数线
+        lx = int(self.tracker.line_x)
+        cv2.line(frame, (lx, 0), (lx, frame.shape[0]), (255, 255, 0), 1)
+
+        # 7. 绘制 HUD (工业风格覆盖层)
         h, w, _ = frame.shape
         cy = h // 2
         cx = w // 2
@@ -81,7 +141,18 @@ class AIEngine:
         cv2.putText(frame, f"REC {timestamp}", (30, h - 40), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
         
-        if detected_count > 0:
-            alert_msg = f"检测到 {detected_count} 处浮萍堆积"
+        # 跟踪统计
+        unit = "m/s" if self.tracker.px_per_meter else "px/s"
+        cv2.putText(frame, f"UNIQUE {self.tracker.unique_count}  CROSSED {self.tracker.crossed_count}  "
+                           f"DRIFT {self.tracker.drift_speed():.2f}{unit}",
+                    (30, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+        if self.motion_gate is not None:
+            cv2.putText(frame, f"GATE SKIP {self.motion_gate.skip_ratio * 100:.0f}%",
+                        (30, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+
+        # 只有出现新的唯一目标时才报警，同一块浮萍漂移不会重复计数
+        if new_tracks:
+            ids = ",".join(str(t.id) for t in new_tracks)
+            alert_msg = f"检测到 {len(new_tracks)} 处浮萍堆积 (ID {ids}，累计 {self.tracker.unique_count})"
 
         return frame, detected_count, alert_msg
\ No newline at end of file
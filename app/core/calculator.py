@@ -2,22 +2,43 @@
 import math
 
 class HydraulicCalculator:
-    """水力学核心计算引擎"""
+    """
+    水力学核心计算引擎
+    几何参数为类属性；各站点的渠道参数不同时用 for_channel() 得到覆盖了参数的子类
+    """
     
     # 渠道几何参数
     BOTTOM_WIDTH = 3.0  # 底宽 b (m)
     SIDE_SLOPE = 1.0    # 边坡系数 m (1:m)
     BED_SLOPE = 0.0002  # 底坡 i
     ROUGHNESS = 0.014   # 糙率 n
+    SURFACE_COEF = 0.85 # 流速系数 (断面平均流速 / 水面流速)
 
-    @staticmethod
-    def calc_geometry(depth):
+    _channels = {}
+
+    @classmethod
+    def for_channel(cls, bottom_width=None, side_slope=None, bed_slope=None, roughness=None,
+                    surface_coef=None):
+        """返回使用指定渠道参数的计算器 (子类，参数相同的站点共用同一个)"""
+        params = {"BOTTOM_WIDTH": bottom_width, "SIDE_SLOPE": side_slope, "BED_SLOPE": bed_slope,
+                  "ROUGHNESS": roughness, "SURFACE_COEF": surface_coef}
+        params = {k: v for k, v in params.items() if v is not None and v != getattr(cls, k)}
+        if not params:
+            return cls
+        key = (cls, tuple(sorted(params.items())))
+        calc = cls._channels.get(key)
+        if calc is None:
+            calc = cls._channels[key] = type(f"{cls.__name__}_{len(cls._channels)}", (cls,), params)
+        return calc
+
+    @classmethod
+    def calc_geometry(cls, depth):
         """计算断面几何参数 (关键修复：确保此方法存在)"""
         # 防止深度为负数导致错误
-        if depth <= 0: return 0.0, HydraulicCalculator.BOTTOM_WIDTH, 0.0
+        if depth <= 0: return 0.0, cls.BOTTOM_WIDTH, 0.0
         
-        b = HydraulicCalculator.BOTTOM_WIDTH
-        m = HydraulicCalculator.SIDE_SLOPE
+        b = cls.BOTTOM_WIDTH
+        m = cls.SIDE_SLOPE
         
         # 水面宽 B = b + 2mh
         top_width = b + 2 * m * depth
@@ -33,6 +54,11 @@ class HydraulicCalculator:
         
         return area, top_width, hydraulic_radius
 
+    @classmethod
+    def calc_mean_velocity(cls, surface_velocity):
+        """由图像测得的水面流速估算断面平均流速"""
+        return max(0.0, surface_velocity) * cls.SURFACE_COEF
+
     @staticmethod
     def calc_flow_rate(area, velocity):
         return area * velocity
@@ -51,12 +77,12 @@ class HydraulicCalculator:
         elif fr > 1.05: return "急流 (Supercritical)"
         else: return "临界流 (Critical)"
 
-    @staticmethod
-    def determine_flow_uniformity(depth, velocity):
+    @classmethod
+    def determine_flow_uniformity(cls, depth, velocity):
         """判别均匀流"""
-        area, top_width, r = HydraulicCalculator.calc_geometry(depth)
-        n = HydraulicCalculator.ROUGHNESS
-        i = HydraulicCalculator.BED_SLOPE
+        area, top_width, r = cls.calc_geometry(depth)
+        n = cls.ROUGHNESS
+        i = cls.BED_SLOPE
         
         if r <= 0: return "非均匀流 (Non-uniform)"
         
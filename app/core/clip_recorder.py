@@ -0,0 +1,199 @@
+# app/core/clip_recorder.py
+import datetime
+import os
+import queue
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+class ClipRecorder:
+    """
+    报警录像：内存中保留最近 N 秒画面 (可选 JPEG 压缩)，报警时把预录 + 后录写入磁盘
+    - 采集线程只做一次 push (帧拷贝 + 入队)，压缩与写盘全部在后台线程完成
+    - 内存严格有界：环形缓冲按字节数上限淘汰；收集中的片段合计也不超过 max_bytes
+      (超出时提前结束后录)；入队、待写队列满时直接丢弃
+    - stop() 不会阻塞在满队列上：收集中的片段照常写盘后才退出
+    - on_trigger(info) -> tag 在后台线程执行 (如写 alerts 表)，
+      on_saved(tag, path) 在视频写完后回调 (如把录像路径关联到报警记录)
+    """
+
+    def __init__(self, out_dir="clips", pre_seconds=5.0, post_seconds=5.0,
+                 max_bytes=64 * 1024 * 1024, jpeg_quality=80,
+                 on_trigger=None, on_saved=None, queue_size=8, max_pending_clips=2):
+        self.out_dir = out_dir
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.max_bytes = max_bytes
+        self.jpeg_quality = jpeg_quality
+        self.on_trigger = on_trigger
+        self.on_saved = on_saved
+
+        self._ring = deque()          # [(ts, payload, nbytes)]
+        self._ring_bytes = 0
+        self._active = []             # 正在收集后录的片段
+        self._active_bytes = 0
+        self._inbox = queue.Queue(maxsize=queue_size)
+        self._triggers = deque()
+        self._writes = queue.Queue(maxsize=max_pending_clips)
+        self.max_pending_clips = max_pending_clips
+        self.dropped_frames = 0
+        self.dropped_clips = 0
+
+        self._stop = threading.Event()
+        self._worker = threading.Thread(target=self._buffer_loop, daemon=True)
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._worker.start()
+        self._writer.start()
+
+    # ---------- 采集线程调用 (不阻塞) ----------
+    def push(self, frame, ts):
+        if self._stop.is_set():
+            return
+        try:
+            self._inbox.put_nowait((ts, frame.copy()))
+        except queue.Full:
+            self.dropped_frames += 1
+
+    def trigger(self, info=None):
+        """请求保存一段录像 (info 原样传给 on_trigger)"""
+        self._triggers.append(info)
+
+    def stop(self):
+        self._stop.set()
+        # 丢弃尚未处理的帧后放入结束标记 (后台线程也会按超时检查停止标志)
+        while True:
+            try:
+                self._inbox.get_nowait()
+            except queue.Empty:
+                break
+        try:
+            self._inbox.put_nowait((None, None))
+        except queue.Full:
+            pass
+        self._worker.join(timeout=5)
+        self._writer.join(timeout=10)
+
+    @property
+    def buffered_bytes(self):
+        return self._ring_bytes
+
+    # ---------- 后台：压缩 + 环形缓冲 ----------
+    def _encode(self, frame):
+        if self.jpeg_quality is None:
+            return frame, frame.nbytes
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, int(self.jpeg_quality)])
+        return buf, buf.nbytes
+
+    def _buffer_loop(self):
+        while not self._stop.is_set():
+            try:
+                ts, frame = self._inbox.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if frame is None:
+                break
+            self._process(ts, frame)
+        # 停止时收集中的片段按已有内容写盘，再通知写盘线程退出 (写盘线程仍在消费，put 不会一直阻塞)
+        for clip in self._active:
+            self._writes.put(clip)
+        self._active = []
+        self._active_bytes = 0
+        self._writes.put(None)
+
+    def _process(self, ts, frame):
+        payload, nbytes = self._encode(frame)
+
+        # 1. 入环形缓冲，按时长与字节上限淘汰
+        self._ring.append((ts, payload, nbytes))
+        self._ring_bytes += nbytes
+        while self._ring and (self._ring_bytes > self.max_bytes
+                              or ts - self._ring[0][0] > self.pre_seconds):
+            self._ring_bytes -= self._ring.popleft()[2]
+
+        # 2. 新的报警：以当前缓冲内容作为预录
+        while self._triggers:
+            info = self._triggers.popleft()
+            tag = self.on_trigger(info) if self.on_trigger else info
+            if len(self._active) >= self.max_pending_clips:
+                # 报警照常记录，但同时收集的片段数有上限
+                self.dropped_clips += 1
+                continue
+            self._active.append({"tag": tag, "end": ts + self.post_seconds, "bytes": self._ring_bytes,
+                                 "frames": [(t, p) for t, p, _ in self._ring]})
+            self._active_bytes += self._ring_bytes
+
+        # 3. 收集后录，时间到 (或收集中的片段合计超出内存上限) 则交给写盘线程
+        still = []
+        for clip in self._active:
+            if clip["frames"][-1][0] != ts:
+                clip["frames"].append((ts, payload))
+                clip["bytes"] += nbytes
+                self._active_bytes += nbytes
+            if ts >= clip["end"] or self._active_bytes > self.max_bytes:
+                self._active_bytes -= clip["bytes"]
+                try:
+                    self._writes.put_nowait(clip)
+                except queue.Full:
+                    self.dropped_clips += 1
+            else:
+                still.append(clip)
+        self._active = still
+
+    # ---------- 后台：写盘 ----------
+    def _write_loop(self):
+        while True:
+            clip = self._writes.get()
+            if clip is None:
+                break
+            try:
+                path = self._write_clip(clip)
+                if path and self.on_saved:
+                    self.on_saved(clip["tag"], path)
+            except Exception as e:
+                print(f"Warning: 报警录像写入失败: {e}")
+
+    def _decode(self, payload):
+        if self.jpeg_quality is None:
+            return payload
+        return cv2.imdecode(payload, cv2.IMREAD_COLOR)
+
+    def _write_clip(self, clip):
+        frames = clip["frames"]
+        if not frames:
+            return None
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.abspath(os.path.join(self.out_dir, f"alert_{stamp}_{clip['tag']}.avi"))
+
+        span = frames[-1][0] - frames[0][0]
+        fps = (len(frames) - 1) / span if span > 0 else 15.0
+        first = self._decode(frames[0][1])
+        h, w = first.shape[:2]
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), float(np.clip(fps, 1, 60)), (w, h))
+        if not writer.isOpened():
+            return None
+        writer.write(first)
+        for _, payload in frames[1:]:
+            writer.write(self._decode(payload))
+        writer.release()
+        return path
+
+
+def create_clip_recorder(db=None):
+    """按 AppConfig 创建录像器；传入 db 时报警写入 alerts 表并关联录像路径"""
+    from app.config import AppConfig
+    if not AppConfig.CLIP_RECORDER_ENABLED:
+        return None
+    on_trigger = on_saved = None
+    if db is not None:
+        on_trigger = lambda msg: db.insert_alert("ALERT", msg, "NEW")
+        on_saved = lambda alert_id, path: db.set_alert_clip(alert_id, path)
+    return ClipRecorder(out_dir=AppConfig.CLIP_DIR,
+                        pre_seconds=AppConfig.CLIP_PRE_SECONDS,
+                        post_seconds=AppConfig.CLIP_POST_SECONDS,
+                        max_bytes=int(AppConfig.CLIP_MAX_BUFFER_MB * 1024 * 1024),
+                        jpeg_quality=AppConfig.CLIP_JPEG_QUALITY,
+                        on_trigger=on_trigger, on_saved=on_saved)
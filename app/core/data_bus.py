@@ -0,0 +1,278 @@
+# app/core/data_bus.py
+import dataclasses
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+# --- 标准主题 ---
+SAMPLES = "samples"          # 水力计算结果 (看板数据节拍)
+DETECTIONS = "detections"    # 漂浮物识别 / 跟踪结果 (采集线程)
+ALERTS = "alerts"            # 报警事件
+READINGS = "readings"        # 传感器原始读数 (传感器接入层)
+
+
+@dataclass(frozen=True, slots=True)
+class Sample:
+    ts: float
+    depth: float
+    velocity: float
+    flow_rate: float
+    fr: float
+    width: float
+    sediment: float
+    regime: str
+    uniformity: str
+
+
+@dataclass(frozen=True, slots=True)
+class Detection:
+    ts: float
+    count: int
+    unique: int
+    crossed: int
+    drift: float
+
+
+@dataclass(frozen=True, slots=True)
+class Alert:
+    ts: float
+    level: str
+    message: str
+
+
+@dataclass(frozen=True, slots=True)
+class Reading:
+    ts: float          # 到达时刻 (time.time())
+    sensor: str        # 传感器名称
+    quantity: str      # 物理量：depth / velocity / ...
+    value: float
+
+
+# 消息中可进入 NumPy 历史窗口的字段类型
+_NUMERIC = {float: np.float64, int: np.int64, bool: np.bool_}
+
+
+class History:
+    """
+    定长环形缓冲的数值历史：每个数值字段一列预分配的 NumPy 数组
+    写入 O(1) 不分配内存；读取时按时间顺序拷贝出来，写入方继续写不受影响
+    数组在第一次写入时才分配：多站点时从不发布的主题 (无摄像头站点的识别结果等) 不占内存
+    """
+
+    def __init__(self, fields, capacity):
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self.columns = {name: np.zeros(0, dtype=dtype) for name, dtype in self.fields}
+        self._names = tuple(self.columns)
+        self._arrays = None
+        self.total = 0  # 累计写入条数
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, msg):
+        if self._arrays is None:
+            self.columns = {name: np.zeros(self.capacity, dtype=dtype) for name, dtype in self.fields}
+            self._arrays = tuple(self.columns.values())
+        i = self.total % self.capacity
+        for name, arr in zip(self._names, self._arrays):
+            arr[i] = getattr(msg, name)
+        self.total += 1
+
+    def last(self, n=None):
+        """最近 n 条 (缺省为全部)，返回 {字段: 数组}，按写入顺序"""
+        size = len(self)
+        n = size if n is None else max(0, min(n, size))
+        start = self.total - n
+        i0, i1 = start % self.capacity, self.total % self.capacity
+        if n == 0:
+            return {name: arr[:0].copy() for name, arr in self.columns.items()}
+        if i0 < i1:
+            return {name: arr[i0:i1].copy() for name, arr in self.columns.items()}
+        return {name: np.concatenate((arr[i0:], arr[:i1])) for name, arr in self.columns.items()}
+
+
+class Subscription:
+    """
+    主题订阅 (由消费者所在线程调用 poll)
+    mode="all"   : 每条消息都入队 (队列满时丢弃最旧的并计数)
+    mode="latest": 只保留最新一条，poll() 在有新消息时返回它，否则返回 None
+    callback     : 可选，发布线程中收到消息后调用 (用于唤醒消费者，不应阻塞)
+    """
+
+    def __init__(self, topic, mode="all", maxlen=1024, callback=None):
+        if mode not in ("all", "latest"):
+            raise ValueError(f"未知的投递模式: {mode}")
+        self.topic = topic
+        self.mode = mode
+        self.callback = callback
+        self.dropped = 0
+        self._queue = deque(maxlen=maxlen) if mode == "all" else None
+        self._latest = None
+        self._fresh = False
+
+    def _deliver(self, msg):
+        if self._queue is not None:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(msg)
+        else:
+            self._latest = msg
+            self._fresh = True
+
+    def poll(self):
+        """all 模式返回自上次以来的全部消息 (列表)；latest 模式返回最新消息或 None"""
+        with self.topic.lock:
+            if self._queue is None:
+                if not self._fresh:
+                    return None
+                self._fresh = False
+                return self._latest
+            out = list(self._queue)
+            self._queue.clear()
+            return out
+
+    @property
+    def latest(self):
+        """最近收到的消息 (不改变 poll 的状态)"""
+        with self.topic.lock:
+            if self._queue is not None:
+                return self._queue[-1] if self._queue else None
+            return self._latest
+
+    def close(self):
+        self.topic.unsubscribe(self)
+
+
+class Topic:
+    """
+    单个类型化主题：校验消息类型、保留最近消息与数值历史、分发给订阅者
+    capacity 为数值历史条数；recent 为保留的消息对象条数 (缺省同 capacity)，
+    消息对象远比数值列占内存，长历史只放在 NumPy 窗口中
+    """
+
+    def __init__(self, name, msg_type, capacity=4096, recent=None):
+        self.name = name
+        self.msg_type = msg_type
+        self.lock = threading.Lock()
+        self.recent = deque(maxlen=capacity if recent is None else min(recent, capacity))
+        fields = [(f.name, _NUMERIC[f.type]) for f in dataclasses.fields(msg_type) if f.type in _NUMERIC]
+        self.history = History(fields, capacity) if fields else None
+        self._subs = ()  # 写时复制，发布时无需拷贝
+        self.published = 0
+
+    def publish(self, msg):
+        if type(msg) is not self.msg_type:
+            raise TypeError(f"主题 {self.name} 只接受 {self.msg_type.__name__}，收到 {type(msg).__name__}")
+        with self.lock:
+            self.published += 1
+            self.recent.append(msg)
+            if self.history is not None:
+                self.history.append(msg)
+            subs = self._subs
+            for sub in subs:
+                sub._deliver(msg)
+        for sub in subs:
+            if sub.callback is not None:
+                sub.callback(msg)
+
+    def subscribe(self, mode="all", maxlen=1024, callback=None):
+        sub = Subscription(self, mode, maxlen, callback)
+        with self.lock:
+            self._subs = self._subs + (sub,)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self.lock:
+            self._subs = tuple(s for s in self._subs if s is not sub)
+
+    def last(self, n=None):
+        """最近 n 条消息对象 (按时间顺序)"""
+        with self.lock:
+            items = list(self.recent)
+        return items if n is None else items[-n:] if n > 0 else []
+
+    def window(self, n=None, seconds=None):
+        """
+        数值历史窗口 {字段: NumPy 数组}
+        n 为最近条数；seconds 为按 ts 截取最近若干秒 (需要消息含 ts 字段)
+        """
+        if self.history is None:
+            raise TypeError(f"主题 {self.name} 没有数值字段")
+        with self.lock:
+            data = self.history.last(n)
+        if seconds is not None:
+            start = np.searchsorted(data["ts"], time.time() - seconds)
+            data = {k: v[start:] for k, v in data.items()}
+        return data
+
+
+class DataBus:
+    """
+    进程内发布 / 订阅总线 (采集线程、数据库写入、界面之间共享实时数据)
+    - 主题先注册 (名称 + 消息类型)，发布时校验类型
+    - 每个主题保留定长的最近消息与 NumPy 历史窗口
+    - 订阅者选择投递模式：every sample (all) 或只取最新 (latest)
+    - 线程安全：每个主题一把锁，发布只做 O(订阅者数) 的入队
+    """
+
+    def __init__(self):
+        self._topics = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, msg_type, capacity=4096, recent=None):
+        with self._lock:
+            topic = self._topics.get(name)
+            if topic is None:
+                topic = self._topics[name] = Topic(name, msg_type, capacity, recent)
+            elif topic.msg_type is not msg_type:
+                raise TypeError(f"主题 {name} 已注册为 {topic.msg_type.__name__}")
+            return topic
+
+    def topic(self, name):
+        try:
+            return self._topics[name]
+        except KeyError:
+            raise KeyError(f"未注册的主题: {name}") from None
+
+    def publish(self, name, msg):
+        self.topic(name).publish(msg)
+
+    def subscribe(self, name, mode="all", maxlen=1024, callback=None):
+        return self.topic(name).subscribe(mode, maxlen, callback)
+
+    def stats(self):
+        return {name: {"published": t.published, "subscribers": len(t._subs)}
+                for name, t in self._topics.items()}
+
+
+def create_data_bus():
+    """按 AppConfig 创建总线并注册标准主题"""
+    from app.config import AppConfig
+    bus = DataBus()
+    recent = AppConfig.BUS_RECENT
+    bus.register(SAMPLES, Sample, AppConfig.BUS_SAMPLE_HISTORY, recent)
+    bus.register(DETECTIONS, Detection, AppConfig.BUS_DETECTION_HISTORY, recent)
+    bus.register(ALERTS, Alert, AppConfig.BUS_ALERT_HISTORY, recent)
+    bus.register(READINGS, Reading, AppConfig.BUS_READING_HISTORY, recent)
+    return bus
+
+
+_buses = {}
+_bus_lock = threading.Lock()
+
+
+def get_bus(station=None):
+    """进程内每个站点一条总线 (首次调用时创建)；station 为 None 时为默认站点"""
+    key = station or "default"
+    bus = _buses.get(key)
+    if bus is not None:
+        return bus
+    with _bus_lock:
+        bus = _buses.get(key)
+        if bus is None:
+            bus = _buses[key] = create_data_bus()
+        return bus
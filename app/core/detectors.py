@@ -0,0 +1,216 @@
+# app/core/detectors.py
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+
+class BaseDetector:
+    """
+    检测后端接口
+    detect(frame) 返回检测框列表: [(x, y, w, h, score, label), ...]
+    只做识别，不在图像上绘制任何内容 (绘制由 AIEngine 统一负责)
+    """
+    name = "base"
+
+    def load(self):
+        """加载模型等重资源 (在采集线程首次推理前调用)"""
+        pass
+
+    def detect(self, frame):
+        raise NotImplementedError
+
+    def detect_batch(self, frames):
+        """
+        批量推理，默认逐帧执行
+        实时流水线逐帧调用 detect (批量会增加延迟)；批量用于离线重分析，见 tools/bench_pipeline.py --batch
+        """
+        return [self.detect(f) for f in frames]
+
+    def close(self):
+        """释放线程池等资源 (切换后端后对被替换的检测器调用)"""
+        pass
+
+
+class HSVDetector(BaseDetector):
+    """HSV 颜色阈值检测 (原 AIEngine 逻辑)"""
+    name = "hsv"
+
+    def __init__(self, min_area=500):
+        # 定义绿色的 HSV 范围 (根据光线可能需要微调)
+        # H: 色相 (35-85 覆盖了大部分植物绿)
+        # S: 饱和度 (43-255)
+        # V: 亮度 (46-255)
+        self.lower_green = np.array([35, 43, 46])
+        self.upper_green = np.array([85, 255, 255])
+        self.min_area = min_area
+
+    def mask(self, frame):
+        """逐像素部分：颜色阈值 + 形态学去噪，返回二值掩膜"""
+        # 1. 转换颜色空间 BGR -> HSV
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+
+        # 2. 创建绿色掩膜 (Mask)
+        mask = cv2.inRange(hsv, self.lower_green, self.upper_green)
+
+        # 3. 腐蚀与膨胀 (去除噪点)
+        mask = cv2.erode(mask, None, iterations=2)
+        mask = cv2.dilate(mask, None, iterations=2)
+        return mask
+
+    def boxes_from_mask(self, mask):
+        # 4. 寻找外轮廓 (面积按轮廓计算，与原 AIEngine 的过滤规则一致)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        boxes = []
+        for c in contours:
+            # 过滤掉太小的噪点 (面积 < min_area 忽略)
+            area = cv2.contourArea(c)
+            if area < self.min_area:
+                continue
+            x, y, w, h = cv2.boundingRect(c)
+            boxes.append((x, y, w, h, float(area), "Duckweed"))
+        return boxes
+
+    def detect(self, frame):
+        return self.boxes_from_mask(self.mask(frame))
+
+
+class YOLODetector(BaseDetector):
+    """
+    YOLO 深度模型检测 (ultralytics)
+    - torch / ultralytics 延迟导入，不选用该后端时不产生任何导入开销
+    - 固定输入尺寸 imgsz，CPU 上 320 即可在 4 核机器上稳定 >10 FPS
+    - 可选导出为 ONNX / TorchScript 后再加载推理
+    - 只输出 classes 中的类别 (按类别名，不区分大小写)；权重中没有这些类别时加载失败。
+      COCO 预训练权重 (如 yolov8n.pt) 没有浮萍类别，需换用专门训练的权重，否则任何物体都会触发浮萍报警
+    """
+    name = "yolo"
+
+    def __init__(self, weights="yolov8n.pt", imgsz=320, threads=4, export=None,
+                 conf=0.35, classes=None):
+        self.weights = weights
+        self.imgsz = imgsz
+        self.threads = threads
+        self.export = export
+        self.conf = conf
+        self.classes = classes      # 类别名列表，None 表示权重中的全部类别
+        self._class_ids = None
+        self._model = None
+
+    def load(self):
+        if self._model is not None:
+            return
+        # 延迟导入：只有真正切换到 YOLO 时才加载 torch
+        import torch
+        from ultralytics import YOLO
+
+        if self.threads:
+            torch.set_num_threads(int(self.threads))
+            try:
+                # 只能在首次并行计算前设置一次
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                pass
+
+        model = YOLO(self.weights)
+        if self.classes is not None:
+            wanted = {str(c).lower() for c in self.classes}
+            ids = [i for i, n in model.names.items() if n.lower() in wanted]
+            if not ids:
+                raise ValueError(f"权重 {self.weights} 中没有类别 {list(self.classes)} "
+                                 f"(现有 {len(model.names)} 类，如 {list(model.names.values())[:5]})")
+            self._class_ids = ids
+        if self.export in ("onnx", "torchscript"):
+            # 导出固定尺寸的模型，推理时不再走 PyTorch eager 路径
+            path = model.export(format=self.export, imgsz=self.imgsz, dynamic=False)
+            model = YOLO(path, task="detect")
+        self._model = model
+
+        # 预热一次，避免首帧卡顿
+        self.detect(np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8))
+
+    def detect(self, frame):
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames):
+        if self._model is None:
+            self.load()
+        results = self._model.predict(list(frames), imgsz=self.imgsz, conf=self.conf,
+                                      classes=self._class_ids, device="cpu", verbose=False)
+        out = []
+        for r in results:
+            names = r.names
+            xyxy = r.boxes.xyxy.cpu().numpy().astype(int)
+            confs = r.boxes.conf.cpu().numpy()
+            clss = r.boxes.cls.cpu().numpy().astype(int)
+            boxes = []
+            for (x1, y1, x2, y2), s, c in zip(xyxy, confs, clss):
+                boxes.append((int(x1), int(y1), int(x2 - x1), int(y2 - y1), float(s), names.get(c, str(c))))
+            out.append(boxes)
+        return out
+
+
+class TiledDetector(BaseDetector):
+    """
+    高分辨率画面分块并行检测 (1080p / 4K 监控摄像头)
+    - 逐像素的颜色阈值与形态学在带重叠的分块上并行计算 (OpenCV 运算期间释放 GIL)，
+      每块只把自己的核心区域写回整幅掩膜，重叠宽度覆盖形态学的作用半径，结果与全图一致
+    - 轮廓在整幅掩膜上统一提取一次，跨越分块边界的目标自然合并为一个
+    - 小画面 (像素数 < min_pixels)、没有 mask() 的后端或只有一个工作线程 (单核主机，
+      分块只增加开销) 时直接走单次全图检测
+    """
+
+    def __init__(self, base, tile=512, overlap=32, workers=None, min_pixels=1280 * 720):
+        self.base = base
+        self.name = base.name
+        self.tile = tile
+        self.overlap = overlap
+        self.min_pixels = min_pixels
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = ThreadPoolExecutor(max_workers=self.workers)
+
+    def load(self):
+        self.base.load()
+
+    def close(self):
+        # 只有采集线程调用 detect，替换后不会再有新任务，不必等待
+        self._pool.shutdown(wait=False)
+        self.base.close()
+
+    def tiles(self, h, w):
+        """返回 [(核心区域, 带重叠的计算区域)]，区域格式为 (x0, y0, x1, y1)"""
+        step, ov = self.tile, self.overlap
+        out = []
+        for y0 in range(0, h, step):
+            for x0 in range(0, w, step):
+                core = (x0, y0, min(w, x0 + step), min(h, y0 + step))
+                pad = (max(0, x0 - ov), max(0, y0 - ov), min(w, core[2] + ov), min(h, core[3] + ov))
+                out.append((core, pad))
+        return out
+
+    def detect(self, frame):
+        h, w = frame.shape[:2]
+        if h * w < self.min_pixels or self.workers < 2 or not hasattr(self.base, "mask"):
+            return self.base.detect(frame)
+
+        full = np.empty((h, w), dtype=np.uint8)
+
+        def run(regions):
+            (cx0, cy0, cx1, cy1), (px0, py0, px1, py1) = regions
+            m = self.base.mask(frame[py0:py1, px0:px1])
+            full[cy0:cy1, cx0:cx1] = m[cy0 - py0:cy1 - py0, cx0 - px0:cx1 - px0]
+
+        list(self._pool.map(run, self.tiles(h, w)))
+        return self.base.boxes_from_mask(full)
+
+
+def create_detector(name):
+    """按名称创建检测后端"""
+    from app.config import AppConfig
+    if name == "yolo":
+        return YOLODetector(weights=AppConfig.YOLO_WEIGHTS, imgsz=AppConfig.YOLO_IMGSZ,
+                            threads=AppConfig.YOLO_THREADS, export=AppConfig.YOLO_EXPORT,
+                            conf=AppConfig.YOLO_CONF, classes=AppConfig.YOLO_CLASSES)
+    return TiledDetector(HSVDetector(), tile=AppConfig.TILE_SIZE, overlap=AppConfig.TILE_OVERLAP,
+                         workers=AppConfig.TILE_WORKERS, min_pixels=AppConfig.TILE_MIN_PIXELS)
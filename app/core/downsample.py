@@ -0,0 +1,45 @@
+# app/core/downsample.py
+import numpy as np
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets 降采样，返回保留点的下标 (升序)
+    - 首尾两点必定保留，中间按等宽桶每桶选一个点：
+      与上一个已选点、下一个桶均值构成的三角形面积最大者
+    - 保留峰谷形状，适合把百万级时序压缩到屏幕像素宽度
+    x 需单调递增 (时间轴)；n_out >= len(x) 或 n_out < 3 时原样返回
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # 中间 n-2 个点分成 n_out-2 个桶 (边界下标)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # 每个桶的均值 (用前缀和一次算出)，作为三角形的第三个顶点
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+    cnt = np.diff(edges)
+    mean_x = np.append((cx[edges[1:]] - cx[edges[:-1]]) / cnt, x[-1])
+    mean_y = np.append((cy[edges[1:]] - cy[edges[:-1]]) / cnt, y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        bx, by = mean_x[i + 1], mean_y[i + 1]
+        # 三角形面积的两倍 (省略常数因子)
+        area = np.abs((ax - bx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (by - ay))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def lttb(x, y, n_out):
+    """LTTB 降采样，返回 (x, y) 子序列"""
+    idx = lttb_indices(x, y, n_out)
+    return x[idx], y[idx]
@@ -0,0 +1,39 @@
+# app/core/frame_pool.py
+import threading
+
+import numpy as np
+
+
+class FramePool:
+    """
+    固定数量的可复用帧缓冲区
+    采集线程 acquire() 一块缓冲区直接读帧，界面显示完毕后 release() 归还；
+    缓冲区耗尽 (界面跟不上) 时 acquire() 返回 None，由调用方丢弃显示帧，内存严格有界
+    """
+
+    def __init__(self, shape=(480, 640, 3), size=4, dtype=np.uint8):
+        self.shape = shape
+        self.dtype = dtype
+        self._lock = threading.Lock()
+        self._buffers = [np.empty(shape, dtype=dtype) for _ in range(size)]
+        self._owned = {id(b) for b in self._buffers}
+        self._free = list(self._buffers)
+
+    def acquire(self):
+        with self._lock:
+            return self._free.pop() if self._free else None
+
+    def release(self, buf):
+        """归还缓冲区；不属于本池的数组 (如回放源读出的帧) 直接忽略"""
+        if buf is None or id(buf) not in self._owned:
+            return
+        with self._lock:
+            if not any(b is buf for b in self._free):
+                self._free.append(buf)
+
+    def owns(self, buf):
+        return buf is not None and id(buf) in self._owned
+
+    @property
+    def available(self):
+        return len(self._free)
@@ -0,0 +1,114 @@
+# app/core/frame_scheduler.py
+import time
+
+try:
+    import psutil
+except ImportError:  # psutil 缺失时不做 CPU 自适应
+    psutil = None
+
+
+class FrameRateController:
+    """
+    基于截止时间的帧率控制 (替代固定 msleep(30))
+    - 按目标帧率排定下一帧的截止时间，sleep 时长扣除本帧处理耗时
+    - 过载 (落后超过一个周期) 时不追帧：重置节拍并建议跳过下一帧的推理
+    - 界面不可见或主机 CPU 饱和时自动降低帧率
+    - 统计实际帧率，便于与目标帧率对比
+    - 回放源按自身时间戳控制节拍 (begin_frame(paced=True))：逐帧推理，不做截止时间与过载判定，
+      也不受界面隐藏 / CPU 饱和降频 (降频只会拖慢回放，不能减少要分析的帧)；待机降频对所有源生效
+    """
+
+    def __init__(self, target_fps=30.0, hidden_fps=5.0, standby_fps=10.0,
+                 cpu_limit=90.0, cpu_fps=10.0, cpu_interval=1.0):
+        self.target_fps = target_fps
+        self.hidden_fps = hidden_fps      # 看板不可见时的帧率
+        self.standby_fps = standby_fps    # 摄像头关闭 (待机) 时的循环频率
+        self.cpu_limit = cpu_limit        # 主机 CPU 占用超过此值视为饱和 (%)
+        self.cpu_fps = cpu_fps            # CPU 饱和时的帧率
+        self.cpu_interval = cpu_interval  # CPU 占用采样间隔 (秒)
+
+        self.visible = True
+        self.standby = False
+        self.paced = False          # 当前帧节拍由采集源控制 (回放)
+        self.cpu_percent = 0.0
+        self._cpu_checked = 0.0
+
+        self._deadline = None
+        self._last_frame = None
+        self._overrun = False
+        self.achieved_fps = 0.0
+        self.dropped = 0            # 因过载被放弃的节拍数
+        self.skipped_inference = 0  # 建议跳过推理的帧数
+
+    @property
+    def effective_fps(self):
+        if self.standby:
+            return self.standby_fps
+        fps = self.target_fps
+        if not self.visible:
+            fps = min(fps, self.hidden_fps)
+        if self.cpu_percent >= self.cpu_limit:
+            fps = min(fps, self.cpu_fps)
+        return fps
+
+    def _sample_cpu(self, now):
+        if psutil is None or now - self._cpu_checked < self.cpu_interval:
+            return
+        self._cpu_checked = now
+        # interval=None 非阻塞：返回距上次调用以来的平均占用
+        self.cpu_percent = psutil.cpu_percent(interval=None)
+
+    def begin_frame(self, paced=False):
+        """
+        每帧开始时调用，返回 True 表示本帧应执行推理
+        上一帧严重超时 (过载) 时返回 False，本帧跳过推理以便追上节拍
+        paced=True 表示本帧节拍由采集源控制 (回放)：只统计帧率，始终执行推理，之后不必调用 wait_time
+        """
+        now = time.monotonic()
+        self._sample_cpu(now)
+        if self._last_frame is not None:
+            dt = now - self._last_frame
+            if dt > 0:
+                inst = 1.0 / dt
+                self.achieved_fps = inst if self.achieved_fps == 0 else 0.9 * self.achieved_fps + 0.1 * inst
+        self._last_frame = now
+
+        self.paced = paced
+        if paced:
+            self._deadline = None
+            self._overrun = False
+            return True
+        if self._overrun:
+            self._overrun = False
+            self.skipped_inference += 1
+            return False
+        return True
+
+    def wait_time(self):
+        """
+        帧处理完成后调用，返回距下一帧截止时间还需等待的秒数
+        严重落后时放弃追赶，从当前时刻重新排定节拍
+        """
+        now = time.monotonic()
+        period = 1.0 / self.effective_fps
+        if self._deadline is None:
+            self._deadline = now
+        self._deadline += period
+        if now - self._deadline > period:
+            missed = int((now - self._deadline) / period)
+            self.dropped += missed
+            self._deadline = now
+            self._overrun = True
+            return 0.0
+        return max(0.0, self._deadline - now)
+
+    def reset(self):
+        self._overrun = False
+        self._deadline = None
+        self._last_frame = None
+        self.achieved_fps = 0.0
+
+    def stats(self):
+        return {"target_fps": self.target_fps, "effective_fps": self.effective_fps,
+                "achieved_fps": self.achieved_fps, "paced": self.paced, "cpu_percent": self.cpu_percent,
+                "dropped": self.dropped, "skipped_inference": self.skipped_inference}
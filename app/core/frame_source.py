@@ -0,0 +1,247 @@
+# app/core/frame_source.py
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+
+class FrameSource:
+    """
+    采集源接口
+    read(out=None) 返回 (ok, frame, ts)，ts 为该帧的时间戳 (秒，单调递增)
+    out 为可复用的缓冲区 (FramePool)，源支持时直接读入其中，否则忽略
+    - 摄像头：ts 为采集时刻
+    - 回放源：ts 由帧序号/帧率换算，与回放速度无关 (逐帧精确)
+    """
+    realtime = True  # True 表示由采集线程负责节拍；回放源自己控制节拍
+
+    def open(self):
+        return True
+
+    def is_opened(self):
+        return True
+
+    def read(self, out=None):
+        raise NotImplementedError
+
+    def resume(self):
+        """暂停读取 (关闭采集 / 待机) 后重新开始读取前调用"""
+        pass
+
+    def release(self):
+        pass
+
+
+class CameraSource(FrameSource):
+    """USB / 内置摄像头"""
+
+    def __init__(self, index=0, width=640, height=480):
+        self.index = index
+        self.width = width
+        self.height = height
+        self.cap = None
+
+    def open(self):
+        if self.cap is None:
+            self.cap = cv2.VideoCapture(self.index)
+        else:
+            self.cap.open(self.index)
+        # Mac 可能需要设置分辨率以提高性能
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        return self.cap.isOpened()
+
+    def is_opened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def read(self, out=None):
+        # 读入复用缓冲区，尺寸不符时 OpenCV 会自动另行分配
+        ret, frame = self.cap.read(out) if out is not None else self.cap.read()
+        return ret, frame, time.monotonic()
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+
+class ReplaySource(FrameSource):
+    """
+    回放源基类：按帧时间戳节拍回放，支持循环、跳转与“最快速度”模式
+    max_speed=True 时不做任何 sleep，用于批量重分析与基准测试
+    """
+    realtime = False
+
+    def __init__(self, fps=25.0, loop=False, max_speed=False, speed=1.0):
+        self.fps = fps
+        self.loop = loop
+        self.max_speed = max_speed
+        self.speed = speed           # 回放倍速 (max_speed 为 False 时生效)
+        self.position = 0            # 下一帧的序号
+        self._loop_offset = 0.0      # 循环回放时累加的时间，保证 ts 单调
+        self._anchor = None          # (墙钟时间, 帧时间戳)
+
+    @property
+    def frame_count(self):
+        raise NotImplementedError
+
+    def _read_at(self, index):
+        raise NotImplementedError
+
+    def seek(self, index):
+        """跳转到指定帧 (同时重置节拍基准)"""
+        self.position = max(0, min(int(index), max(0, self.frame_count - 1)))
+        self._anchor = None
+
+    def seek_time(self, seconds):
+        self.seek(round(seconds * self.fps))
+
+    def resume(self):
+        # 停顿期间的墙钟时间不算落后，否则恢复后会以最快速度连读追赶，打乱测速与跟踪的节拍
+        self._anchor = None
+
+    def _pace(self, ts):
+        if self.max_speed:
+            return
+        now = time.monotonic()
+        if self._anchor is None:
+            self._anchor = (now, ts)
+            return
+        wall0, ts0 = self._anchor
+        delay = wall0 + (ts - ts0) / self.speed - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def read(self, out=None):
+        if self.position >= self.frame_count:
+            if not self.loop or self.frame_count == 0:
+                return False, None, None
+            self._loop_offset += self.frame_count / self.fps
+            self.seek(0)
+        ok, frame = self._read_at(self.position)
+        ts = self._loop_offset + self.position / self.fps
+        self.position += 1
+        if not ok:
+            return False, None, None
+        if out is not None and out.shape == frame.shape:
+            # 拷入复用缓冲区，使显示端的内存占用同样有界
+            np.copyto(out, frame)
+            frame = out
+        self._pace(ts)
+        return True, frame, ts
+
+
+class VideoFileSource(ReplaySource):
+    """MP4 / AVI 等视频文件回放"""
+
+    def __init__(self, path, loop=False, max_speed=False, speed=1.0):
+        self.path = path
+        self.cap = None
+        self._count = 0
+        super().__init__(loop=loop, max_speed=max_speed, speed=speed)
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            return False
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 25.0
+        self._count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self._next = 0
+        return True
+
+    def is_opened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    @property
+    def frame_count(self):
+        return self._count
+
+    def _read_at(self, index):
+        # 顺序读取时不做 seek，只有跳转后才重新定位
+        if index != self._next:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        ok, frame = self.cap.read()
+        self._next = index + 1
+        return ok, frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+
+class ImageFolderSource(ReplaySource):
+    """图片序列 (文件夹) 回放，按文件名排序"""
+    EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+    def __init__(self, folder, fps=25.0, loop=False, max_speed=False, speed=1.0):
+        self.folder = folder
+        self.files = []
+        super().__init__(fps=fps, loop=loop, max_speed=max_speed, speed=speed)
+
+    def open(self):
+        self.files = sorted(f for f in glob.glob(os.path.join(self.folder, "*"))
+                            if f.lower().endswith(self.EXTENSIONS))
+        return bool(self.files)
+
+    def is_opened(self):
+        return bool(self.files)
+
+    @property
+    def frame_count(self):
+        return len(self.files)
+
+    def _read_at(self, index):
+        frame = cv2.imread(self.files[index], cv2.IMREAD_COLOR)
+        return frame is not None, frame
+
+
+class MockSource(ReplaySource):
+    """
+    无摄像头时的合成画面：水面纹理向右漂移，并有一块绿色“浮萍”随水流经过
+    (AppConfig.USE_MOCK_CAMERA = True 时使用)
+    """
+
+    def __init__(self, size=(480, 640), fps=30.0, shift=3, max_speed=False):
+        super().__init__(fps=fps, loop=True, max_speed=max_speed)
+        h, w = size
+        rng = np.random.default_rng(0)
+        base = rng.integers(40, 110, (h, w * 2), dtype=np.uint8)
+        base = cv2.GaussianBlur(base, (5, 5), 1.5)
+        self._base = cv2.cvtColor(base, cv2.COLOR_GRAY2BGR)
+        self._base[:, :, 0] = cv2.add(self._base[:, :, 0], 40)  # 偏蓝的水色
+        self.size = size
+        self.shift = shift
+
+    @property
+    def frame_count(self):
+        return int(self.fps * 60)
+
+    def _read_at(self, index):
+        h, w = self.size
+        off = (index * self.shift) % w
+        frame = self._base[:, off:off + w].copy()
+        x = (index * 4) % (w + 200) - 100
+        cv2.ellipse(frame, (x, h // 2), (45, 30), 0, 0, 360, (40, 180, 60), -1)
+        return True, frame
+
+
+def open_source(spec=None, loop=None, max_speed=None):
+    """
+    按描述创建采集源
+    spec: 摄像头序号 (int 或数字字符串) / 视频文件路径 / 图片文件夹路径
+    未指定时使用 AppConfig.CAMERA_SOURCE；USE_MOCK_CAMERA 为 True 时使用合成画面
+    """
+    from app.config import AppConfig
+    loop = AppConfig.REPLAY_LOOP if loop is None else loop
+    max_speed = AppConfig.REPLAY_MAX_SPEED if max_speed is None else max_speed
+    if spec is None:
+        if AppConfig.USE_MOCK_CAMERA:
+            return MockSource(max_speed=max_speed)
+        spec = AppConfig.CAMERA_SOURCE
+
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(int(spec))
+    if os.path.isdir(spec):
+        return ImageFolderSource(spec, loop=loop, max_speed=max_speed)
+    return VideoFileSource(spec, loop=loop, max_speed=max_speed)
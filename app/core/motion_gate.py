@@ -0,0 +1,62 @@
+# app/core/motion_gate.py
+import cv2
+
+
+class MotionGate:
+    """
+    运动门控：在缩小的灰度图上做帧差，画面无变化时跳过检测、复用上次结果
+    - sensitivity (0~1) 越大越敏感，可按摄像头单独设置
+    - 参考帧只在判定为“有变化”时更新，缓慢的光照漂移累积到阈值后也会触发一次检测
+    - refresh_every 帧内至少强制检测一次，避免长时间不更新
+    """
+
+    def __init__(self, sensitivity=0.5, scale=0.125, refresh_every=150):
+        self.scale = scale
+        self.refresh_every = refresh_every
+        self.set_sensitivity(sensitivity)
+        self._ref = None
+        self._since_active = 0
+        self.frames = 0    # 参与判定的帧数
+        self.skipped = 0   # 被跳过检测的帧数
+
+    def set_sensitivity(self, sensitivity):
+        s = min(max(float(sensitivity), 0.0), 1.0)
+        self.sensitivity = s
+        self.pixel_threshold = 8 + (1.0 - s) * 24          # 单像素灰度差阈值
+        self.min_changed = 0.001 + (1.0 - s) * 0.01        # 变化像素比例阈值
+
+    def reset(self):
+        self._ref = None
+        self._since_active = 0
+
+    def check(self, frame):
+        """返回 True 表示画面有变化 (需要检测)"""
+        small = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        small = cv2.GaussianBlur(small, (3, 3), 0)
+
+        self.frames += 1
+        if self._ref is None or self._ref.shape != small.shape:
+            self._ref = small
+            self._since_active = 0
+            return True
+
+        diff = cv2.absdiff(small, self._ref)
+        _, changed = cv2.threshold(diff, self.pixel_threshold, 1, cv2.THRESH_BINARY)
+        ratio = cv2.countNonZero(changed) / float(changed.size)
+
+        self._since_active += 1
+        if ratio >= self.min_changed or self._since_active >= self.refresh_every:
+            self._ref = small
+            self._since_active = 0
+            return True
+        self.skipped += 1
+        return False
+
+    @property
+    def skip_ratio(self):
+        return self.skipped / self.frames if self.frames else 0.0
+
+    def metrics(self):
+        return {"frames": self.frames, "skipped": self.skipped, "skip_ratio": self.skip_ratio}
@@ -0,0 +1,226 @@
+# app/core/perf.py
+import functools
+import json
+import threading
+import time
+
+# 每个数量级 (2 倍区间) 的子桶数：相对误差不超过 1/64 (约 1.6%)
+_SUB_BITS = 7
+_SUB_COUNT = 1 << _SUB_BITS
+_HALF = _SUB_COUNT // 2
+
+
+class LatencyHistogram:
+    """
+    HDR 风格的对数-线性直方图 (单位: 微秒)
+    - 数值按 2 倍区间分段，每段再等分为 64 个子桶，内存固定 (约 1300 个计数)，
+      记录为 O(1)，任意分位数的相对误差约 1.6%
+    - 超过 max_us 的值计入最后一个桶，max 仍记录真实值
+    """
+
+    def __init__(self, max_us=60_000_000):
+        self.max_us = max_us
+        self.counts = [0] * (self._index(max_us) + 1)
+        self.reset()
+
+    @staticmethod
+    def _index(v):
+        if v < _SUB_COUNT:
+            return v
+        shift = v.bit_length() - _SUB_BITS
+        return _SUB_COUNT + (shift - 1) * _HALF + ((v >> shift) - _HALF)
+
+    @staticmethod
+    def _value(idx):
+        """桶的代表值 (区间中点)"""
+        if idx < _SUB_COUNT:
+            return float(idx)
+        shift = (idx - _SUB_COUNT) // _HALF + 1
+        low = ((idx - _SUB_COUNT) % _HALF + _HALF) << shift
+        return low + (1 << shift) / 2
+
+    def reset(self):
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, us):
+        us = max(0, int(us))
+        self.counts[self._index(min(us, self.max_us))] += 1
+        self.count += 1
+        self.total += us
+        if self.min is None or us < self.min:
+            self.min = us
+        if us > self.max:
+            self.max = us
+
+    def percentile(self, p):
+        """第 p 百分位 (0~100)，无数据时返回 0"""
+        if self.count == 0:
+            return 0.0
+        target = max(1, int(p / 100.0 * self.count + 0.5))
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                # 代表值不超出实际观测到的范围
+                return min(max(self._value(idx), self.min), self.max)
+        return float(self.max)
+
+    def summary(self):
+        """统计摘要 (单位: 毫秒)"""
+        ms = 1e-3
+        return {"count": self.count,
+                "mean": self.total / self.count * ms if self.count else 0.0,
+                "min": (self.min or 0) * ms,
+                "p50": self.percentile(50) * ms,
+                "p90": self.percentile(90) * ms,
+                "p99": self.percentile(99) * ms,
+                "max": self.max * ms}
+
+
+class _NullSpan:
+    """关闭统计时返回的共享空上下文，不计时、不分配对象"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("recorder", "name", "t0")
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.record(self.name, (time.perf_counter_ns() - self.t0) // 1000)
+        return False
+
+
+class PerfRecorder:
+    """
+    分段耗时统计 (采集、识别、跨线程信号、界面转换、入库、图表重绘等)
+    - with perf.span("ai.detect"): ... 记录一段代码的耗时 (单调时钟 perf_counter)
+    - 跨线程的耗时用 stamp() 在发送端打点，接收端 record_since(name, stamp) 记录
+    - enabled 可在运行时切换；关闭时 span() 返回共享的空上下文，几乎没有开销
+    - 可被采集线程与界面线程同时调用 (记录时加锁)
+    """
+
+    def __init__(self, enabled=False):
+        self._lock = threading.Lock()
+        self._hists = {}
+        self.enabled = False
+        self.started = time.time()
+        self.set_enabled(enabled)
+
+    def set_enabled(self, enabled):
+        """开启时清空旧数据，统计从本次开启开始"""
+        if enabled and not self.enabled:
+            self.reset()
+        self.enabled = bool(enabled)
+
+    def reset(self):
+        with self._lock:
+            self._hists = {}
+            self.started = time.time()
+
+    def span(self, name):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def stamp(self):
+        """发送端打点；关闭统计时返回 0"""
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def record_since(self, name, stamp):
+        if stamp and self.enabled:
+            self.record(name, (time.perf_counter_ns() - stamp) // 1000)
+
+    def record(self, name, us):
+        with self._lock:
+            hist = self._hists.get(name)
+            if hist is None:
+                hist = self._hists[name] = LatencyHistogram()
+            hist.record(us)
+
+    def snapshot(self):
+        """各阶段的统计摘要 (毫秒)，按名称排序"""
+        with self._lock:
+            stages = {name: hist.summary() for name, hist in sorted(self._hists.items())}
+        return {"time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "elapsed": time.time() - self.started,
+                "enabled": self.enabled,
+                "stages": stages}
+
+    def write_snapshot(self, path):
+        """追加一行 JSON (JSON Lines)，便于离线对比不同版本 / 配置"""
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.snapshot(), ensure_ascii=False) + "\n")
+
+
+class SnapshotWriter(threading.Thread):
+    """后台线程：开启统计期间每 interval 秒写出一次快照"""
+
+    def __init__(self, recorder, path, interval=10.0):
+        super().__init__(daemon=True)
+        self.recorder = recorder
+        self.path = path
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            if self.recorder.enabled:
+                try:
+                    self.recorder.write_snapshot(self.path)
+                except OSError as e:
+                    print(f"Warning: 性能快照写出失败: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder():
+    """进程内共享的统计器，首次调用时按 AppConfig 创建 (配置了快照路径时启动后台写出)"""
+    global _recorder
+    if _recorder is not None:
+        return _recorder
+    with _recorder_lock:
+        if _recorder is None:
+            from app.config import AppConfig
+            _recorder = PerfRecorder(enabled=AppConfig.PERF_ENABLED)
+            if AppConfig.PERF_SNAPSHOT_PATH:
+                SnapshotWriter(_recorder, AppConfig.PERF_SNAPSHOT_PATH,
+                               AppConfig.PERF_SNAPSHOT_INTERVAL).start()
+        return _recorder
+
+
+def timed(name):
+    """装饰器：把整个函数 / 方法计为一个分段 (首次调用时才获取统计器)"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_recorder().span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,253 @@
+# app/core/pipeline.py
+import time
+
+import cv2
+import numpy as np
+
+from app.config import AppConfig
+from app.core.ai_engine import AIEngine
+from app.core.frame_source import open_source
+from app.core.frame_pool import FramePool
+from app.core.clip_recorder import create_clip_recorder
+from app.core.frame_scheduler import FrameRateController
+from app.core.velocimetry import create_velocimeter
+from app.core.stage_gauge import create_level_detector
+from app.core.perf import get_recorder
+from app.core.data_bus import get_bus, DETECTIONS, ALERTS, Detection, Alert
+from app.db.database import DatabaseManager
+
+
+class AcquisitionPipeline:
+    """
+    采集流水线：采集 -> 图像测量 -> 报警录像缓冲 -> 漂浮物识别 -> 发布结果
+    不依赖 Qt，可在普通线程中运行 (无头服务)，也可由界面作为客户端使用：
+    - on_frame(frame, stamp)：处理后的显示帧 (来自 frame_pool，显示完毕后须 release)；
+      为 None 时不输出画面，缓冲区处理完立即归还
+    - on_measure(m)：图像测量结果 (水面流速、水位等)；关闭采集时传入 None 表示测量值失效
+    - 识别结果与报警发布到数据总线 (detections / alerts 主题)
+    """
+
+    def __init__(self, source=None, db=None, on_frame=None, on_measure=None, bus=None):
+        self.running = False
+        self.camera_active = False  # 是否开启采集
+        self.ai_enabled = False     # AI 是否开启
+        self.on_frame = on_frame
+        self.on_measure = on_measure
+        self.ai_engine = AIEngine(on_event=self.publish_event)
+        self.velocimetry_enabled = AppConfig.VELOCIMETRY_ENABLED
+        self.velocimeter = create_velocimeter()
+        self.level_detector = create_level_detector()  # 未配置水尺时为 None
+        # 采集源：摄像头序号 / 视频文件 / 图片文件夹 (None 时读取 AppConfig)
+        self.source_spec = source
+        self.source = None
+        self._seek_to = None
+        self._was_active = False
+        # 复用的帧缓冲区 (显示完毕后归还) 与缓存的待机画面
+        self.frame_pool = FramePool()
+        # 报警录像 (预录环形缓冲，后台压缩与写盘)
+        self.recorder = create_clip_recorder(db or DatabaseManager())
+        self._standby = None
+        self._standby_sent = False
+        # 帧率控制：按截止时间调度，过载时跳过推理，界面隐藏 / CPU 饱和时降频
+        self.fps_ctrl = FrameRateController(target_fps=AppConfig.TARGET_FPS,
+                                            hidden_fps=AppConfig.HIDDEN_FPS,
+                                            standby_fps=AppConfig.STANDBY_FPS,
+                                            cpu_limit=AppConfig.CPU_SATURATION,
+                                            cpu_fps=AppConfig.CPU_SATURATED_FPS)
+        # 分段耗时统计 (关闭时几乎无开销)
+        self.perf = get_recorder()
+        self.bus = bus or get_bus()
+        # 运行错误统计 (status() 中报告)；连续出错 max_errors 帧后停止并标记失败
+        self.errors = 0
+        self.last_error = None
+        self.failed = False
+        self.max_errors = AppConfig.PIPELINE_MAX_ERRORS
+        self._error_streak = 0
+
+    def set_visible(self, visible):
+        """画面是否有人观看 (不可见时降低采集帧率)"""
+        self.fps_ctrl.visible = visible
+
+    def seek(self, index):
+        """回放源跳转到指定帧 (在采集线程中执行)"""
+        self._seek_to = index
+
+    def run(self):
+        """采集循环，直到 stop() (在调用线程中阻塞运行)"""
+        self.running = True
+        self.failed = False
+        try:
+            self.source = source = open_source(self.source_spec)
+            source.open()
+        except Exception as e:
+            self.source = source = None
+            self._on_error(e)
+            self._fail()
+
+        while self.running:
+            self.fps_ctrl.standby = not self.camera_active
+            # 回放源自己按时间戳控制节拍：逐帧推理，不参与截止时间 / 过载跳帧
+            replay = self.camera_active and source is not None and not source.realtime
+            run_ai = self.fps_ctrl.begin_frame(paced=replay)
+            try:
+                paced = self._step(source, run_ai)
+                self._error_streak = 0
+            except Exception as e:
+                # 单帧出错 (采集源、检测器、回调) 不终止采集线程；连续出错过多才停止并标记失败
+                paced = False
+                self._on_error(e)
+                if self._error_streak >= self.max_errors:
+                    self._fail()
+
+            # 扣除本帧处理耗时后等待到下一帧的截止时间 (回放源已自行控制节拍)
+            if not paced:
+                wait = self.fps_ctrl.wait_time()
+                if wait > 0:
+                    time.sleep(wait)
+
+        if source is not None:
+            source.release()
+        self.ai_engine.close()
+        if self.recorder is not None:
+            self.recorder.stop()
+
+    def _step(self, source, run_ai):
+        """处理一帧；返回回放源是否已按时间戳控制节拍 (是则不再额外 sleep)"""
+        paced = False
+        if self._seek_to is not None and hasattr(source, "seek"):
+            source.seek(self._seek_to)
+            self._seek_to = None
+        if self._was_active and not self.camera_active:
+            self.reset_measurement()
+        elif self.camera_active and not self._was_active:
+            source.resume()
+        self._was_active = self.camera_active
+
+        if self.camera_active:
+            self._standby_sent = False
+            if source.is_opened():
+                # 缓冲区耗尽说明显示端跟不上：照常识别，但丢弃这一帧的显示
+                buf = self.frame_pool.acquire()
+                try:
+                    with self.perf.span("capture"):
+                        ret, frame, ts = source.read(buf)
+                    if frame is not buf:
+                        self.frame_pool.release(buf)
+                    if ret:
+                        # 测量必须在原始帧上进行 (AI 会在帧上绘制)，与识别共享同一次采集
+                        with self.perf.span("measure"):
+                            self.measure(frame, ts)
+                        # 翻转镜像 (Mac摄像头通常需要镜像)
+                        # frame = cv2.flip(frame, 1)
+
+                        if self.recorder is not None:
+                            self.recorder.push(frame, ts)
+
+                        if self.ai_enabled:
+                            # 过载时本帧不跑检测器，只外推轨迹并绘制
+                            with self.perf.span("ai.detect"):
+                                frame, count, msg = self.ai_engine.detect(frame, ts, skip_detection=not run_ai)
+                            self.publish_detection(count, msg)
+                            if msg and self.recorder is not None:
+                                self.recorder.trigger(msg)
+                        elif self.on_frame is not None:
+                            # 即使不开AI，也画个简单的十字，表示正在运行
+                            h, w, _ = frame.shape
+                            cv2.line(frame, (w//2-10, h//2), (w//2+10, h//2), (100,100,100), 1)
+                            cv2.line(frame, (w//2, h//2-10), (w//2, h//2+10), (100,100,100), 1)
+
+                        if buf is not None:
+                            self.emit_frame(frame)
+                            buf = None  # 已交给显示端
+                        paced = not source.realtime
+                    else:
+                        self.send_noise()
+                except Exception:
+                    # 本帧出错：归还尚未交出的缓冲区 (重复归还是安全的)
+                    self.frame_pool.release(buf)
+                    raise
+            else:
+                # 尝试重连
+                source.open()
+                time.sleep(0.5)
+        else:
+            # 采集关闭状态，发送黑屏或待机图 (待机帧率较低，省电模式)
+            self.send_black_screen()
+        return paced
+
+    def _on_error(self, e):
+        self.errors += 1
+        self._error_streak += 1
+        self.last_error = f"{type(e).__name__}: {e}"
+        # 每段连续出错只报告第一次，避免每帧刷屏
+        if self._error_streak == 1:
+            self.publish_event("ERROR", f"采集出错: {self.last_error}")
+
+    def _fail(self):
+        self.failed = True
+        self.running = False
+        self.publish_event("ERROR", f"采集流水线已停止 ({self.last_error})")
+
+    def stop(self):
+        """请求退出采集循环 (由其他线程调用，当前帧处理完后退出)"""
+        self.running = False
+
+    def measure(self, frame, ts):
+        m = {}
+        # 未标定的测速结果 (px/s) 不进入水力计算，不必每帧做光流
+        if self.velocimetry_enabled and self.velocimeter.calibrated:
+            m.update(self.velocimeter.process(frame, ts))
+        if self.level_detector is not None:
+            m.update(self.level_detector.process(frame))
+        if m and self.on_measure is not None:
+            self.on_measure(m)
+
+    def reset_measurement(self):
+        """关闭采集后清空测速 / 水尺的时间滤波状态，并通知测量值失效"""
+        self.velocimeter.reset()
+        if self.level_detector is not None:
+            self.level_detector.reset()
+        if self.on_measure is not None:
+            self.on_measure(None)
+
+    def emit_frame(self, frame):
+        # 只读取一次：界面线程切换站点时会把 on_frame 置为 None
+        on_frame = self.on_frame
+        if on_frame is None:
+            self.frame_pool.release(frame)
+            return
+        on_frame(frame, self.perf.stamp())
+
+    def publish_detection(self, count, msg):
+        tracker = self.ai_engine.tracker
+        now = time.time()
+        self.bus.publish(DETECTIONS, Detection(now, count, tracker.unique_count, tracker.crossed_count,
+                                               float(tracker.drift_speed())))
+        if msg:
+            self.bus.publish(ALERTS, Alert(now, "ALERT", msg))
+
+    def publish_event(self, level, message):
+        """运行事件 (后端切换结果等) 发布到 alerts 主题，界面日志与接口客户端都能看到"""
+        self.bus.publish(ALERTS, Alert(time.time(), level, message))
+
+    def send_noise(self):
+        # 在复用缓冲区内原地生成噪声，不再每帧分配新数组
+        # (这里与 send_black_screen 中的判断只用于省去无人显示时的绘制，实际输出由 emit_frame 判断)
+        if self.on_frame is None:
+            return
+        noise = self.frame_pool.acquire()
+        if noise is None:
+            return
+        cv2.randu(noise, 0, 50)
+        self.emit_frame(noise)
+
+    def send_black_screen(self):
+        # 待机画面只绘制一次，并且只在进入待机时发送一次
+        if self._standby_sent or self.on_frame is None:
+            return
+        if self._standby is None:
+            self._standby = np.zeros((480, 640, 3), dtype=np.uint8)
+            cv2.putText(self._standby, "SENSOR STANDBY", (200, 240),
+                       cv2.FONT_HERSHEY_SIMPLEX, 1, (100, 100, 100), 2)
+        self._standby_sent = True
+        self.emit_frame(self._standby)
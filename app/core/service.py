@@ -0,0 +1,204 @@
+# app/core/service.py
+import signal
+import threading
+import time
+
+from app.config import AppConfig
+from app.core.pipeline import AcquisitionPipeline
+from app.core.monitor import HydraulicMonitor
+from app.core.shared_state import SharedState
+from app.core.stations import load_stations, open_station_db
+from app.core.data_bus import get_bus, DETECTIONS, ALERTS, READINGS
+from app.db.database import RecordBuffer
+
+
+class StationRuntime:
+    """
+    一个站点在采集服务中的运行对象：数据库分片、共享状态、数据总线、数据节拍，
+    以及采集流水线 (站点有摄像头时)；站点之间不共享任何可写对象
+    """
+
+    def __init__(self, station, db=None, source=None, on_frame=None):
+        self.station = station
+        self.station_id = station.station_id
+        self.db = db or open_station_db(station)
+        self.state = SharedState(station.station_id)
+        self.bus = get_bus(station.station_id)
+        # 数据节拍只把记录追加到内存，由写库线程定期成批提交
+        self.writer = RecordBuffer(self.db, max_rows=AppConfig.DB_MAX_PENDING)
+        self.monitor = HydraulicMonitor(self.writer, self.state, self.bus, station.calculator)
+        self.pipeline = None
+        if station.has_camera:
+            self.pipeline = AcquisitionPipeline(station.camera if source is None else source, self.db,
+                                                on_frame=on_frame, on_measure=self.monitor.apply_measurement,
+                                                bus=self.bus)
+
+
+class AcquisitionService:
+    """
+    采集服务：采集流水线与数据节拍 (水力计算 + 入库) 各自运行在普通线程中，不依赖 Qt
+    - 无头模式 (main.py --headless) 直接运行
+    - 界面作为客户端：传入 on_frame 接收显示帧，其余数据订阅数据总线
+    - api 为 True (缺省取 AppConfig.API_ENABLED) 时同时开启 HTTP / WebSocket 接口
+    - sensors 为 True (缺省取 AppConfig.SENSORS_ENABLED) 时同时接入传感器
+    多站点 (AppConfig.STATIONS)：每个有摄像头的站点一个采集线程，所有站点共用一个数据节拍线程
+    与一个写库线程；source / db / on_frame 只作用于第一个站点，
+    db / monitor / pipeline 属性也指向第一个站点 (单站点时即唯一的站点)
+    """
+
+    def __init__(self, source=None, db=None, interval=None, on_frame=None, api=None, sensors=None,
+                 stations=None):
+        stations = stations or load_stations()
+        self.stations = {}
+        for i, station in enumerate(stations):
+            first = i == 0
+            self.stations[station.station_id] = StationRuntime(station, db if first else None,
+                                                               source if first else None,
+                                                               on_frame if first else None)
+        default = next(iter(self.stations.values()))
+        self.db = default.db
+        self.monitor = default.monitor
+        self.pipeline = default.pipeline
+        self.interval = AppConfig.MONITOR_INTERVAL if interval is None else interval
+        self.flush_interval = AppConfig.DB_FLUSH_INTERVAL
+        self.api_enabled = AppConfig.API_ENABLED if api is None else api
+        self.api = None
+        self.sensors_enabled = AppConfig.SENSORS_ENABLED if sensors is None else sensors
+        self.ingest = None
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    def station(self, station_id):
+        return self.stations[station_id]
+
+    @property
+    def pipelines(self):
+        return [rt.pipeline for rt in self.stations.values() if rt.pipeline is not None]
+
+    def start(self):
+        self._stop_event.clear()
+        if self.sensors_enabled:
+            from app.ingest.hub import create_ingest_hub  # 延迟导入：不接传感器时不加载接入层
+            self.ingest = create_ingest_hub(self.stations)
+            self.ingest.start()
+        self._threads = [threading.Thread(target=rt.pipeline.run, name=f"acquisition:{sid}", daemon=True)
+                         for sid, rt in self.stations.items() if rt.pipeline is not None]
+        self._threads += [threading.Thread(target=self._tick_loop, name="monitor", daemon=True),
+                          threading.Thread(target=self._flush_loop, name="db-writer", daemon=True)]
+        for t in self._threads:
+            t.start()
+        if self.api_enabled:
+            from app.api.server import create_api_server  # 延迟导入：不开接口时不加载 asyncio 服务
+            self.api = create_api_server(self)
+            self.api.start()
+
+    def _tick_loop(self):
+        monitors = [rt.monitor for rt in self.stations.values()]
+        deadline = time.monotonic()
+        while not self._stop_event.is_set():
+            for monitor in monitors:
+                try:
+                    monitor.tick()
+                except Exception as e:
+                    # 单个站点的计算失败不影响其他站点，也不终止服务
+                    print(f"Warning: 数据节拍异常 ({monitor.state.station}): {e}")
+            # 按截止时间排节拍，严重落后时从当前时刻重新开始
+            deadline += self.interval
+            now = time.monotonic()
+            if now - deadline > self.interval:
+                deadline = now
+            self._stop_event.wait(max(0.0, deadline - now))
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """把各站点攒下的监测记录写入各自的分片 (分片是独立文件，互不加锁)"""
+        written = 0
+        for sid, rt in self.stations.items():
+            try:
+                written += rt.writer.flush()
+            except Exception as e:
+                print(f"Warning: 站点 {sid} 写库失败: {e}")
+        return written
+
+    def stop(self, timeout=5.0):
+        if self.api is not None:
+            self.api.stop(timeout)
+            self.api = None
+        self._stop_event.set()
+        for pipeline in self.pipelines:
+            pipeline.stop()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+        if self.ingest is not None:
+            self.ingest.stop(timeout)
+            self.ingest = None
+        self.flush()
+
+    @property
+    def is_running(self):
+        """服务线程仍在运行且没有因连续出错而停止的采集流水线"""
+        return (any(t.is_alive() for t in self._threads)
+                and not any(p.failed for p in self.pipelines))
+
+    def status(self):
+        st = self.pipeline.fps_ctrl.stats() if self.pipeline is not None else {}
+        totals = {DETECTIONS: 0, ALERTS: 0, READINGS: 0}
+        for rt in self.stations.values():
+            bus = rt.bus.stats()
+            for topic in totals:
+                totals[topic] += bus.get(topic, {}).get("published", 0)
+        out = {"stations": len(self.stations), "ticks": self.monitor.tick_counter,
+               "achieved_fps": st.get("achieved_fps", 0.0), "effective_fps": st.get("effective_fps", 0.0),
+               "paced": st.get("paced", False),
+               "detections": totals[DETECTIONS], "alerts": totals[ALERTS], "readings": totals[READINGS],
+               "errors": sum(p.errors for p in self.pipelines),
+               "failed": [sid for sid, rt in self.stations.items() if rt.pipeline is not None and rt.pipeline.failed]}
+        if self.ingest is not None:
+            out["sensors"] = self.ingest.status()["sensors"]
+        return out
+
+
+def run_headless(source=None, ai=True, duration=None, status_interval=None, api=None, sensors=None):
+    """
+    无头运行采集服务直到 Ctrl+C / SIGTERM (或运行 duration 秒)
+    采集、测量、识别、水力计算、入库与图形界面运行时一致，只是没有显示
+    """
+    if status_interval is None:
+        status_interval = AppConfig.HEADLESS_STATUS_INTERVAL
+    service = AcquisitionService(source, api=api, sensors=sensors)
+    for pipeline in service.pipelines:
+        pipeline.camera_active = True
+        pipeline.ai_enabled = ai
+    stop = threading.Event()
+
+    def handle_signal(signum, frame):
+        stop.set()
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    service.start()
+    print(f"[headless] 采集服务已启动 (stations={len(service.stations)}, cameras={len(service.pipelines)}, "
+          f"source={source if source is not None else 'AppConfig'}, ai={ai})")
+    if service.api is not None:
+        addr = f"{service.api.host}:{service.api.port}"
+        print(f"[headless] 接口: http://{addr}/api/status  ws://{addr}/ws")
+    t0 = time.monotonic()
+    while not stop.is_set():
+        remaining = None if duration is None else duration - (time.monotonic() - t0)
+        if remaining is not None and remaining <= 0:
+            break
+        stop.wait(status_interval if remaining is None else min(status_interval, remaining))
+        st = service.status()
+        target = "回放" if st["paced"] else f"{st['effective_fps']:.0f}"
+        print(f"[headless] ticks={st['ticks']}  fps={st['achieved_fps']:.1f}/{target}  "
+              f"detections={st['detections']}  alerts={st['alerts']}  readings={st['readings']}  "
+              f"errors={st['errors']}")
+        for sid in st["failed"]:
+            print(f"[headless] 站点 {sid} 的采集流水线已停止: {service.station(sid).pipeline.last_error}")
+    service.stop()
+    print("[headless] 已停止")
+    return 0
@@ -1,16 +1,97 @@
 # app/core/shared_state.py
+import dataclasses
+import threading
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class StateSnapshot:
+    """某一时刻的完整共享状态 (不可变)；version 每次实际修改后单调递增"""
+    version: int = 0
+    depth: float = 2.0               # 默认水深 2.0m
+    velocity: float = 1.5            # 默认流速 1.5m/s
+    sediment: float = 0.5            # 默认含沙量
+    is_simulation_mode: bool = True
+    # 图像测量结果 (由采集线程写入)
+    surface_velocity: float = None
+    velocity_confidence: float = 0.0
+    measured_depth: float = None
+    depth_confidence: float = 0.0
+    # 传感器读数 (由传感器接入层按批写入，*_ts 为到达时刻)
+    sensor_depth: float = None
+    sensor_depth_ts: float = 0.0
+    sensor_velocity: float = None
+    sensor_velocity_ts: float = 0.0
+
+
+_FIELDS = frozenset(f.name for f in dataclasses.fields(StateSnapshot)) - {"version"}
+
+
+def _field(name):
+    """读取当前快照中的字段；赋值等价于 update(name=value)"""
+    def fget(self):
+        return getattr(self._snapshot, name)
+
+    def fset(self, value):
+        self.update(**{name: value})
+    return property(fget, fset)
+
+
 class SharedState:
     """
-    单例模式，用于在不同页面间共享实时数据
+    每个站点一个实例 (SharedState() 为默认站点)，用于在不同页面 / 线程间共享实时数据
+    - 状态保存为不可变快照，写入时整体替换 (引用赋值是原子的)，读取无需加锁
+    - 需要多个字段保持一致时先取 snapshot()，再从同一快照读取
+    - version 单调递增，读取方可据此跳过未变化的计算 / 重绘
+    - 写入方之间用锁串行化；多个字段请用 update() 一次写入
     """
-    _instance = None
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(SharedState, cls).__new__(cls)
-            # 设置初始值，防止界面显示 --
-            cls._instance.depth = 2.0      # 默认水深 2.0m
-            cls._instance.velocity = 1.5   # 默认流速 1.5m/s
-            cls._instance.sediment = 0.5   # 默认含沙量
-            cls._instance.is_simulation_mode = True 
-        return cls._instance
\ No newline at end of file
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __new__(cls, station=None):
+        key = station or "default"
+        instance = cls._instances.get(key)
+        if instance is not None:
+            return instance
+        with cls._instances_lock:
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = super(SharedState, cls).__new__(cls)
+                instance.station = key
+                instance._lock = threading.Lock()
+                instance._snapshot = StateSnapshot()  # 设置初始值，防止界面显示 --
+                cls._instances[key] = instance
+            return instance
+
+    def snapshot(self):
+        return self._snapshot
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def update(self, **changes):
+        """原子地修改一个或多个字段，返回新快照 (值没有变化时不增加版本号)"""
+        unknown = changes.keys() - _FIELDS
+        if unknown:
+            raise AttributeError(f"SharedState 没有字段: {', '.join(sorted(unknown))}")
+        with self._lock:
+            old = self._snapshot
+            if all(getattr(old, k) == v for k, v in changes.items()):
+                return old
+            self._snapshot = dataclasses.replace(old, version=old.version + 1, **changes)
+            return self._snapshot
+
+    # 兼容按属性读写单个字段 (state.depth / state.depth = x)
+    depth = _field("depth")
+    velocity = _field("velocity")
+    sediment = _field("sediment")
+    is_simulation_mode = _field("is_simulation_mode")
+    surface_velocity = _field("surface_velocity")
+    velocity_confidence = _field("velocity_confidence")
+    measured_depth = _field("measured_depth")
+    depth_confidence = _field("depth_confidence")
+    sensor_depth = _field("sensor_depth")
+    sensor_depth_ts = _field("sensor_depth_ts")
+    sensor_velocity = _field("sensor_velocity")
+    sensor_velocity_ts = _field("sensor_velocity_ts")
@@ -0,0 +1,80 @@
+# app/core/stage_gauge.py
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+class WaterLevelDetector:
+    """
+    水尺 (或岸边参照物) 水位线识别
+    - 只处理配置的竖条 ROI，按行求灰度均值与列方向纹理 (全部向量化)
+    - 用累加和做一次 O(H) 的阶跃拟合，找出“亮/有刻度”与“水面”之间的分界行
+    - 对最近若干帧的读数做时间中值滤波，抑制波浪与遮挡
+    单帧耗时与 ROI 高度成正比，通常 < 1 ms
+    """
+
+    def __init__(self, roi, rows, levels, window=15, texture_weight=1.0, smooth=5):
+        self.roi = roi                  # (x, y, w, h)，覆盖整根水尺
+        self.rows = rows                # ROI 内两条刻度所在的行 (r0, r1)
+        self.levels = levels            # 对应的水深读数 (m)，如 (5.0, 0.0)
+        self.texture_weight = texture_weight
+        self.smooth = smooth
+        self._history = deque(maxlen=window)
+        self.depth = None
+        self.confidence = 0.0
+
+    def reset(self):
+        self._history.clear()
+        self.depth = None
+        self.confidence = 0.0
+
+    def row_to_depth(self, row):
+        (r0, r1), (h0, h1) = self.rows, self.levels
+        return h0 + (row - r0) * (h1 - h0) / float(r1 - r0)
+
+    def find_waterline(self, gray):
+        """返回 (分界行, 置信度)；gray 为 ROI 内的灰度图"""
+        g = gray.astype(np.float32)
+        # 刻度区：亮且横向纹理强；水面以下：暗且平滑
+        score = g.mean(axis=1) + self.texture_weight * g.std(axis=1)
+        if self.smooth > 1:
+            score = np.convolve(score, np.ones(self.smooth) / self.smooth, mode="same")
+
+        n = len(score)
+        if n < 4:
+            return None, 0.0
+        c = np.cumsum(score)
+        r = np.arange(1, n)
+        above = c[:-1] / r
+        below = (c[-1] - c[:-1]) / (n - r)
+        contrast = np.clip(above - below, 0, None)
+        # 类似 Otsu 的类间方差，避免贴边的伪分界
+        obj = r * (n - r) * contrast ** 2
+        k = int(np.argmax(obj))
+        conf = float(np.clip(contrast[k] / (2.0 * score.std() + 1e-6), 0.0, 1.0))
+        return k + 1, conf
+
+    def process(self, frame):
+        """
+        输入与 AI 识别共享的原始帧
+        返回: {"water_depth": m, "level_confidence": 0~1}
+        """
+        x, y, w, h = self.roi
+        roi = frame[y:y + h, x:x + w]
+        gray = roi if roi.ndim == 2 else cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+        row, conf = self.find_waterline(gray)
+        if row is not None:
+            self._history.append(self.row_to_depth(row))
+            self.depth = max(0.0, float(np.median(self._history)))
+            self.confidence = conf
+        return {"water_depth": self.depth, "level_confidence": self.confidence}
+
+
+def create_level_detector():
+    """按 AppConfig 创建水位识别器，未配置水尺 ROI 时返回 None"""
+    from app.config import AppConfig
+    if not AppConfig.STAGE_ROI:
+        return None
+    return WaterLevelDetector(AppConfig.STAGE_ROI, AppConfig.STAGE_ROWS, AppConfig.STAGE_LEVELS,
+                              window=AppConfig.STAGE_MEDIAN_WINDOW)
@@ -0,0 +1,70 @@
+# app/core/stations.py
+import os
+from dataclasses import dataclass
+
+from app.core.calculator import HydraulicCalculator
+
+DEFAULT_STATION = "default"
+DEFAULT_DB = "canal_data.db"
+
+
+@dataclass(frozen=True, slots=True)
+class Station:
+    """
+    监测站点：编号、名称、采集源与渠道几何参数
+    每个站点有自己的 SharedState、数据总线与数据库分片，互不共享
+    """
+    station_id: str
+    name: str
+    camera: object = None            # 采集源；None 时按 AppConfig.CAMERA_SOURCE，False 表示没有摄像头
+    db_path: str = None              # 数据库分片文件；None 时按站点编号放在 STATION_DB_DIR 下
+    bottom_width: float = HydraulicCalculator.BOTTOM_WIDTH
+    side_slope: float = HydraulicCalculator.SIDE_SLOPE
+    bed_slope: float = HydraulicCalculator.BED_SLOPE
+    roughness: float = HydraulicCalculator.ROUGHNESS
+    surface_coef: float = HydraulicCalculator.SURFACE_COEF
+
+    @property
+    def has_camera(self):
+        return self.camera is not False
+
+    @property
+    def calculator(self):
+        """本站渠道参数的水力计算器"""
+        return HydraulicCalculator.for_channel(self.bottom_width, self.side_slope, self.bed_slope,
+                                               self.roughness, self.surface_coef)
+
+    @property
+    def is_default(self):
+        return self.db_path == DEFAULT_DB
+
+
+def load_stations():
+    """
+    按 AppConfig.STATIONS 创建站点列表 (保持配置顺序)
+    未配置时只有一个默认站点，数据库仍为 canal_data.db，与单站点部署一致
+    """
+    from app.config import AppConfig
+    specs = AppConfig.STATIONS or [{"id": DEFAULT_STATION, "name": "默认站点", "db_path": DEFAULT_DB}]
+    stations = []
+    seen = set()
+    for spec in specs:
+        spec = dict(spec)
+        sid = str(spec.pop("id"))
+        if sid in seen:
+            raise ValueError(f"站点编号重复: {sid}")
+        seen.add(sid)
+        spec.setdefault("name", sid)
+        spec.setdefault("db_path", DEFAULT_DB if sid == DEFAULT_STATION
+                        else os.path.join(AppConfig.STATION_DB_DIR, f"{sid}.db"))
+        stations.append(Station(sid, **spec))
+    return stations
+
+
+def open_station_db(station):
+    """站点的数据库分片 (默认站点同时保存用户表，其余站点只有监测数据)"""
+    from app.db.database import DatabaseManager
+    if station.is_default:
+        return DatabaseManager(station.db_path)
+    os.makedirs(os.path.dirname(station.db_path) or ".", exist_ok=True)
+    return DatabaseManager(station.db_path, shard=True)
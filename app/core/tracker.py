@@ -0,0 +1,184 @@
+# app/core/tracker.py
+import numpy as np
+
+
+class Track:
+    """单个漂浮物轨迹"""
+    __slots__ = ("id", "box", "det_box", "det_ts", "vx", "vy", "hits", "misses",
+                 "label", "confirmed", "crossed", "prev_cx")
+
+    def __init__(self, track_id, box, label, ts):
+        self.id = track_id
+        self.box = np.array(box, dtype=float)  # 当前 (可能是外推的) x, y, w, h
+        self.det_box = self.box.copy()         # 最近一次真实检测的框
+        self.det_ts = ts
+        self.vx = 0.0  # 像素/秒
+        self.vy = 0.0
+        self.hits = 1
+        self.misses = 0
+        self.label = label
+        self.confirmed = False
+        self.crossed = False
+        self.prev_cx = self.centroid[0]
+
+    @property
+    def centroid(self):
+        x, y, w, h = self.box
+        return x + w / 2.0, y + h / 2.0
+
+    @property
+    def speed(self):
+        return float(np.hypot(self.vx, self.vy))
+
+
+def iou_matrix(a, b):
+    """向量化计算两组 (x, y, w, h) 框的 IoU 矩阵"""
+    a = np.asarray(a, dtype=float).reshape(-1, 4)
+    b = np.asarray(b, dtype=float).reshape(-1, 4)
+    ax2, ay2 = a[:, 0] + a[:, 2], a[:, 1] + a[:, 3]
+    bx2, by2 = b[:, 0] + b[:, 2], b[:, 1] + b[:, 3]
+    iw = np.minimum(ax2[:, None], bx2[None, :]) - np.maximum(a[:, 0, None], b[None, :, 0])
+    ih = np.minimum(ay2[:, None], by2[None, :]) - np.maximum(a[:, 1, None], b[None, :, 1])
+    inter = np.clip(iw, 0, None) * np.clip(ih, 0, None)
+    union = (a[:, 2] * a[:, 3])[:, None] + (b[:, 2] * b[:, 3])[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+class DebrisTracker:
+    """
+    IoU + 质心距离的多目标跟踪器
+    - 持久 ID：同一块浮萍在画面中漂移只计数一次
+    - 虚拟计数线：质心跨越竖直线 x = line_x 时累计过线数量
+    - 漂移速度：由相邻两次检测的位移估计 (像素/秒，可换算为 m/s)
+    - 跳帧外推最多外推 max_horizon 秒 (距上次真实检测)，超出后停在该位置等待下一次检测
+    """
+
+    def __init__(self, iou_threshold=0.2, max_distance=80.0, max_misses=8,
+                 min_hits=2, line_x=None, px_per_meter=None, smoothing=0.5, max_horizon=None):
+        self.iou_threshold = iou_threshold
+        self.max_distance = max_distance
+        self.max_misses = max_misses
+        self.min_hits = min_hits
+        self.line_x = line_x
+        self.px_per_meter = px_per_meter
+        self.smoothing = smoothing
+        self.max_horizon = max_horizon  # None 表示不限
+
+        self.tracks = []
+        self.next_id = 1
+        self.unique_count = 0   # 累计出现过的唯一目标数
+        self.crossed_count = 0  # 累计过线数
+
+    def reset(self):
+        self.tracks = []
+        self.unique_count = 0
+        self.crossed_count = 0
+
+    def _match(self, boxes):
+        """贪心匹配：先按 IoU，再按质心距离，返回 [(track_idx, box_idx)]"""
+        if not self.tracks or not boxes:
+            return [], list(range(len(boxes)))
+        t_boxes = np.array([t.box for t in self.tracks])
+        d_boxes = np.array([b[:4] for b in boxes], dtype=float)
+
+        iou = iou_matrix(t_boxes, d_boxes)
+        t_c = t_boxes[:, :2] + t_boxes[:, 2:] / 2.0
+        d_c = d_boxes[:, :2] + d_boxes[:, 2:] / 2.0
+        dist = np.linalg.norm(t_c[:, None, :] - d_c[None, :, :], axis=2)
+
+        # IoU 优先；IoU 不足但质心足够近的也可匹配 (小目标快速漂移)
+        score = np.where(iou >= self.iou_threshold, 1.0 + iou,
+                         np.where(dist <= self.max_distance, 1.0 - dist / self.max_distance, -1.0))
+
+        pairs = []
+        used_t, used_d = set(), set()
+        for flat in np.argsort(-score, axis=None):
+            ti, di = np.unravel_index(flat, score.shape)
+            if score[ti, di] <= 0:
+                break
+            if ti in used_t or di in used_d:
+                continue
+            pairs.append((int(ti), int(di)))
+            used_t.add(ti)
+            used_d.add(di)
+        unmatched = [i for i in range(len(boxes)) if i not in used_d]
+        return pairs, unmatched
+
+    def update(self, boxes, ts):
+        """
+        用一次完整检测结果更新轨迹
+        boxes: [(x, y, w, h, score, label), ...]
+        返回: 本次新确认的轨迹列表
+        """
+        pairs, unmatched = self._match(boxes)
+        matched_t = set()
+        new_confirmed = []
+
+        for ti, di in pairs:
+            t = self.tracks[ti]
+            matched_t.add(ti)
+            t.prev_cx = t.centroid[0]
+            box = np.array(boxes[di][:4], dtype=float)
+            # 速度由两次真实检测之间的位移估计，不受外推误差影响
+            dt = ts - t.det_ts
+            if dt > 0:
+                a = self.smoothing if t.hits > 1 else 0.0
+                dx = (box[0] + box[2] / 2.0) - (t.det_box[0] + t.det_box[2] / 2.0)
+                dy = (box[1] + box[3] / 2.0) - (t.det_box[1] + t.det_box[3] / 2.0)
+                t.vx = a * t.vx + (1 - a) * dx / dt
+                t.vy = a * t.vy + (1 - a) * dy / dt
+            t.box = box
+            t.det_box = box.copy()
+            t.det_ts = ts
+            t.hits += 1
+            t.misses = 0
+            if not t.confirmed and t.hits >= self.min_hits:
+                t.confirmed = True
+                self.unique_count += 1
+                new_confirmed.append(t)
+            self._check_cross(t)
+
+        for i, t in enumerate(self.tracks):
+            if i not in matched_t:
+                t.misses += 1
+
+        for di in unmatched:
+            x, y, w, h, _, label = boxes[di]
+            self.tracks.append(Track(self.next_id, (x, y, w, h), label, ts))
+            self.next_id += 1
+
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+        return new_confirmed
+
+    def predict(self, ts):
+        """跳帧期间按匀速模型外推轨迹 (不做检测)"""
+        for t in self.tracks:
+            dt = ts - t.det_ts
+            if dt <= 0:
+                continue
+            if self.max_horizon is not None:
+                dt = min(dt, self.max_horizon)
+            t.prev_cx = t.centroid[0]
+            t.box[0] = t.det_box[0] + t.vx * dt
+            t.box[1] = t.det_box[1] + t.vy * dt
+            self._check_cross(t)
+        return self.active_tracks()
+
+    def _check_cross(self, t):
+        if self.line_x is None or t.crossed or not t.confirmed:
+            return
+        cx = t.centroid[0]
+        if (t.prev_cx - self.line_x) * (cx - self.line_x) < 0:
+            t.crossed = True
+            self.crossed_count += 1
+
+    def active_tracks(self):
+        return [t for t in self.tracks if t.confirmed and t.misses == 0]
+
+    def drift_speed(self):
+        """已确认轨迹漂移速度的中位数 (有标定时为 m/s，否则为像素/秒)"""
+        speeds = [t.speed for t in self.tracks if t.confirmed]
+        if not speeds:
+            return 0.0
+        v = float(np.median(speeds))
+        return v / self.px_per_meter if self.px_per_meter else v
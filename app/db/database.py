@@ -3,10 +3,24 @@ import sqlite3
 import datetime
 import csv
 import os
+import threading
+
+from app.core.perf import timed
+
+_INSERT_RECORD = ("INSERT INTO monitor_logs (timestamp, depth, velocity, flow_rate, fr_number, flow_state, float_count) "
+                  "VALUES (?, ?, ?, ?, ?, ?, ?)")
+
+
+def _record_row(data):
+    return (datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            data['depth'], data['velocity'], data['flow_rate'], data['fr'], data['state'], data['float_count'])
+
 
 class DatabaseManager:
-    def __init__(self, db_name="canal_data.db"):
+    def __init__(self, db_name="canal_data.db", shard=False):
+        """shard=True 为站点分片：只建监测数据表，使用 WAL 日志 (写入不阻塞读取、提交开销小)"""
         self.db_name = db_name
+        self.shard = shard
         self.create_tables()
 
     def get_connection(self):
@@ -23,6 +37,8 @@ class DatabaseManager:
             depth REAL, velocity REAL, flow_rate REAL, fr_number REAL, 
             flow_state TEXT, float_count INTEGER
         )""")
+        # 按时间范围查询 (HTTP 接口) 使用的索引
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_monitor_logs_timestamp ON monitor_logs (timestamp)")
         
         # 2. 预警记录表
         conn.execute("""
@@ -31,10 +47,31 @@ class DatabaseManager:
             timestamp DATETIME,
             level TEXT,
             message TEXT,
-            status TEXT
+            status TEXT,
+            clip_path TEXT
         )""")
+        # 旧数据库升级：报警表增加录像路径字段
+        cols = [r[1] for r in conn.execute("PRAGMA table_info(alerts)")]
+        if "clip_path" not in cols:
+            conn.execute("ALTER TABLE alerts ADD COLUMN clip_path TEXT")
 
-        # 3. 用户表
+        # 3. 传感器原始读数表 (ts 为到达时刻的 Unix 时间戳)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS sensor_readings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts REAL,
+            sensor TEXT,
+            quantity TEXT,
+            value REAL
+        )""")
+
+        if self.shard:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.commit()
+            conn.close()
+            return
+
+        # 4. 用户表
         conn.execute("""
         CREATE TABLE IF NOT EXISTS users (
             username TEXT PRIMARY KEY,
@@ -54,13 +91,31 @@ class DatabaseManager:
         conn.close()
 
     # --- 数据记录相关 ---
+    @timed("db.insert_record")
     def insert_record(self, data: dict):
         conn = self.get_connection()
-        conn.execute(
-            "INSERT INTO monitor_logs (timestamp, depth, velocity, flow_rate, fr_number, flow_state, float_count) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 
-             data['depth'], data['velocity'], data['flow_rate'], data['fr'], data['state'], data['float_count'])
-        )
+        conn.execute(_INSERT_RECORD, _record_row(data))
+        conn.commit()
+        conn.close()
+
+    @timed("db.insert_records")
+    def insert_records(self, rows):
+        """批量写入 monitor_logs (一个事务)，rows 为 RecordBuffer 攒下的行"""
+        conn = self.get_connection()
+        try:
+            if self.shard:
+                conn.execute("PRAGMA synchronous=NORMAL")  # WAL 下只在检查点同步，断电最多丢最近一批
+            conn.executemany(_INSERT_RECORD, rows)
+            conn.commit()
+        finally:
+            conn.close()  # 失败时未提交的事务随连接关闭回滚，RecordBuffer 重试不会重复写入
+
+    @timed("db.insert_readings")
+    def insert_readings(self, readings):
+        """批量写入传感器读数 (一个事务)"""
+        conn = self.get_connection()
+        conn.executemany("INSERT INTO sensor_readings (ts, sensor, quantity, value) VALUES (?, ?, ?, ?)",
+                         [(r.ts, r.sensor, r.quantity, r.value) for r in readings])
         conn.commit()
         conn.close()
 
@@ -71,6 +126,105 @@ class DatabaseManager:
         conn.close()
         return rows
 
+    def get_history_arrays(self, limit=None, chunk=50000):
+        """
+        按列读取最近 limit 条记录 (limit 为 None 时读取全部)，时间升序
+        返回 {time, depth, velocity, flow_rate, fr, state} 的 NumPy 数组，
+        time 为 datetime64[ms]，供趋势图与表格模型直接使用
+        分块读取并写入预分配的数组，峰值内存与行数成正比且不产生整表的行元组
+        """
+        conn = self.get_connection()
+        total = conn.execute("SELECT COUNT(*) FROM monitor_logs").fetchone()[0]
+        n = total if limit is None else min(int(limit), total)
+        # 先定位第 n 新记录的 id，再按主键顺序扫描 (避免子查询倒序 + 临时排序)
+        first = conn.execute("SELECT id FROM monitor_logs ORDER BY id DESC LIMIT 1 OFFSET ?",
+                             (max(n - 1, 0),)).fetchone()
+        out = self._read_columns(conn, "id >= ?", (first[0] if first else 0,), n, chunk)
+        conn.close()
+        return out
+
+    def get_history_range(self, start=None, end=None, limit=None, chunk=50000):
+        """
+        按时间范围 [start, end) 读取记录 (字符串 "YYYY-MM-DD HH:MM:SS"，None 表示不限)，
+        时间升序，最多 limit 条；返回值与 get_history_arrays 相同
+        """
+        where, params = [], []
+        if start is not None:
+            where.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            where.append("timestamp < ?")
+            params.append(end)
+        where = " AND ".join(where) or "1"
+        conn = self.get_connection()
+        n = conn.execute(f"SELECT COUNT(*) FROM monitor_logs WHERE {where}", params).fetchone()[0]
+        if limit is not None:
+            n = min(int(limit), n)
+        out = self._read_columns(conn, where, params, n, chunk)
+        conn.close()
+        return out
+
+    @staticmethod
+    def _read_columns(conn, where, params, n, chunk):
+        """按主键顺序读取满足条件的前 n 条记录到预分配的列数组"""
+        import numpy as np  # 延迟导入：登录窗口只需要用户表，不必加载 NumPy
+        out = {
+            "time": np.empty(n, dtype="datetime64[ms]"),
+            "depth": np.empty(n, dtype=np.float64),
+            "velocity": np.empty(n, dtype=np.float64),
+            "flow_rate": np.empty(n, dtype=np.float64),
+            "fr": np.empty(n, dtype=np.float64),
+            "state": np.empty(n, dtype=object),
+        }
+        cursor = conn.execute(
+            "SELECT timestamp, depth, velocity, flow_rate, fr_number, flow_state "
+            f"FROM monitor_logs WHERE {where} ORDER BY id LIMIT ?", (*params, n)
+        )
+        names = {}  # 流态只有少数几种，相同字符串共用一个对象
+        i = 0
+        while i < n:
+            rows = cursor.fetchmany(chunk)
+            if not rows:
+                break
+            j = i + len(rows)
+            cols = list(zip(*rows))
+            out["time"][i:j] = np.array(cols[0], dtype="datetime64[ms]")
+            for key, col in zip(("depth", "velocity", "flow_rate", "fr"), cols[1:5]):
+                out[key][i:j] = np.array(col, dtype=np.float64)
+            out["state"][i:j] = [names.setdefault(v, v) for v in cols[5]]
+            i = j
+        if i < n:  # 读取期间有记录被删除
+            out = {k: v[:i] for k, v in out.items()}
+        return out
+
+    # --- 预警记录相关 ---
+    def insert_alert(self, level, message, status="NEW", clip_path=None):
+        """写入一条报警，返回报警 id"""
+        conn = self.get_connection()
+        cursor = conn.execute(
+            "INSERT INTO alerts (timestamp, level, message, status, clip_path) VALUES (?, ?, ?, ?, ?)",
+            (datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), level, message, status, clip_path)
+        )
+        alert_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        return alert_id
+
+    def insert_alerts(self, rows):
+        """批量写入报警/日志记录，rows: [(timestamp, level, message, status), ...]"""
+        conn = self.get_connection()
+        conn.executemany(
+            "INSERT INTO alerts (timestamp, level, message, status) VALUES (?, ?, ?, ?)", rows)
+        conn.commit()
+        conn.close()
+
+    def set_alert_clip(self, alert_id, clip_path):
+        """报警录像写盘完成后关联到报警记录"""
+        conn = self.get_connection()
+        conn.execute("UPDATE alerts SET clip_path=? WHERE id=?", (clip_path, alert_id))
+        conn.commit()
+        conn.close()
+
     def export_to_csv(self, filename="export_data.csv"):
         conn = self.get_connection()
         cursor = conn.execute("SELECT * FROM monitor_logs")
@@ -110,4 +264,43 @@ class DatabaseManager:
             conn.close()
             return True, "注册成功"
         except Exception as e:
-            return False, f"数据库错误: {str(e)}"
\ No newline at end of file
+            return False, f"数据库错误: {str(e)}"
+
+
+class RecordBuffer:
+    """
+    攒批写入 monitor_logs：insert_record() 只在内存中追加一行 (时间戳取调用时刻)，
+    flush() 由写库线程定期调用，一个事务写入；数据节拍因此不等待磁盘
+    与 DatabaseManager.insert_record 接口相同，可直接交给 HydraulicMonitor
+    写库失败时这一批放回缓冲区，下次 flush 重试；积压超过 max_rows 行时丢弃最旧的
+    """
+
+    def __init__(self, db, max_rows=100000):
+        self.db = db
+        self.max_rows = max_rows
+        self.dropped = 0    # 因积压超限被丢弃的行数
+        self._rows = []
+        self._lock = threading.Lock()
+
+    def insert_record(self, data: dict):
+        row = _record_row(data)
+        with self._lock:
+            self._rows.append(row)
+
+    def flush(self):
+        with self._lock:
+            rows, self._rows = self._rows, []
+        if not rows:
+            return 0
+        try:
+            self.db.insert_records(rows)
+        except Exception:
+            with self._lock:
+                # 失败的一批排在这段时间新攒的行之前，保持时间顺序
+                self._rows[:0] = rows
+                excess = len(self._rows) - self.max_rows
+                if excess > 0:
+                    del self._rows[:excess]
+                    self.dropped += excess
+            raise
+        return len(rows)
@@ -0,0 +1,253 @@
+# app/ingest/adapters.py
+import asyncio
+import random
+import re
+import struct
+import time
+
+from app.core.data_bus import Reading
+
+_TOKEN = re.compile(r"([A-Za-z_][\w.]*)\s*[=:]\s*([-+0-9.eE]+)")
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def parse_fields(text, fields):
+    """
+    解析一行 ASCII 报文 "H=1.234, V=0.56" (分隔符不限，= 或 : 均可)，
+    返回 [(物理量, 值)]；fields 为 键 -> 物理量，为 None 时键名即物理量名，未列出的键忽略
+    """
+    out = []
+    for key, value in _TOKEN.findall(text):
+        quantity = key if fields is None else fields.get(key)
+        if quantity is None:
+            continue
+        try:
+            out.append((quantity, float(value)))
+        except ValueError:
+            pass
+    return out
+
+
+class SensorAdapter:
+    """
+    传感器适配器接口
+    run(emit) 在事件循环中一直运行：建立连接 -> session() 读数 -> 断开后按指数退避重连，
+    每条读数在到达时打时间戳，以 emit(Reading) 交给接入中心；
+    各传感器是独立的任务，某一个断线 / 超时只影响它自己
+    """
+
+    def __init__(self, name, station=None, backoff=(0.5, 30.0), timeout=3.0):
+        self.name = name
+        self.station = station  # 所属站点 (None 为接入中心的第一个站点)
+        self.backoff_min, self.backoff_max = backoff
+        self.timeout = timeout
+        self.connected = False
+        self.received = 0
+        self.errors = 0
+        self.reconnects = 0
+        self.last_error = None
+        self.last_ts = 0.0
+
+    async def session(self, emit):
+        """一次连接的完整生命周期，连接断开时返回或抛出异常"""
+        raise NotImplementedError
+
+    def _emit(self, emit, ts, values):
+        for quantity, value in values:
+            emit(Reading(ts, self.name, quantity, value))
+        if values:
+            self.received += len(values)
+            self.last_ts = ts
+
+    async def run(self, emit):
+        delay = self.backoff_min
+        while True:
+            received = self.received
+            try:
+                await self.session(emit)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 连接、协议与适配器自身的任何错误都只导致重连，不会让该传感器停止
+                self.errors += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+            self.connected = False
+            # 上一次连接收到过数据说明链路正常过，从最短等待重新开始退避
+            if self.received > received:
+                delay = self.backoff_min
+            self.reconnects += 1
+            await asyncio.sleep(delay * random.uniform(0.8, 1.2))  # 加抖动，避免多个传感器同时重连
+            delay = min(delay * 2, self.backoff_max)
+
+    def status(self):
+        return {"connected": self.connected, "received": self.received, "errors": self.errors,
+                "reconnects": self.reconnects, "last_error": self.last_error, "last_ts": self.last_ts}
+
+
+class SerialSensor(SensorAdapter):
+    """
+    串口按行输出 ASCII 读数的传感器 (水位计、流速仪常见的 RS-232/485 输出)
+    url 为 tcp://主机:端口 时经串口服务器 (ser2net 等) 连接，否则视为本机串口设备 (需要 pyserial)
+    """
+
+    def __init__(self, name, url, fields=None, baudrate=9600, idle_timeout=10.0, **kwargs):
+        super().__init__(name, **kwargs)
+        self.url = url
+        self.fields = fields
+        self.baudrate = baudrate
+        self.idle_timeout = idle_timeout  # 超过此时长没有任何输出视为断线
+
+    async def session(self, emit):
+        if self.url.startswith("tcp://"):
+            host, port = self.url[6:].rsplit(":", 1)
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, int(port)), self.timeout)
+            self.connected = True
+            try:
+                while True:
+                    line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                    ts = time.time()
+                    if not line:
+                        raise EOFError("连接已关闭")
+                    self._emit(emit, ts, parse_fields(line.decode("ascii", "replace"), self.fields))
+            finally:
+                writer.close()
+        else:
+            await self._serial_session(emit)
+
+    async def _serial_session(self, emit):
+        try:
+            import serial  # 可选依赖：只有直接接本机串口时才需要
+        except ImportError:
+            raise OSError("直接读取串口需要安装 pyserial，或改用 tcp:// 串口服务器") from None
+        loop = asyncio.get_running_loop()
+        # pyserial 是阻塞接口，放到线程中读取，不阻塞其他传感器
+        port = await loop.run_in_executor(None, lambda: serial.Serial(self.url, self.baudrate,
+                                                                      timeout=self.idle_timeout))
+        self.connected = True
+        try:
+            while True:
+                line = await loop.run_in_executor(None, port.readline)
+                ts = time.time()
+                if not line:
+                    raise asyncio.TimeoutError(f"{self.idle_timeout:.0f} 秒内没有输出")
+                self._emit(emit, ts, parse_fields(line.decode("ascii", "replace"), self.fields))
+        except serial.SerialException as e:
+            raise OSError(str(e)) from None
+        finally:
+            port.close()
+
+
+class ModbusTcpSensor(SensorAdapter):
+    """
+    Modbus-TCP 从站：按 interval 轮询保持寄存器 (功能码 0x03)
+    registers: 物理量 -> (寄存器地址, 比例)，寄存器按有符号 16 位整数乘以比例换算，
+    一次请求读出覆盖所有地址的连续区间
+    """
+
+    def __init__(self, name, host, port=502, registers=None, unit=1, interval=1.0, **kwargs):
+        super().__init__(name, **kwargs)
+        self.host = host
+        self.port = port
+        self.registers = registers or {}
+        self.unit = unit
+        self.interval = interval
+        addrs = [a for a, _ in self.registers.values()]
+        self.start = min(addrs) if addrs else 0
+        self.count = max(addrs) - self.start + 1 if addrs else 0
+        self._tid = 0
+
+    def request(self):
+        self._tid = (self._tid + 1) & 0xFFFF
+        return struct.pack(">HHHBBHH", self._tid, 0, 6, self.unit, 0x03, self.start, self.count)
+
+    def decode(self, header, body):
+        tid, proto, length, unit = struct.unpack(">HHHB", header)
+        if tid != self._tid or proto != 0:
+            raise ProtocolError(f"事务号 / 协议号不匹配 ({tid}, {proto})")
+        if len(body) < 2:
+            raise ProtocolError(f"响应过短 ({len(body)} 字节)")
+        if body[0] & 0x80:
+            raise ProtocolError(f"从站返回异常码 {body[1]}")
+        if body[0] != 0x03 or body[1] != 2 * self.count or len(body) != 2 + 2 * self.count:
+            raise ProtocolError("响应长度与请求不符")
+        regs = struct.unpack(f">{self.count}h", body[2:])
+        return [(q, regs[addr - self.start] * scale) for q, (addr, scale) in self.registers.items()]
+
+    async def session(self, emit):
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        self.connected = True
+        try:
+            deadline = time.monotonic()
+            while True:
+                writer.write(self.request())
+                header = await asyncio.wait_for(reader.readexactly(7), self.timeout)
+                length = struct.unpack_from(">H", header, 4)[0]
+                if length < 2:
+                    raise ProtocolError(f"MBAP 长度字段无效 ({length})")
+                body = await asyncio.wait_for(reader.readexactly(length - 1), self.timeout)
+                self._emit(emit, time.time(), self.decode(header, body))
+                # 按截止时间轮询，请求耗时不累积到周期里
+                deadline = max(deadline + self.interval, time.monotonic())
+                await asyncio.sleep(deadline - time.monotonic())
+        finally:
+            writer.close()
+
+
+class _UdpProtocol(asyncio.DatagramProtocol):
+    def __init__(self, sensor, emit, lost):
+        self.sensor = sensor
+        self.emit = emit
+        self.lost = lost
+
+    def datagram_received(self, data, addr):
+        ts = time.time()
+        self.sensor._emit(self.emit, ts, parse_fields(data.decode("ascii", "replace"), self.sensor.fields))
+
+    def error_received(self, exc):
+        self.sensor.errors += 1
+        self.sensor.last_error = f"{type(exc).__name__}: {exc}"
+
+    def connection_lost(self, exc):
+        if not self.lost.done():
+            self.lost.set_result(exc)
+
+
+class UdpSensor(SensorAdapter):
+    """监听 UDP 端口，每个报文为一行或多行 ASCII 读数 (雷达流速仪、无线网关常见)"""
+
+    def __init__(self, name, port, host="0.0.0.0", fields=None, **kwargs):
+        super().__init__(name, **kwargs)
+        self.host = host
+        self.port = port
+        self.fields = fields
+
+    async def session(self, emit):
+        loop = asyncio.get_running_loop()
+        lost = loop.create_future()
+        transport, _ = await loop.create_datagram_endpoint(lambda: _UdpProtocol(self, emit, lost),
+                                                           local_addr=(self.host, self.port))
+        self.connected = True
+        try:
+            exc = await lost
+            if exc is not None:
+                raise exc
+        finally:
+            transport.close()
+
+
+def create_sensor(spec, backoff=(0.5, 30.0), timeout=3.0):
+    """按配置字典创建适配器 (见 AppConfig.SENSORS)"""
+    spec = dict(spec)
+    kind = spec.pop("type")
+    spec.setdefault("backoff", backoff)
+    spec.setdefault("timeout", timeout)
+    if kind == "serial":
+        return SerialSensor(**spec)
+    if kind == "modbus":
+        return ModbusTcpSensor(**spec)
+    if kind == "udp":
+        return UdpSensor(**spec)
+    raise ValueError(f"未知的传感器类型: {kind}")
@@ -0,0 +1,175 @@
+# app/ingest/hub.py
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.data_bus import get_bus, READINGS
+from app.core.shared_state import SharedState
+from app.core.stations import DEFAULT_STATION
+from app.ingest.adapters import create_sensor
+from app.ingest.simulators import SimulatedChannel, create_simulator
+
+
+class _StationSink:
+    """未传入站点时 (单独使用接入中心) 的默认去处：只更新共享状态与总线，不入库"""
+
+    def __init__(self, station):
+        self.state = SharedState(station)
+        self.bus = get_bus(station)
+        self.db = None
+
+
+class IngestHub:
+    """
+    传感器接入中心：在独立线程的事件循环中运行所有适配器 (以及本机模拟设备)
+    读数到达时打时间戳进入当前批次，每 batch_ms 按站点分组交付一次：
+    - 每个物理量的最新值一次性写入该站点的 SharedState (数据节拍的水力计算读取)
+    - 全部读数发布到该站点数据总线的 readings 主题
+    - 全部读数交给写库线程批量写入该站点的分片，事件循环不等待磁盘
+    stations: 站点编号 -> 带 state / bus / db 属性的对象 (采集服务的 StationRuntime)
+    """
+    # 物理量 -> SharedState 中的 (数值字段, 时间戳字段)
+    STATE_FIELDS = {"depth": ("sensor_depth", "sensor_depth_ts"),
+                    "velocity": ("sensor_velocity", "sensor_velocity_ts")}
+
+    def __init__(self, sensors, stations=None, batch_ms=200, simulators=()):
+        self.sensors = list(sensors)
+        self.stations = dict(stations or {})
+        default = next(iter(self.stations), DEFAULT_STATION)
+        self._station_of = {s.name: s.station or default for s in self.sensors}
+        if self.stations:
+            check_sensor_stations(self._station_of, self.stations)
+        self.batch_interval = batch_ms / 1000.0
+        self.simulators = list(simulators)
+        self.delivered = 0
+        self.batches = 0
+        self._batch = []
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-db")
+        self._loop = None
+        self._stopping = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    # ---------- 生命周期 ----------
+    def start(self):
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._main()), name="ingest", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+
+    def stop(self, timeout=5.0):
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._writer.shutdown(wait=True)
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        for sim in self.simulators:
+            try:
+                await sim.start()
+            except OSError as e:
+                print(f"Warning: 模拟设备启动失败 ({type(sim).__name__}:{sim.port}): {e}")
+        tasks = [asyncio.create_task(s.run(self.emit), name=f"sensor-{s.name}") for s in self.sensors]
+        tasks.append(asyncio.create_task(self._flush_loop()))
+        self._ready.set()
+        await self._stopping.wait()
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.flush()
+        for sim in self.simulators:
+            await sim.close()
+
+    # ---------- 读数交付 ----------
+    def emit(self, reading):
+        """适配器在事件循环线程中调用，只追加到当前批次"""
+        self._batch.append(reading)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.batch_interval)
+            self.flush()
+
+    def sink(self, station):
+        sink = self.stations.get(station)
+        if sink is None:
+            sink = self.stations[station] = _StationSink(station)
+        return sink
+
+    def flush(self):
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        groups = {}
+        station_of = self._station_of
+        for r in batch:
+            station = station_of[r.sensor]
+            group = groups.get(station)
+            if group is None:
+                group = groups[station] = []
+            group.append(r)
+        for station, readings in groups.items():
+            self._deliver(self.sink(station), readings)
+        self.delivered += len(batch)
+        self.batches += 1
+
+    def _deliver(self, sink, readings):
+        latest = {}
+        for r in readings:
+            sink.bus.publish(READINGS, r)
+            if r.quantity in self.STATE_FIELDS:
+                prev = latest.get(r.quantity)
+                if prev is None or r.ts >= prev.ts:
+                    latest[r.quantity] = r
+        changes = {}
+        for quantity, r in latest.items():
+            value_field, ts_field = self.STATE_FIELDS[quantity]
+            changes[value_field] = r.value
+            changes[ts_field] = r.ts
+        if changes:
+            sink.state.update(**changes)
+        if sink.db is not None:
+            self._writer.submit(self._write, sink.db, readings)
+
+    def _write(self, db, readings):
+        try:
+            db.insert_readings(readings)
+        except Exception as e:
+            # 单批写库失败不影响接入
+            print(f"Warning: 传感器读数入库失败 ({len(readings)} 条): {e}")
+
+    def status(self):
+        return {"readings": self.delivered, "batches": self.batches,
+                "sensors": {s.name: s.status() for s in self.sensors}}
+
+
+def check_sensor_stations(station_of, stations):
+    """传感器所属站点必须已配置，否则其读数既无人读取也不会入库 (与站点编号重复一样按配置错误处理)"""
+    for name, station in station_of.items():
+        if station not in stations:
+            raise ValueError(f"传感器 {name} 的所属站点未配置: {station}")
+
+
+def create_ingest_hub(stations=None, simulate=None):
+    """
+    按 AppConfig.SENSORS 创建接入中心 (尚未启动)；simulate 缺省取 AppConfig.SENSOR_SIMULATE
+    模拟设备按传感器所属站点的设定值输出
+    """
+    from app.config import AppConfig
+    simulate = AppConfig.SENSOR_SIMULATE if simulate is None else simulate
+    sensors = [create_sensor(spec, AppConfig.SENSOR_BACKOFF, AppConfig.SENSOR_TIMEOUT)
+               for spec in AppConfig.SENSORS]
+    hub = IngestHub(sensors, stations, batch_ms=AppConfig.SENSOR_BATCH_MS)
+    if not stations:
+        from app.core.stations import load_stations
+        check_sensor_stations(hub._station_of, {s.station_id for s in load_stations()})
+    if simulate:
+        channels = {}
+        for spec, sensor in zip(AppConfig.SENSORS, sensors):
+            station = hub._station_of[sensor.name]
+            if station not in channels:
+                channels[station] = SimulatedChannel(SharedState(station))
+            hub.simulators.append(create_simulator(spec, channels[station]))
+    return hub
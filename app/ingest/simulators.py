@@ -0,0 +1,159 @@
+# app/ingest/simulators.py
+import asyncio
+import math
+import random
+import struct
+import time
+
+from app.core.shared_state import SharedState
+
+
+class SimulatedChannel:
+    """模拟渠道：在 SharedState 的设定水深 / 流速上叠加周期波动与随机噪声"""
+
+    def __init__(self, state=None):
+        self.state = state or SharedState()
+
+    def values(self):
+        snap = self.state.snapshot()
+        wave = math.sin(time.time() * 0.5) * 0.03   # 3cm 左右的规则波动
+        jitter = random.uniform(-0.005, 0.005)      # 5mm 左右的随机抖动
+        return {"depth": max(0.0, snap.depth + wave + jitter),
+                "velocity": max(0.0, snap.velocity + wave * 0.5 + jitter)}
+
+
+def _line(fields, values):
+    return ",".join(f"{key}={values[q]:.4f}" for key, q in fields.items() if q in values) + "\r\n"
+
+
+class _StreamSimulator:
+    """TCP 模拟设备的公共部分：记录每个连接，关闭时断开连接并等待处理协程自行退出"""
+
+    def __init__(self, port, host="127.0.0.1", channel=None):
+        self.host = host
+        self.port = port
+        self.channel = channel or SimulatedChannel()
+        self._server = None
+        self._conns = {}
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._accept, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def _accept(self, reader, writer):
+        self._conns[writer] = asyncio.current_task()
+        try:
+            await self._serve(reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._conns.pop(writer, None)
+            writer.close()
+
+    async def _serve(self, reader, writer):
+        raise NotImplementedError
+
+    def drop_clients(self):
+        """断开所有连接 (模拟线缆松动 / 设备重启)"""
+        for w in list(self._conns):
+            w.transport.abort()
+
+    async def close(self):
+        tasks = list(self._conns.values())
+        self.drop_clients()
+        if tasks:
+            await asyncio.wait(tasks, timeout=1.0)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+
+class SerialLineSimulator(_StreamSimulator):
+    """模拟串口服务器：向每个 TCP 连接按 hz 输出一行 ASCII 读数"""
+
+    def __init__(self, port, host="127.0.0.1", fields=None, hz=2.0, channel=None):
+        super().__init__(port, host, channel)
+        self.fields = fields or {"depth": "depth", "velocity": "velocity"}
+        self.hz = hz
+
+    async def _serve(self, reader, writer):
+        # 连接断开后 drain 抛出 ConnectionError 结束循环
+        while True:
+            writer.write(_line(self.fields, self.channel.values()).encode())
+            await writer.drain()
+            await asyncio.sleep(1.0 / self.hz)
+
+
+class ModbusSimulator(_StreamSimulator):
+    """模拟 Modbus-TCP 从站：支持读保持寄存器 (0x03)，寄存器值 = 物理量 / 比例"""
+
+    def __init__(self, port, host="127.0.0.1", registers=None, unit=1, channel=None):
+        super().__init__(port, host, channel)
+        self.registers = registers or {}
+        self.unit = unit
+
+    def read_registers(self, start, count):
+        values = self.channel.values()
+        regs = [0] * count
+        for q, (addr, scale) in self.registers.items():
+            if start <= addr < start + count and q in values:
+                regs[addr - start] = max(-32768, min(32767, round(values[q] / scale)))
+        return regs
+
+    async def _serve(self, reader, writer):
+        while True:
+            tid, proto, length, unit = struct.unpack(">HHHB", await reader.readexactly(7))
+            pdu = await reader.readexactly(length - 1)
+            if pdu[0] == 0x03 and unit == self.unit:
+                start, count = struct.unpack(">HH", pdu[1:5])
+                body = struct.pack(f">BB{count}h", 0x03, 2 * count, *self.read_registers(start, count))
+            else:
+                body = bytes((pdu[0] | 0x80, 0x01))  # 非法功能码
+            writer.write(struct.pack(">HHHB", tid, proto, len(body) + 1, unit) + body)
+            await writer.drain()
+
+
+class UdpSimulator:
+    """模拟 UDP 传感器：按 hz 向目标端口发送 ASCII 读数报文"""
+
+    def __init__(self, port, host="127.0.0.1", fields=None, hz=5.0, channel=None):
+        self.host = host
+        self.port = port
+        self.fields = fields or {"depth": "depth", "velocity": "velocity"}
+        self.hz = hz
+        self.channel = channel or SimulatedChannel()
+        self._transport = None
+        self._task = None
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol,
+                                                                 remote_addr=(self.host, self.port))
+        self._task = asyncio.create_task(self._send_loop())
+
+    async def _send_loop(self):
+        while True:
+            self._transport.sendto(_line(self.fields, self.channel.values()).encode())
+            await asyncio.sleep(1.0 / self.hz)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+        if self._transport is not None:
+            self._transport.close()
+
+
+def create_simulator(spec, channel=None):
+    """为一条传感器配置 (AppConfig.SENSORS) 创建对应地址上的模拟设备"""
+    kind = spec["type"]
+    if kind == "serial":
+        if not spec["url"].startswith("tcp://"):
+            raise ValueError(f"只能模拟 tcp:// 串口服务器: {spec['url']}")
+        host, port = spec["url"][6:].rsplit(":", 1)
+        return SerialLineSimulator(int(port), host, spec.get("fields"), channel=channel)
+    if kind == "modbus":
+        return ModbusSimulator(spec.get("port", 502), spec["host"], spec.get("registers"),
+                               spec.get("unit", 1), channel=channel)
+    if kind == "udp":
+        return UdpSimulator(spec["port"], fields=spec.get("fields"), channel=channel)
+    raise ValueError(f"未知的传感器类型: {kind}")
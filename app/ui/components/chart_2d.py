@@ -1,6 +1,8 @@
 from PySide6.QtWidgets import QWidget
 from PySide6.QtCore import Qt, QTimer, QPoint  # <--- 【关键修复】这里导入 QPoint
-from PySide6.QtGui import QPainter, QBrush, QColor, QPen, QPolygon, QFont
+from PySide6.QtGui import QPainter, QBrush, QColor, QPen, QPolygon, QFont, QPixmap
+from app.core.calculator import HydraulicCalculator
+from app.core.perf import timed
 
 class Channel2DWidget(QWidget):
     def __init__(self):
@@ -8,44 +10,83 @@ class Channel2DWidget(QWidget):
         self.water_depth = 2.0  
         self.max_depth = 5.0    
         self.velocity = 0.0     
+        # 渠道断面几何 (梯形：底宽 b、边坡 1:m)，站点切换时由 set_channel 设置
+        self.bottom_width = HydraulicCalculator.BOTTOM_WIDTH
+        self.side_slope = HydraulicCalculator.SIDE_SLOPE
         # 设置背景色
         self.setStyleSheet("background-color: #1e1e1e; border-radius: 8px; border: 1px solid #333;")
         self.setMinimumHeight(200)
+        # 静态层缓存 (按控件尺寸与渠道几何失效)，动态层每次重绘叠加在上面
+        self._bg = None
+        self._bg_key = None
+        self._painted = None
+        self._font = QFont("Microsoft YaHei", 10)
 
     def set_data(self, depth, velocity):
-        """接收外部数据并刷新界面"""
+        """接收外部数据并刷新界面 (水面、箭头、文字都没有可见变化时不重绘)"""
         self.water_depth = depth
         self.velocity = velocity
-        self.update() # 触发重绘
+        if self._visual_state() != self._painted:
+            self.update() # 触发重绘
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        w = self.width()
-        h = self.height()
-        
-        # 1. 绘制背景
-        painter.fillRect(0, 0, w, h, QColor("#1e1e1e"))
-        
-        # 2. 计算比例
+    def set_channel(self, bottom_width, side_slope):
+        """设置渠道断面几何 (静态层缓存以几何为键，下次重绘时自动重建)"""
+        self.bottom_width = bottom_width
+        self.side_slope = side_slope
+        self.update()
+
+    def _outline(self, w, h):
+        """渠道轮廓 (梯形断面) 的四个顶点与有效高度"""
         margin_x = 40
         margin_y = 30
         effective_h = h - 2 * margin_y
         
-        bottom_w = w - 2 * margin_x - 100
+        # 按断面几何缩放：最大水深处的水面宽 b + 2·m·H 占满可用宽度
         top_w = w - 2 * margin_x
+        span = self.bottom_width + 2 * self.side_slope * self.max_depth
+        offset = int(top_w * self.side_slope * self.max_depth / span) if span > 0 else 0
         
         channel_bottom_y = h - margin_y
         channel_top_y = margin_y
         
-        # 3. 绘制渠道轮廓
         p1 = (margin_x, channel_top_y)
-        p2 = (margin_x + (top_w - bottom_w)//2, channel_bottom_y)
-        p3 = (w - margin_x - (top_w - bottom_w)//2, channel_bottom_y)
+        p2 = (margin_x + offset, channel_bottom_y)
+        p3 = (w - margin_x - offset, channel_bottom_y)
         p4 = (w - margin_x, channel_top_y)
+        return (p1, p2, p3, p4), effective_h
+
+    def _visual_state(self):
+        """决定画面的取整量：水面像素高度、箭头长度与两行文字"""
+        (_, p2, _, _), effective_h = self._outline(self.width(), self.height())
+        water_ratio = min(self.water_depth / self.max_depth, 1.0)
+        arrow = int(min(self.velocity * 20, 80)) if self.water_depth > 0.1 else None
+        return (int(water_ratio * effective_h), arrow,
+                f"{self.water_depth:.2f}", f"{self.velocity:.2f}")
+
+    def _background(self, w, h):
+        """静态层 (背景 + 渠道轮廓) 只在尺寸或几何变化时重新绘制到 QPixmap"""
+        dpr = self.devicePixelRatioF()
+        key = (w, h, dpr, self.max_depth, self.bottom_width, self.side_slope)
+        if self._bg is not None and self._bg_key == key:
+            return self._bg
+
+        pixmap = QPixmap(int(w * dpr), int(h * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        painter = QPainter(pixmap)
+        self._paint_static(painter, w, h)
+        painter.end()
+
+        self._bg, self._bg_key = pixmap, key
+        return pixmap
+
+    def _paint_static(self, painter, w, h):
+        painter.setRenderHint(QPainter.Antialiasing)
+        
+        # 1. 绘制背景
+        painter.fillRect(0, 0, w, h, QColor("#1e1e1e"))
         
-        points = [p1, p2, p3, p4]
+        # 2-3. 计算比例并绘制渠道轮廓
+        points, _ = self._outline(w, h)
         
         # --- 【关键修复】使用 QPoint 而不是 Qt.QPoint ---
         poly_points = [QPoint(int(x), int(y)) for x, y in points]
@@ -55,6 +96,21 @@ class Channel2DWidget(QWidget):
         painter.setPen(pen)
         painter.setBrush(Qt.NoBrush)
         painter.drawPolyline(poly_points)
+
+    @timed("chart_2d.paint")
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        w = self.width()
+        h = self.height()
+        # 静态层直接贴缓存，动态层叠加在上面
+        painter.drawPixmap(0, 0, self._background(w, h))
+        self._paint_dynamic(painter, w, h)
+        # QPainter 会在函数结束时自动销毁，结束绘制状态
+
+    def _paint_dynamic(self, painter, w, h):
+        painter.setRenderHint(QPainter.Antialiasing)
+        (p1, p2, p3, p4), effective_h = self._outline(w, h)
+        channel_bottom_y = p2[1]
         
         # 4. 绘制水体
         water_ratio = min(self.water_depth / self.max_depth, 1.0)
@@ -85,7 +141,7 @@ class Channel2DWidget(QWidget):
         
         # 5. 绘制文字
         painter.setPen(QColor("#fff"))
-        painter.setFont(QFont("Microsoft YaHei", 10))
+        painter.setFont(self._font)
         painter.drawText(int(wp1[0]) + 10, int(wp1[1]) - 5, f"▼ {self.water_depth:.2f}m")
         
         # 6. 绘制流速箭头
@@ -99,4 +155,4 @@ class Channel2DWidget(QWidget):
             painter.drawLine(center_x + int(arrow_len/2), center_y, center_x + int(arrow_len/2)-5, center_y+5)
             painter.drawText(center_x - 20, center_y - 10, f"v={self.velocity:.2f}m/s")
         
-        # QPainter 会在函数结束时自动销毁，结束绘制状态
\ No newline at end of file
+        self._painted = self._visual_state()
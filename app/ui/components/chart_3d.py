@@ -5,7 +5,18 @@ matplotlib.use('qtagg')
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QSizePolicy
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 import numpy as np
+from app.core.calculator import HydraulicCalculator
+from app.core.perf import timed
+
+
+class _Canvas(FigureCanvasQTAgg):
+    # draw_idle 推迟的 Agg 绘制在 paintEvent 中执行，在此统计 3D 重绘耗时
+    @timed("chart_3d.draw")
+    def paintEvent(self, event):
+        super().paintEvent(event)
+
 
 class Channel3DWidget(QWidget):
     def __init__(self, parent=None):
@@ -17,7 +28,7 @@ class Channel3DWidget(QWidget):
         # 1. 更加精致的绘图参数配置
         # facecolor='#1e1e1e' 与界面背景融合
         self.fig = Figure(figsize=(6, 4), dpi=100, facecolor='#1e1e1e')
-        self.canvas = FigureCanvasQTAgg(self.fig)
+        self.canvas = _Canvas(self.fig)
         self.canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.layout.addWidget(self.canvas)
         
@@ -25,62 +36,77 @@ class Channel3DWidget(QWidget):
         # 绘图区背景设为透明，防止出现白色/灰色色块
         self.axes.set_facecolor((0, 0, 0, 0)) 
         
-        # 渠道物理尺寸
-        self.len = 10.0
-        self.wid = 2.0
+        # 渠道物理尺寸 (断面为梯形：底宽 b、边坡 1:m，站点切换时由 set_channel 设置)
         self.max_h = 3.5
-        
-        # 预计算网格 (高分辨率，使表面更平滑)
+        self._set_geometry(HydraulicCalculator.BOTTOM_WIDTH, HydraulicCalculator.SIDE_SLOPE)
+        
+        # 动态图元 (水面与高亮水位线)，静态部分只构建一次
+        self.water = None
+        self.edges = []
+        self._drawn_depth = None
+        # 不含动态图元的背景缓存：水位变化时贴回背景后只重绘动态图元 (blit)
+        self._bg = None
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.mpl_connect('resize_event', self._on_resize)
+
+        # 初始绘制
+        self.rebuild(2.0)
+
+    def _set_geometry(self, bottom_width, side_slope):
+        self.bottom_width = bottom_width
+        self.side_slope = side_slope
+        # 渠顶 (max_h 处) 宽度 b + 2·m·H，Y 轴从左岸顶到右岸顶
+        self.wid = bottom_width + 2 * side_slope * self.max_h
+        # 展示的渠段长度随渠宽放大，保持透视比例
+        self.len = max(10.0, 2.5 * self.wid)
+        # 预计算渠底网格
+        y0, y1 = self._banks(0.0)
         self.X, self.Y = np.meshgrid(
             np.linspace(0, self.len, 50), 
-            np.linspace(0, self.wid, 10)
+            np.linspace(y0, y1, 10)
         )
-        
-        # 初始绘制
-        self.update_water_level(2.0)
 
-    def update_water_level(self, depth):
+    def _banks(self, z):
+        """高度 z 处左右渠壁的 Y 坐标"""
+        inset = self.side_slope * (self.max_h - z)
+        return inset, self.wid - inset
+
+    def set_channel(self, bottom_width, side_slope):
+        """设置渠道断面几何；几何变化时重建整个场景"""
+        if (bottom_width, side_slope) == (self.bottom_width, self.side_slope):
+            return
+        self._set_geometry(bottom_width, side_slope)
+        self.rebuild()
+
+    def rebuild(self, depth=None):
+        """完整重建整个场景 (初始化时调用；常规刷新只更新动态图元)"""
         self.axes.clear()
-        
-        # 限制显示范围
-        d = min(depth, self.max_h)
-        
+        self._build_static()
+        self._build_dynamic(self._drawn_depth if depth is None else depth)
+        self.canvas.draw()
+
+    def _build_static(self):
+        """渠壁框架、渠底、坐标轴样式：与水深无关，只绘制一次"""
         # ================== 1. 绘制极简风格的渠壁 (Frame) ==================
         # 我们不画网格，而是画几根垂直的“刻度柱”，更有科技感
+        bl, br = self._banks(0.0)
         # 底部线条 (左右两条)
-        self.axes.plot([0, self.len], [0, 0], [0, 0], color='#444', linewidth=1)
-        self.axes.plot([0, self.len], [self.wid, self.wid], [0, 0], color='#444', linewidth=1)
+        self.axes.plot([0, self.len], [bl, bl], [0, 0], color='#444', linewidth=1)
+        self.axes.plot([0, self.len], [br, br], [0, 0], color='#444', linewidth=1)
         
         # 顶部线条 (左右两条)
         self.axes.plot([0, self.len], [0, 0], [self.max_h, self.max_h], color='#333', linewidth=0.5, linestyle='--')
         self.axes.plot([0, self.len], [self.wid, self.wid], [self.max_h, self.max_h], color='#333', linewidth=0.5, linestyle='--')
         
-        # 垂直柱子 (每隔1米画一根，类似标尺)
-        for x in range(0, int(self.len) + 1, 2): # 每2米一根
+        # 沿边坡的柱子 (类似标尺)
+        for x in range(0, int(self.len) + 1, max(2, int(self.len) // 5)): # 约 5 段
             # 左墙柱子
-            self.axes.plot([x, x], [0, 0], [0, self.max_h], color='#333', linewidth=0.5)
+            self.axes.plot([x, x], [bl, 0], [0, self.max_h], color='#333', linewidth=0.5)
             # 右墙柱子
-            self.axes.plot([x, x], [self.wid, self.wid], [0, self.max_h], color='#333', linewidth=0.5)
+            self.axes.plot([x, x], [br, self.wid], [0, self.max_h], color='#333', linewidth=0.5)
             # 底部连接线
-            self.axes.plot([x, x], [0, self.wid], [0, 0], color='#333', linewidth=0.5)
+            self.axes.plot([x, x], [bl, br], [0, 0], color='#333', linewidth=0.5)
 
-        # ================== 2. 绘制水体 (Water Body) ==================
-        Z_water = np.full_like(self.X, d)
-        
-        # 绘制水面：去掉了 edgecolor (网格线)，只留纯净的半透明面
-        # alpha=0.4 让它看起来像玻璃/水
-        surf = self.axes.plot_surface(self.X, self.Y, Z_water, color='#00bcd4', alpha=0.4, 
-                                    rstride=5, cstride=5, shade=True, antialiased=True)
-        
-        # ================== 3. 绘制高亮水位线 (Neon Edge) ==================
-        # 这是精致感的关键：在水面边缘画一圈发光的亮线
-        # 左边缘
-        self.axes.plot([0, self.len], [0, 0], [d, d], color='#00e5ff', linewidth=2, alpha=0.9)
-        # 右边缘
-        self.axes.plot([0, self.len], [self.wid, self.wid], [d, d], color='#00e5ff', linewidth=2, alpha=0.9)
-        # 前边缘
-        self.axes.plot([0, 0], [0, self.wid], [d, d], color='#00e5ff', linewidth=2, alpha=0.9)
-        
         # ================== 4. 绘制渠底 (Bed) ==================
         # 用半透明深色填充底部，增加体积感
         Z_bed = np.zeros_like(self.X)
@@ -88,7 +114,7 @@ class Channel3DWidget(QWidget):
 
         # ================== 5. 坐标轴与视角优化 ==================
         # 设定比例：拉长长度，使透视更真实
-        self.axes.set_box_aspect((4, 1, 1.2)) 
+        self.axes.set_box_aspect((4, 4 * self.wid / self.len, 1.2))
         
         self.axes.set_xlim(0, self.len)
         self.axes.set_ylim(0, self.wid)
@@ -122,5 +148,71 @@ class Channel3DWidget(QWidget):
         
         # 最佳视角
         self.axes.view_init(elev=25, azim=-50)
-        
-        self.canvas.draw()
\ No newline at end of file
+
+    def _water_verts(self, d):
+        # 水面是水平面，一个四边形即可 (无需 plot_surface 生成网格)，宽度为该水深下的水面宽
+        yl, yr = self._banks(d)
+        return [[(0, yl, d), (self.len, yl, d), (self.len, yr, d), (0, yr, d)]]
+
+    def _edge_data(self, d):
+        yl, yr = self._banks(d)
+        return [([0, self.len], [yl, yl], [d, d]),    # 左边缘
+                ([0, self.len], [yr, yr], [d, d]),    # 右边缘
+                ([0, 0], [yl, yr], [d, d])]           # 前边缘
+
+    def _build_dynamic(self, depth):
+        d = min(depth, self.max_h)
+        # ================== 2. 绘制水体 (Water Body) ==================
+        # 去掉了 edgecolor (网格线)，只留纯净的半透明面
+        # alpha=0.4 让它看起来像玻璃/水
+        self.water = Poly3DCollection(self._water_verts(d), facecolor='#00bcd4', alpha=0.4,
+                                      edgecolor='none')
+        self.axes.add_collection3d(self.water)
+
+        # ================== 3. 绘制高亮水位线 (Neon Edge) ==================
+        # 这是精致感的关键：在水面边缘画一圈发光的亮线
+        self.edges = [self.axes.plot(xs, ys, zs, color='#00e5ff', linewidth=2, alpha=0.9)[0]
+                      for xs, ys, zs in self._edge_data(d)]
+        # 整图重绘时跳过，由 _draw_dynamic 叠加在背景之上
+        for artist in (self.water, *self.edges):
+            artist.set_animated(True)
+        self._drawn_depth = d
+
+    def _on_resize(self, event):
+        self._bg = None
+
+    def _on_draw(self, event):
+        """整图重绘完成：截取不含动态图元的背景，再把动态图元画上去"""
+        self._bg = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_dynamic()
+
+    def _draw_dynamic(self):
+        # blit 时不经过 Axes3D.draw，水面多边形需按当前视角重新投影后再绘制
+        self.water.do_3d_projection()
+        self.fig.draw_artist(self.water)
+        for line in self.edges:
+            self.fig.draw_artist(line)
+
+    def _meters_per_pixel(self):
+        """Z 轴方向一个像素约对应的水深 (近似：Z 轴约占绘图区高度的一半)"""
+        px = self.axes.bbox.height * 0.5
+        return self.max_h / px if px > 0 else 0.0
+
+    def update_water_level(self, depth, force=False):
+        """只更新水面与水位线图元并 blit 到缓存的背景上；水深变化不足一个像素时跳过重绘"""
+        d = min(depth, self.max_h)
+        if not force and self._drawn_depth is not None \
+                and abs(d - self._drawn_depth) < self._meters_per_pixel():
+            return False
+
+        self.water.set_verts(self._water_verts(d))
+        for line, (xs, ys, zs) in zip(self.edges, self._edge_data(d)):
+            line.set_data_3d(xs, ys, zs)
+        self._drawn_depth = d
+        if self._bg is None:
+            self.canvas.draw_idle()  # 尚无背景缓存 (首次绘制 / 尺寸变化)
+            return True
+        self.canvas.restore_region(self._bg)
+        self._draw_dynamic()
+        self.canvas.blit(self.fig.bbox)
+        return True
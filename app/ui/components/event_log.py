@@ -0,0 +1,126 @@
+# app/ui/components/event_log.py
+import datetime
+from collections import deque
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
+from PySide6.QtGui import QColor
+
+
+class EventLogModel(QAbstractTableModel):
+    """
+    看板系统日志的定长环形缓冲模型 (替代不断 insertRow 的 QTableWidget)
+    - 最多保留 capacity 条，超出时淘汰最早的记录；可选 spill(rows) 回调把淘汰的记录转存
+    - 与上一条类型、内容相同的事件合并为一条并累加计数 (显示为 ×N)
+    - append() 只入待处理队列，定时器每 flush_ms 合并提交一次，视图每批只更新一次
+    """
+    HEADERS = ["TIME", "TYPE", "DESC"]
+    COLORS = {"ALERT": QColor("#ff5252"), "ERROR": QColor("#ffab00")}
+    DEFAULT_COLOR = QColor("#00bcd4")
+    TIME_COLOR = QColor("#666")
+    DESC_COLOR = QColor("#ccc")
+
+    def __init__(self, capacity=500, flush_ms=250, spill=None, parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self.spill = spill
+        self._rows = deque()      # [时间 (完整日期时间), 类型, 内容, 次数]
+        self._pending = []
+        self.evicted = 0
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(flush_ms)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+
+    def append(self, type_, desc):
+        self._pending.append((datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), type_, desc))
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """把待处理事件合并后一次性提交给视图"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+
+        # 1. 合并连续重复的事件 (可与已显示的最后一条合并)
+        new = []
+        touched_last = False
+        for ts, type_, desc in pending:
+            last = new[-1] if new else (self._rows[-1] if self._rows else None)
+            if last is not None and last[1] == type_ and last[2] == desc:
+                last[0] = ts
+                last[3] += 1
+                touched_last = touched_last or not new
+            else:
+                new.append([ts, type_, desc, 1])
+
+        if touched_last:
+            row = len(self._rows) - 1
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+        if not new:
+            return
+
+        # 2. 淘汰最早的记录，为新记录腾出位置
+        spilled = []
+        k = min(len(self._rows), len(self._rows) + len(new) - self.capacity)
+        if k > 0:
+            self.beginRemoveRows(QModelIndex(), 0, k - 1)
+            for _ in range(k):
+                spilled.append(self._rows.popleft())
+            self.endRemoveRows()
+        if len(new) > self.capacity:
+            # 一批内的新事件就超过容量：最早的部分不进入视图，直接转存
+            spilled.extend(new[:-self.capacity])
+            new = new[-self.capacity:]
+        if spilled:
+            self.evicted += len(spilled)
+            if self.spill is not None:
+                self.spill(spilled)
+
+        # 3. 追加新记录
+        n = len(self._rows)
+        self.beginInsertRows(QModelIndex(), n, n + len(new) - 1)
+        self._rows.extend(new)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        ts, type_, desc, count = self._rows[index.row()]
+        col = index.column()
+        if role == Qt.DisplayRole:
+            if col == 0:
+                return ts[11:]  # 只显示时分秒
+            if col == 1:
+                return type_
+            return f"{desc}  ×{count}" if count > 1 else desc
+        if role == Qt.ForegroundRole:
+            if col == 0:
+                return self.TIME_COLOR
+            if col == 1:
+                return self.COLORS.get(type_, self.DEFAULT_COLOR)
+            return self.DESC_COLOR
+        return None
+
+
+def create_event_log_model(db=None, parent=None):
+    """按 AppConfig 创建日志模型；开启转存且传入 db 时，淘汰的记录写入 alerts 表"""
+    from app.config import AppConfig
+    spill = None
+    if db is not None and AppConfig.EVENT_LOG_SPILL:
+        spill = lambda rows: db.insert_alerts(
+            [(ts, type_, desc if n == 1 else f"{desc} ×{n}", "LOG") for ts, type_, desc, n in rows])
+    return EventLogModel(capacity=AppConfig.EVENT_LOG_CAPACITY,
+                         flush_ms=AppConfig.EVENT_LOG_FLUSH_MS, spill=spill, parent=parent)
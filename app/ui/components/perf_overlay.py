@@ -0,0 +1,65 @@
+# app/ui/components/perf_overlay.py
+from PySide6.QtWidgets import QLabel
+from PySide6.QtCore import Qt, QTimer, QEvent
+
+
+class PerfOverlay(QLabel):
+    """
+    性能浮层：叠加在父控件右上角，显示各分段耗时的 p50 / p99 (毫秒)
+    - 只在显示时按 refresh_ms 刷新，隐藏后停止定时器
+    - 不接收鼠标事件，不影响下层控件的操作
+    """
+    # 采集链路上的分段按处理顺序排在前面，其余按名称排序
+    STAGE_ORDER = ["capture", "measure", "ai.detect", "frame_signal", "update_cam_ui", "video.paint",
+                   "monitor.tick", "db.insert_record"]
+
+    def __init__(self, recorder, parent, refresh_ms=500, margin=20):
+        super().__init__(parent)
+        self.recorder = recorder
+        self.margin = margin
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setTextFormat(Qt.TextFormat.PlainText)
+        self.setStyleSheet("background: rgba(0, 0, 0, 190); color: #00e676; padding: 8px;"
+                           "font-family: 'Consolas', 'Menlo', monospace; font-size: 11px;"
+                           "border: 1px solid #333;")
+        self._timer = QTimer(self)
+        self._timer.setInterval(refresh_ms)
+        self._timer.timeout.connect(self.refresh)
+        parent.installEventFilter(self)
+        self.hide()
+
+    def refresh(self):
+        snap = self.recorder.snapshot()
+        stages = snap["stages"]
+        names = [n for n in self.STAGE_ORDER if n in stages]
+        names += [n for n in stages if n not in self.STAGE_ORDER]
+
+        lines = [f"PERF  {snap['elapsed']:.0f}s" + ("" if snap["enabled"] else "  (OFF)"),
+                 f"{'STAGE':<20}{'N':>7}{'P50':>8}{'P99':>8}{'MAX':>8}"]
+        for name in names:
+            s = stages[name]
+            lines.append(f"{name:<20}{s['count']:>7}{s['p50']:>8.2f}{s['p99']:>8.2f}{s['max']:>8.1f}")
+        if not names:
+            lines.append("(暂无数据)")
+        self.setText("\n".join(lines))
+        self.adjustSize()
+        self._place()
+
+    def _place(self):
+        parent = self.parentWidget()
+        self.move(parent.width() - self.width() - self.margin, self.margin)
+        self.raise_()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Resize and self.isVisible():
+            self._place()
+        return False
+
+    def showEvent(self, event):
+        self.refresh()
+        self._timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
@@ -0,0 +1,69 @@
+# app/ui/components/video_view.py
+from PySide6.QtWidgets import QWidget, QSizePolicy
+from PySide6.QtCore import Qt, QRect
+from PySide6.QtGui import QPainter, QImage, QColor, QFont
+from app.core.perf import timed
+
+
+class VideoView(QWidget):
+    """
+    视频显示控件
+    直接用 Format_BGR888 包装 OpenCV 帧 (无颜色转换、无拷贝)，
+    paintEvent 中一次 drawImage 缩放到控件尺寸，GUI 线程每帧只有一次贴图
+    """
+
+    def __init__(self, placeholder="SENSOR STANDBY", parent=None):
+        super().__init__(parent)
+        self.placeholder = placeholder
+        self.pool = None          # 帧来自 FramePool 时，显示完毕后归还
+        self._frame = None        # 持有 ndarray 引用，保证 QImage 底层内存有效
+        self._image = None
+        self._target = QRect()
+        self._bg = QColor("#080808")
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.setMinimumSize(160, 120)
+
+    def set_frame(self, frame):
+        h, w = frame.shape[:2]
+        old = self._frame
+        resized = self._image is None or self._image.width() != w or self._image.height() != h
+        self._frame = frame
+        self._image = QImage(frame.data, w, h, frame.strides[0], QImage.Format.Format_BGR888)
+        if self.pool is not None and old is not None and old is not frame:
+            self.pool.release(old)
+        if resized:
+            self._update_target()
+        self.update()
+
+    def clear(self):
+        if self.pool is not None and self._frame is not None:
+            self.pool.release(self._frame)
+        self._frame = None
+        self._image = None
+        self.update()
+
+    def _update_target(self):
+        """按比例缩放到控件内居中 (仅在尺寸变化时计算)"""
+        if self._image is None:
+            return
+        iw, ih = self._image.width(), self._image.height()
+        scale = min(self.width() / iw, self.height() / ih)
+        tw, th = int(iw * scale), int(ih * scale)
+        self._target = QRect((self.width() - tw) // 2, (self.height() - th) // 2, tw, th)
+
+    def resizeEvent(self, event):
+        self._update_target()
+        super().resizeEvent(event)
+
+    @timed("video.paint")
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self._bg)
+        if self._image is None:
+            painter.setPen(QColor("#444"))
+            painter.setFont(QFont("Segoe UI", 11, QFont.Weight.Bold))
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, self.placeholder)
+            return
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.drawImage(self._target, self._image)
@@ -1,11 +1,29 @@
 # app/ui/main_window.py
 from PySide6.QtWidgets import QMainWindow, QWidget, QHBoxLayout, QStackedWidget
 from app.ui.components.sidebar import Sidebar
-from app.ui.views.dashboard import DashboardView
-from app.ui.views.history import HistoryView
-from app.ui.views.simulator import SimulatorView  # 导入新页面
+
+
+# 页面工厂：视图模块 (及其依赖的 cv2 / matplotlib) 在页面首次打开时才导入
+def _create_dashboard():
+    from app.ui.views.dashboard import DashboardView
+    return DashboardView()
+
+def _create_history():
+    from app.ui.views.history import HistoryView
+    return HistoryView()
+
+def _create_simulator():
+    from app.ui.views.simulator import SimulatorView
+    return SimulatorView()
+
 
 class MainWindow(QMainWindow):
+    PAGE_FACTORIES = {
+        "dashboard": _create_dashboard,
+        "history": _create_history,
+        "simulator": _create_simulator,
+    }
+
     def __init__(self, username="Admin"):
         super().__init__()
         self.resize(1600, 900)
@@ -24,29 +42,49 @@ class MainWindow(QMainWindow):
         self.pages = QStackedWidget()
         self.main_layout.addWidget(self.pages)
         
-        # 实例化页面
-        self.view_dashboard = DashboardView()
-        self.view_history = HistoryView()
-        self.view_simulator = SimulatorView() # 实例化模拟器
-        
-        self.pages.addWidget(self.view_dashboard) # 0
-        self.pages.addWidget(self.view_history)   # 1
-        self.pages.addWidget(self.view_simulator) # 2
-        
-        self.pages.setCurrentIndex(0)
+        # 页面按需实例化：启动时只创建首页 (监测看板)，其余页面首次点击时创建
+        self.views = {}
+        self.pages.setCurrentWidget(self.page("dashboard"))
+
+    def page(self, name):
+        """返回页面实例，首次访问时创建并加入 QStackedWidget"""
+        view = self.views.get(name)
+        if view is None:
+            view = self.PAGE_FACTORIES[name]()
+            self.views[name] = view
+            self.pages.addWidget(view)
+        return view
+
+    @property
+    def view_dashboard(self):
+        return self.page("dashboard")
+
+    @property
+    def view_history(self):
+        return self.page("history")
+
+    @property
+    def view_simulator(self):
+        return self.page("simulator")
+
+    def _show_history(self):
+        # 新建的历史页在构造时已加载数据，已存在时才需要刷新
+        created = "history" not in self.views
+        view = self.page("history")
+        if not created:
+            view.load_data()
+        self.pages.setCurrentWidget(view)
+        return view
 
     def switch_page(self, page_name):
         if page_name == "dashboard":
-            self.pages.setCurrentWidget(self.view_dashboard)
+            self.pages.setCurrentWidget(self.page("dashboard"))
         elif page_name == "history":
-            self.view_history.load_data()
-            self.pages.setCurrentWidget(self.view_history)
+            self._show_history()
         elif page_name == "simulator":
-            self.pages.setCurrentWidget(self.view_simulator)
+            self.pages.setCurrentWidget(self.page("simulator"))
         elif page_name == "export":
             # 跳转到历史页并触发导出（简化交互）
-            self.view_history.load_data()
-            self.view_history.export_data()
-            self.pages.setCurrentWidget(self.view_history)
+            self._show_history().export_data()
         elif page_name == "exit":
-            self.close()
\ No newline at end of file
+            self.close()
@@ -0,0 +1,82 @@
+# app/ui/render_scheduler.py
+import time
+
+from PySide6.QtCore import QObject, QTimer, QEvent
+
+from app.core.perf import get_recorder
+
+_EMPTY = object()
+
+
+class RenderScheduler(QObject):
+    """
+    界面渲染调度：与数据节拍 (计算 + 入库) 解耦
+    - submit(name, value) 只记录最新待渲染的数据，同一帧内多次提交合并为一次渲染
+    - 只渲染当前可见的控件 (所在 Tab / 页面未显示或窗口最小化时保留待渲染数据)，
+      控件重新显示时立即补一帧
+    - 每个控件单独限制最高刷新率，未到时间的数据延后到下一次允许的时刻
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._targets = {}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._frame)
+        self.rendered = 0    # 实际渲染次数
+        self.coalesced = 0   # 被更新的数据覆盖、未单独渲染的提交次数
+        self.hidden = 0      # 因控件不可见而推迟的次数
+        self.perf = get_recorder()
+
+    def register(self, name, widget, render, max_fps=30.0):
+        """render(value) 把数据应用到 widget 上"""
+        self._targets[name] = {"widget": widget, "render": render, "interval": 1.0 / max_fps,
+                               "span": f"render.{name}",
+                               "last": float("-inf"), "pending": _EMPTY}
+        widget.installEventFilter(self)
+
+    def submit(self, name, value):
+        target = self._targets[name]
+        if target["pending"] is not _EMPTY:
+            self.coalesced += 1
+        target["pending"] = value
+        self._schedule(0.0)
+
+    def _schedule(self, delay):
+        ms = max(0, int(delay * 1000))
+        if not self._timer.isActive() or self._timer.remainingTime() > ms:
+            self._timer.start(ms)
+
+    @staticmethod
+    def _visible(widget):
+        return widget.isVisible() and not widget.window().isMinimized()
+
+    def _frame(self):
+        now = time.monotonic()
+        next_due = None
+        for target in self._targets.values():
+            if target["pending"] is _EMPTY:
+                continue
+            if not self._visible(target["widget"]):
+                # 保留最新数据，控件显示时 (Show 事件) 再渲染
+                self.hidden += 1
+                continue
+            due = target["last"] + target["interval"]
+            if now < due:
+                next_due = due if next_due is None else min(next_due, due)
+                continue
+            value, target["pending"] = target["pending"], _EMPTY
+            target["last"] = now
+            with self.perf.span(target["span"]):
+                target["render"](value)
+            self.rendered += 1
+        if next_due is not None:
+            self._schedule(next_due - now)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Show:
+            self._schedule(0.0)
+        return False
+
+    def stats(self):
+        return {"rendered": self.rendered, "coalesced": self.coalesced, "hidden": self.hidden}
@@ -1,20 +1,26 @@
-import datetime
-import math
-import random
-import cv2
-from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFrame, QLabel, 
-                               QPushButton, QTableWidget, QTableWidgetItem, QHeaderView,
-                               QTabWidget, QSizePolicy, QGridLayout)
-from PySide6.QtCore import Qt, Slot, QTimer
-from PySide6.QtGui import QImage, QPixmap, QColor, QFont
+from PySide6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QFrame, QLabel, 
+                               QPushButton, QTableView, QHeaderView,
+                               QTabWidget, QSizePolicy, QGridLayout, QComboBox)
+from PySide6.QtCore import Qt, Slot, QTimer, QObject, Signal
+from PySide6.QtGui import QColor, QFont, QKeySequence, QShortcut
 
 # 引入组件
 from app.ui.components.chart_3d import Channel3DWidget
 from app.ui.components.chart_2d import Channel2DWidget
-from app.core.camera_thread import CameraThread
-from app.core.calculator import HydraulicCalculator
-from app.core.shared_state import SharedState
-from app.db.database import DatabaseManager
+from app.ui.components.video_view import VideoView
+from app.ui.components.event_log import create_event_log_model
+from app.ui.components.perf_overlay import PerfOverlay
+from app.ui.render_scheduler import RenderScheduler
+from app.config import AppConfig
+from app.core.service import AcquisitionService
+from app.core.perf import get_recorder, timed
+from app.core.data_bus import SAMPLES, DETECTIONS, ALERTS
+
+# --- 采集线程 -> 界面线程的显示帧转发 ---
+class FrameBridge(QObject):
+    # 站点编号, 图像, 发送时刻 (性能统计打点，未开启时为 0)；跨线程自动排队到界面线程
+    frame_ready = Signal(str, object, object)
+
 
 # --- 指标卡片类 ---
 class MetricCard(QFrame):
@@ -76,8 +82,19 @@ class DashboardView(QWidget):
         self.layout.setContentsMargins(15, 15, 15, 15)
         self.layout.setSpacing(15)
         
-        self.db = DatabaseManager()
-        self.state = SharedState()
+        # 采集服务 (采集、识别、水力计算与入库都在后台线程)，界面只是它的一个客户端
+        # 看板同一时刻只显示一个站点 (bind_station 切换)，其余站点的采集线程不输出画面
+        self.frame_bridge = FrameBridge(self)
+        self.frame_bridge.frame_ready.connect(self.update_cam_ui)
+        self.service = AcquisitionService()
+        self.db = self.service.db
+        self.station = None
+        self.pipeline = None
+        self.perf = get_recorder()
+        # 报警逐条投递 (进入日志)：订阅全部站点，多站点时日志带站点名
+        multi = len(self.service.stations) > 1
+        self.alert_subs = [(f"[{rt.station.name}] " if multi else "", rt.bus.subscribe(ALERTS, mode="all"))
+                           for rt in self.service.stations.values()]
         self.tick_counter = 0 
         
         # ================= 左侧栏 =================
@@ -94,7 +111,7 @@ class DashboardView(QWidget):
         left_container.addWidget(self.vis_tabs, stretch=45)
         
         # 2. 下半部分：全参数矩阵 (4行2列)
-        metrics_container = QFrame()
+        self.metrics_container = metrics_container = QFrame()
         grid_layout = QGridLayout(metrics_container)
         grid_layout.setContentsMargins(0, 0, 0, 0)
         grid_layout.setSpacing(12) # 卡片间距
@@ -134,20 +151,31 @@ class DashboardView(QWidget):
         cam_layout = QVBoxLayout(cam_frame)
         cam_layout.setContentsMargins(2, 2, 2, 2)
         cam_layout.setSpacing(0)
-        cam_header = QLabel(" 🔴 LIVE VISION FEED | 漂浮物监测")
-        cam_header.setStyleSheet("background: #000; color: #ff5252; font-weight: bold; padding: 6px; font-size: 11px;")
-        cam_layout.addWidget(cam_header)
-        self.cam_label = QLabel("SENSOR STANDBY")
-        self.cam_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.cam_label.setStyleSheet("color: #444; font-weight: bold; background-color: #080808; letter-spacing: 2px;")
-        self.cam_label.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        cam_layout.addWidget(self.cam_label)
+        self.cam_header = QLabel(" 🔴 LIVE VISION FEED | 漂浮物监测")
+        self.cam_header.setStyleSheet("background: #000; color: #ff5252; font-weight: bold; padding: 6px; font-size: 11px;")
+        cam_layout.addWidget(self.cam_header)
+        # 自绘视频控件：BGR 帧直接贴图，不做颜色转换与拷贝
+        self.cam_view = VideoView("SENSOR STANDBY")
+        cam_layout.addWidget(self.cam_view)
         right_container.addWidget(cam_frame, stretch=4)
 
         # 2. 控制按钮
         control_frame = QFrame()
         control_frame.setObjectName("Card")
         ctrl_layout = QVBoxLayout(control_frame)
+        # 站点切换 (只有一个站点时不显示)
+        station_row = QHBoxLayout()
+        station_label = QLabel("📍 监测站点")
+        self.combo_station = QComboBox()
+        for sid, rt in self.service.stations.items():
+            self.combo_station.addItem(rt.station.name, sid)
+        self.combo_station.currentIndexChanged.connect(
+            lambda: self.bind_station(self.combo_station.currentData()))
+        station_row.addWidget(station_label)
+        station_row.addWidget(self.combo_station, stretch=1)
+        station_label.setVisible(self.combo_station.count() > 1)
+        self.combo_station.setVisible(self.combo_station.count() > 1)
+        ctrl_layout.addLayout(station_row)
         btn_row = QHBoxLayout()
         self.btn_cam = QPushButton("🔌 开启传感器")
         self.btn_cam.setCheckable(True)
@@ -158,8 +186,15 @@ class DashboardView(QWidget):
         self.btn_ai.setCursor(Qt.CursorShape.PointingHandCursor)
         self.btn_ai.setEnabled(False)
         self.btn_ai.clicked.connect(self.toggle_ai)
+        # AI 后端选择 (运行时切换)
+        self.combo_backend = QComboBox()
+        self.combo_backend.addItem("HSV 色彩", "hsv")
+        self.combo_backend.addItem("YOLO 模型", "yolo")
+        self.combo_backend.setCurrentIndex(max(0, self.combo_backend.findData(AppConfig.AI_BACKEND)))
+        self.combo_backend.currentIndexChanged.connect(self.change_backend)
         btn_row.addWidget(self.btn_cam)
         btn_row.addWidget(self.btn_ai)
+        btn_row.addWidget(self.combo_backend)
         ctrl_layout.addLayout(btn_row)
         right_container.addWidget(control_frame)
 
@@ -171,13 +206,17 @@ class DashboardView(QWidget):
         log_title = QLabel(" SYSTEM LOGS")
         log_title.setStyleSheet("background: #151924; color: #8da2c0; font-size: 11px; padding: 5px; border-bottom: 1px solid #2a3040;")
         log_layout.addWidget(log_title)
-        self.log_table = QTableWidget()
-        self.log_table.setColumnCount(3)
-        self.log_table.setHorizontalHeaderLabels(["TIME", "TYPE", "DESC"])
+        # 定长环形缓冲模型：日志条数有上限，重复事件合并计数，视图按批刷新
+        self.log_model = create_event_log_model(self.db, parent=self)
+        self.log_table = QTableView()
+        self.log_table.setModel(self.log_model)
         header = self.log_table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Fixed)
+        header.resizeSection(0, 70)
         self.log_table.verticalHeader().setVisible(False)
+        self.log_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.log_model.rowsInserted.connect(lambda *_: self.log_table.scrollToBottom())
         self.log_table.setShowGrid(False)
         self.log_table.setStyleSheet("border: none;")
         log_layout.addWidget(self.log_table)
@@ -185,107 +224,182 @@ class DashboardView(QWidget):
         
         self.layout.addLayout(right_container, stretch=4)
 
-        # 线程与定时器
-        self.cam_thread = CameraThread()
-        self.cam_thread.frame_signal.connect(self.update_cam_ui)
-        self.cam_thread.start()
+        self.bind_station(self.combo_station.currentData())
+        self.service.start()
+        QApplication.instance().aboutToQuit.connect(self.service.stop)
         
-        # --- 【关键】数据刷新定时器 ---
+        # 渲染调度：只重绘可见控件，同一帧合并，并限制各控件的刷新率
+        self.render_scheduler = RenderScheduler(self)
+        self.render_scheduler.register("chart_2d", self.chart_2d, lambda v: self.chart_2d.set_data(*v),
+                             AppConfig.RENDER_FPS_2D)
+        self.render_scheduler.register("chart_3d", self.chart_3d, self.chart_3d.update_water_level,
+                             AppConfig.RENDER_FPS_3D)
+        self.render_scheduler.register("metrics", self.metrics_container, self.show_metrics,
+                             AppConfig.RENDER_FPS_METRICS)
+        self.render_scheduler.register("cam_header", self.cam_header, self.cam_header.setText,
+                             AppConfig.RENDER_FPS_METRICS)
+
+        # --- 界面刷新定时器 (只取总线上的最新数据并提交渲染，计算与入库在采集服务中) ---
         self.timer = QTimer()
-        self.timer.timeout.connect(self.update_simulation)
-        self.timer.start(150) # 150ms 刷新一次，让数据动得更自然
+        self.timer.timeout.connect(self.update_view)
+        self.timer.start(50)
+
+        # 性能统计浮层 (F12 切换：开启统计并显示各分段 p50/p99)
+        self.perf_overlay = PerfOverlay(self.perf, self)
+        self.perf_overlay.setVisible(self.perf.enabled)
+        QShortcut(QKeySequence("F12"), self, self.toggle_perf)
+
+    def bind_station(self, station_id):
+        """切换看板显示的站点：改订阅该站点的总线，画面改由该站点的采集流水线输出"""
+        old = self.station
+        if old is not None:
+            if old.station_id == station_id:
+                return
+            self.sample_sub.close()
+            self.detection_sub.close()
+            if old.pipeline is not None:
+                old.pipeline.on_frame = None
+                old.pipeline.set_visible(False)
+        # 先归还正在显示的帧 (属于旧站点的缓冲池)，再换池
+        self.cam_view.clear()
+        rt = self.service.station(station_id)
+        self.station = rt
+        self.calc = rt.station.calculator
+        # 断面图按该站点的渠道几何绘制
+        self.chart_2d.set_channel(rt.station.bottom_width, rt.station.side_slope)
+        self.chart_3d.set_channel(rt.station.bottom_width, rt.station.side_slope)
+        # 工况与识别结果只取最新 (渲染 / 标题栏)
+        self.sample_sub = rt.bus.subscribe(SAMPLES, mode="latest")
+        self.detection_sub = rt.bus.subscribe(DETECTIONS, mode="latest")
+        self.pipeline = rt.pipeline
+        if self.pipeline is not None:
+            self.cam_view.pool = self.pipeline.frame_pool
+            self.pipeline.on_frame = lambda frame, sent: self.frame_bridge.frame_ready.emit(station_id, frame, sent)
+            self.pipeline.set_visible(self.isVisible())
+        else:
+            self.cam_view.pool = None
+        self.sync_controls()
+        if old is not None:
+            self.add_log("INFO", f"切换到站点 {rt.station.name}")
+
+    def sync_controls(self):
+        """按当前站点采集流水线的状态刷新按钮 (站点没有摄像头时禁用)"""
+        has_cam = self.pipeline is not None
+        cam_on = has_cam and self.pipeline.camera_active
+        ai_on = cam_on and self.pipeline.ai_enabled
+        self.btn_cam.setEnabled(has_cam)
+        self.btn_cam.setChecked(cam_on)
+        self.btn_cam.setText("🔌 关闭传感器" if cam_on else "🔌 开启传感器")
+        self.btn_ai.setEnabled(cam_on)
+        self.btn_ai.setChecked(ai_on)
+        self.btn_ai.setText("🧠 AI 识别中..." if ai_on else "🧠 启动 AI 识别")
+        self.combo_backend.setEnabled(has_cam)
+        if has_cam:
+            self.sync_backend()
+
+    def sync_backend(self):
+        """选择框跟随采集线程实际请求的后端 (加载失败后会恢复为原后端)"""
+        name = self.pipeline.ai_engine.requested_backend
+        if self.combo_backend.currentData() != name:
+            self.combo_backend.blockSignals(True)
+            self.combo_backend.setCurrentIndex(max(0, self.combo_backend.findData(name)))
+            self.combo_backend.blockSignals(False)
 
     def toggle_camera(self):
         is_on = self.btn_cam.isChecked()
-        self.cam_thread.camera_active = is_on
+        # 关闭时由采集线程自行清空测量状态，避免与正在进行的测量竞争
+        self.pipeline.camera_active = is_on
         self.btn_cam.setText("🔌 关闭传感器" if is_on else "🔌 开启传感器")
         self.btn_ai.setEnabled(is_on)
         if not is_on: 
             self.btn_ai.setChecked(False)
             self.toggle_ai()
-            self.cam_label.setText("SENSOR STANDBY")
+            self.cam_view.clear()
 
     def toggle_ai(self):
         is_on = self.btn_ai.isChecked()
-        self.cam_thread.ai_enabled = is_on
+        self.pipeline.ai_enabled = is_on
         self.btn_ai.setText("🧠 AI 识别中..." if is_on else "🧠 启动 AI 识别")
 
+    def showEvent(self, event):
+        if self.pipeline is not None:
+            self.pipeline.set_visible(True)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        # 切换到其他页面或窗口最小化时降低采集帧率
+        if self.pipeline is not None:
+            self.pipeline.set_visible(False)
+        super().hideEvent(event)
+
+    def change_backend(self):
+        # 切换结果 (成功 / 加载失败) 由采集线程经 alerts 主题回报
+        name = self.combo_backend.currentData()
+        self.pipeline.ai_engine.set_backend(name)
+        self.add_log("INFO", f"正在切换识别后端为 {name.upper()}")
+
+    def toggle_perf(self):
+        is_on = not self.perf.enabled
+        self.perf.set_enabled(is_on)
+        self.perf_overlay.setVisible(is_on)
+        self.add_log("INFO", "性能统计已开启" if is_on else "性能统计已关闭")
+
     def add_log(self, type_, desc):
-        row = self.log_table.rowCount()
-        self.log_table.insertRow(row)
-        t_item = QTableWidgetItem(datetime.datetime.now().strftime("%H:%M:%S"))
-        t_item.setForeground(QColor("#666"))
-        self.log_table.setItem(row, 0, t_item)
-        type_item = QTableWidgetItem(type_)
-        type_item.setForeground(QColor("#ff5252" if type_ == "ALERT" else "#00bcd4"))
-        self.log_table.setItem(row, 1, type_item)
-        msg_item = QTableWidgetItem(desc)
-        msg_item.setForeground(QColor("#ccc"))
-        self.log_table.setItem(row, 2, msg_item)
-        self.log_table.scrollToBottom()
+        self.log_model.append(type_, desc)
+
+    @Slot(str, object, object)
+    @timed("update_cam_ui")
+    def update_cam_ui(self, station_id, frame, sent=0):
+        # 采集线程发出信号到界面线程处理之间的排队耗时
+        self.perf.record_since("frame_signal", sent)
+        if station_id != self.station.station_id:
+            # 切换站点前已在队列中的帧：直接归还给所属站点的缓冲池
+            self.service.station(station_id).pipeline.frame_pool.release(frame)
+            return
+        if frame is not None and frame.size > 0:
+            self.cam_view.set_frame(frame)
 
-    @Slot(object, int, str)
-    def update_cam_ui(self, frame, count, msg):
-        if frame is None or frame.size == 0: return
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_frame.shape
-        qt_img = QImage(rgb_frame.data, w, h, ch * w, QImage.Format.Format_RGB888)
-        self.cam_label.setPixmap(QPixmap.fromImage(qt_img.copy()))
-        if count > 0 and msg:
-            last = self.log_table.item(self.log_table.rowCount()-1, 2)
-            if not last or last.text() != msg: self.add_log("ALERT", msg)
+    def update_view(self):
+        """取数据总线上的最新数据提交渲染 (由渲染调度决定何时、是否重绘)"""
+        # 1. 报警转入日志 (连续相同的报警由日志模型合并计数)
+        for prefix, sub in self.alert_subs:
+            for alert in sub.poll():
+                self.add_log(alert.level, prefix + alert.message)
 
-    def update_simulation(self):
-        """让数据动起来的核心逻辑"""
+        # 2. 只渲染最新的工况，界面跟不上时中间的数据直接跳过
+        sample = self.sample_sub.poll()
+        if sample is None:
+            return
         self.tick_counter += 1
-        
-        # 1. 获取基础值 (来自 SharedState)
-        base_depth = self.state.depth
-        base_vel = self.state.velocity
-        
-        # 2. 【关键】生成“呼吸感”波动
-        # 正弦波 (周期变化) + 随机噪声 (瞬时抖动)
-        wave = math.sin(self.tick_counter * 0.08) * 0.03  # 3cm 左右的规则波动
-        jitter = random.uniform(-0.005, 0.005)            # 5mm 左右的随机抖动
-        
-        current_depth = max(0, base_depth + wave + jitter)
-        current_vel = max(0, base_vel + (wave * 0.5) + jitter)
-        
-        # 3. 水力计算
-        area, top_width, _ = HydraulicCalculator.calc_geometry(current_depth)
-        q = HydraulicCalculator.calc_flow_rate(area, current_vel)
-        fr = HydraulicCalculator.calc_froude(current_vel, current_depth)
-        
-        regime = HydraulicCalculator.determine_flow_regime(fr)
-        uniformity = HydraulicCalculator.determine_flow_uniformity(current_depth, current_vel)
-        
-        # 模拟含沙量 (随流速波动)
-        sediment = 0.0
-        if current_vel > 0.1:
-            sediment = (current_vel ** 1.5) * 0.6 + random.uniform(-0.05, 0.05)
-            sediment = max(0, sediment)
+        self.render_scheduler.submit("chart_2d", (sample.depth, sample.velocity))
+        self.render_scheduler.submit("chart_3d", sample.depth)
+        self.render_scheduler.submit("metrics", sample)
 
-        # 4. 更新图表
-        self.chart_2d.set_data(current_depth, current_vel)
-        self.chart_3d.update_water_level(current_depth)
-        
-        # 5. 【关键】更新所有卡片数据
-        self.metric_cards["depth"].set_value(f"{current_depth:.3f}")
-        self.metric_cards["vel"].set_value(f"{current_vel:.3f}")
-        self.metric_cards["flow"].set_value(f"{q:.2f}")
-        self.metric_cards["width"].set_value(f"{top_width:.2f}")
-        self.metric_cards["sediment"].set_value(f"{sediment:.2f}")
-        self.metric_cards["slope"].set_value(f"{HydraulicCalculator.BED_SLOPE}")
+        # 摄像头实际帧率 / 目标帧率 (约每秒刷新一次)
+        if self.tick_counter % 7 == 0 and self.pipeline is not None:
+            self.sync_backend()
+            st = self.pipeline.fps_ctrl.stats()
+            target = "回放" if st["paced"] else f"{st['effective_fps']:.0f}"
+            fps_text = f" | {st['achieved_fps']:.1f}/{target} FPS" if self.pipeline.camera_active else ""
+            det = self.detection_sub.latest if self.pipeline.ai_enabled else None
+            if det is not None:
+                fps_text += f" | 目标 {det.count}"
+            self.render_scheduler.submit("cam_header", f" 🔴 LIVE VISION FEED | 漂浮物监测{fps_text}")
+
+    def show_metrics(self, s):
+        """【关键】更新所有卡片数据"""
+        self.metric_cards["depth"].set_value(f"{s.depth:.3f}")
+        self.metric_cards["vel"].set_value(f"{s.velocity:.3f}")
+        self.metric_cards["flow"].set_value(f"{s.flow_rate:.2f}")
+        self.metric_cards["width"].set_value(f"{s.width:.2f}")
+        self.metric_cards["sediment"].set_value(f"{s.sediment:.2f}")
+        self.metric_cards["slope"].set_value(f"{self.calc.BED_SLOPE}")
         
         # 流态高亮
+        regime = s.regime
         regime_color = "#ff5252" if "急流" in regime else "#00e676"
-        self.metric_cards["regime"].set_value(f"{fr:.2f} | {regime.split(' ')[0]}", regime_color)
+        self.metric_cards["regime"].set_value(f"{s.fr:.2f} | {regime.split(' ')[0]}", regime_color)
         
+        uniformity = s.uniformity
         uni_color = "#00e676" if "均匀" in uniformity and "非" not in uniformity else "#ffab00"
         self.metric_cards["uniformity"].set_value(uniformity.split(' ')[0], uni_color)
-            
-        # 6. 存入数据库
-        self.db.insert_record({
-            "depth": current_depth, "velocity": current_vel, "flow_rate": q,
-            "fr": fr, "state": regime, "float_count": 0
-        })
\ No newline at end of file
@@ -1,21 +1,33 @@
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import matplotlib
 matplotlib.use('qtagg') # 强制使用 Qt 后端防止崩溃
 
-from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, 
-                               QTableWidgetItem, QLabel, QHeaderView, QPushButton, 
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableView, 
+                               QLabel, QHeaderView, QPushButton, 
                                QComboBox, QFrame, QSizePolicy, QDateEdit)
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal, Slot
 from PySide6.QtGui import QColor
 
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
+from matplotlib.collections import PolyCollection
+import matplotlib.dates as mdates
 
-from app.db.database import DatabaseManager
+from app.core.downsample import lttb_indices
+from app.core.stations import load_stations, open_station_db
 
 # --- 1. 趋势图组件 (嵌入在历史页面中) ---
 class HistoryTrendChart(QWidget):
+    """
+    水深/流速趋势图
+    - 曲线图元只创建一次，刷新时 set_data 替换数据，不再 clear + 重新 plot
+    - 可见区间按绘图区像素宽度做 LTTB 降采样，百万级数据也只绘制约一屏像素数的点
+    - 滚轮缩放、左键拖动平移，x 轴范围变化后重新对可见区间降采样
+    - 缩放平移只改变曲线、填充与 x 轴：其余部分 (标题、y 轴、边框) 缓存为背景，
+      刷新时贴回背景后只重绘这几个图元 (blit)，不再整图重绘
+    """
     def __init__(self, parent=None):
         super().__init__(parent)
         layout = QVBoxLayout(self)
@@ -31,26 +43,49 @@ class HistoryTrendChart(QWidget):
         self.ax1.set_facecolor('#1e1e1e')
         self.ax2 = self.ax1.twinx() # 双坐标轴
 
-    def plot(self, times, depths, velocities):
-        self.ax1.clear()
-        self.ax2.clear()
-        
-        # 转换时间格式以便显示
-        x = range(len(times))
-        
-        # 绘制水深 (左轴 - 青色)
-        self.ax1.plot(x, depths, color='#00bcd4', label='水深 (m)', linewidth=2)
+        # 完整数据 (x 为 matplotlib 日期数值)
+        self._x = np.empty(0)
+        self._depth = np.empty(0)
+        self._vel = np.empty(0)
+        self._pan_from = None
+        self._bg = None     # 不含动态图元的背景缓存 (每次整图重绘后重新截取)
+        self._view = None   # 上次降采样时的 (x 范围, 像素宽度)，相同则不重复计算
+
+        # 绘制水深 (左轴 - 青色) / 流速 (右轴 - 绿色)，图元只创建一次
+        self.line_depth, = self.ax1.plot([], [], color='#00bcd4', label='水深 (m)', linewidth=2)
+        self.line_vel, = self.ax2.plot([], [], color='#00e676', label='流速 (m/s)', linewidth=2, linestyle='--')
+        # 水深下方的填充：单个多边形，刷新时原地替换顶点 (不再每次重建 fill_between)
+        self._fill = PolyCollection([], facecolor='#00bcd4', alpha=0.1, edgecolor='none')
+        self.ax1.add_collection(self._fill, autolim=False)
+        self._style_axes()
+        # 随缩放平移变化的图元，按绘制顺序 (网格在最下)；整图重绘时跳过，由 _draw_dynamic 叠加
+        self._dynamic = [self.ax1.xaxis, self._fill, self.line_depth, self.line_vel]
+        for artist in self._dynamic:
+            artist.set_animated(True)
+        # 坐标范围由 plot()/缩放平移管理，关闭自动缩放 (否则 fill_between 会再次扩展 x 范围)
+        self.ax1.set_autoscale_on(False)
+        self.ax2.set_autoscale_on(False)
+
+        for ax in (self.ax1, self.ax2):
+            ax.callbacks.connect('xlim_changed', lambda ax: self._refresh())
+        self.canvas.mpl_connect('scroll_event', self._on_scroll)
+        self.canvas.mpl_connect('button_press_event', self._on_press)
+        self.canvas.mpl_connect('motion_notify_event', self._on_motion)
+        self.canvas.mpl_connect('button_release_event', self._on_release)
+        self.canvas.mpl_connect('resize_event', self._on_resize)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _style_axes(self):
         self.ax1.set_ylabel('水深 (m)', color='#00bcd4')
         self.ax1.tick_params(axis='y', labelcolor='#00bcd4')
         self.ax1.tick_params(axis='x', labelcolor='#888')
-        
-        # 填充水深下方的区域
-        self.ax1.fill_between(x, depths, color='#00bcd4', alpha=0.1)
-
-        # 绘制流速 (右轴 - 绿色)
-        self.ax2.plot(x, velocities, color='#00e676', label='流速 (m/s)', linewidth=2, linestyle='--')
         self.ax2.set_ylabel('流速 (m/s)', color='#00e676')
         self.ax2.tick_params(axis='y', labelcolor='#00e676')
+
+        # 时间轴
+        locator = mdates.AutoDateLocator()
+        self.ax1.xaxis.set_major_locator(locator)
+        self.ax1.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
         
         # 样式调整
         self.ax1.grid(True, linestyle=':', alpha=0.3, color='#555')
@@ -62,8 +97,117 @@ class HistoryTrendChart(QWidget):
         
         # 标题
         self.ax1.set_title("水力要素变化趋势分析", color='white', pad=10)
-        
-        self.canvas.draw()
+
+    @staticmethod
+    def _limits(values, floor=None):
+        lo, hi = float(np.nanmin(values)), float(np.nanmax(values))
+        pad = (hi - lo) * 0.05 or 0.1
+        lo = lo - pad if floor is None else max(floor, lo - pad)
+        return lo, hi + pad
+
+    def plot(self, times, depths, velocities):
+        """times: datetime64 数组 (升序)；depths / velocities: 等长数值数组"""
+        # 等价于 mdates.date2num，但直接做整数运算，百万级数据快一个数量级
+        epoch = np.datetime64(mdates.get_epoch(), 'ms')
+        self._x = (np.asarray(times, dtype='datetime64[ms]') - epoch).astype(np.int64) / 86_400_000.0
+        self._depth = np.asarray(depths, dtype=np.float64)
+        self._vel = np.asarray(velocities, dtype=np.float64)
+        self._view = None
+        self._bg = None  # y 轴范围会变化，需要整图重绘
+        if len(self._x) == 0:
+            self.line_depth.set_data([], [])
+            self.line_vel.set_data([], [])
+            self._fill.set_verts([])
+            self.canvas.draw_idle()
+            return
+
+        # y 轴范围按完整数据确定，缩放平移时保持不变
+        self.ax1.set_ylim(*self._limits(self._depth, floor=0.0))
+        self.ax2.set_ylim(*self._limits(self._vel, floor=0.0))
+        # set_xlim 会触发 xlim_changed -> _refresh
+        self.ax1.set_xlim(*self._full_xlim())
+
+    def _full_xlim(self):
+        x0, x1 = self._x[0], self._x[-1]
+        if x1 <= x0:
+            x0, x1 = x0 - 1 / 1440, x1 + 1 / 1440  # 单点时前后各留一分钟
+        return x0, x1
+
+    def _on_resize(self, event):
+        self._bg = None
+        self._refresh()
+
+    def _on_draw(self, event):
+        """整图重绘完成：截取不含动态图元的背景，再把动态图元画上去"""
+        self._bg = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_dynamic()
+
+    def _draw_dynamic(self):
+        for artist in self._dynamic:
+            self.fig.draw_artist(artist)
+
+    def _refresh(self):
+        """对当前可见区间按像素宽度降采样后更新曲线数据"""
+        if len(self._x) == 0:
+            return
+        lo, hi = self.ax1.get_xlim()
+        # 双坐标轴共享 x 轴：先触发的回调里另一个坐标轴还是旧范围，两者一致后才刷新
+        if self.ax2.get_xlim() != (lo, hi):
+            return
+        n_out = max(3, int(self.ax1.bbox.width))
+        if self._view == (lo, hi, n_out):
+            return
+        self._view = (lo, hi, n_out)
+        # 多取可见区间两侧各一个点，保证曲线延伸到边界
+        i0 = max(0, int(np.searchsorted(self._x, lo)) - 1)
+        i1 = min(len(self._x), int(np.searchsorted(self._x, hi)) + 1)
+        x = self._x[i0:i1]
+
+        idx = lttb_indices(x, self._depth[i0:i1], n_out)
+        xd, yd = x[idx], self._depth[i0:i1][idx]
+        self.line_depth.set_data(xd, yd)
+        idx = lttb_indices(x, self._vel[i0:i1], n_out)
+        self.line_vel.set_data(x[idx], self._vel[i0:i1][idx])
+
+        # 填充水深下方的区域 (曲线两端落到 y=0 围成的多边形)
+        self._fill.set_verts([np.column_stack([np.r_[xd[0], xd, xd[-1]], np.r_[0.0, yd, 0.0]])])
+
+        if self._bg is None:
+            self.canvas.draw_idle()  # 尚无背景缓存 (首次绘制 / 尺寸或 y 轴变化)
+            return
+        self.canvas.restore_region(self._bg)
+        self._draw_dynamic()
+        self.canvas.blit(self.fig.bbox)
+
+    # ---------- 交互：滚轮缩放 / 拖动平移 ----------
+    def _set_xlim_clamped(self, lo, hi):
+        full_lo, full_hi = self._full_xlim()
+        span = min(hi - lo, full_hi - full_lo)
+        lo = min(max(lo, full_lo), full_hi - span)
+        self.ax1.set_xlim(lo, lo + span)
+
+    def _on_scroll(self, event):
+        if event.inaxes is None or len(self._x) == 0:
+            return
+        lo, hi = self.ax1.get_xlim()
+        # 以鼠标位置为中心缩放 (event.xdata 为 ax2 的坐标，与 ax1 共享 x 轴)
+        k = 0.8 if event.button == 'up' else 1.25
+        self._set_xlim_clamped(event.xdata - (event.xdata - lo) * k,
+                               event.xdata + (hi - event.xdata) * k)
+
+    def _on_press(self, event):
+        if event.button == 1 and event.inaxes is not None:
+            self._pan_from = (event.x, self.ax1.get_xlim())
+
+    def _on_motion(self, event):
+        if self._pan_from is None:
+            return
+        x_px, (lo, hi) = self._pan_from
+        shift = (event.x - x_px) / max(self.ax1.bbox.width, 1) * (hi - lo)
+        self._set_xlim_clamped(lo - shift, hi - shift)
+
+    def _on_release(self, event):
+        self._pan_from = None
 
 # --- 2. 统计卡片组件 ---
 class StatCard(QFrame):
@@ -84,15 +228,109 @@ class StatCard(QFrame):
     def set_value(self, val):
         self.lbl_v.setText(str(val))
 
-# --- 3. 主视图 ---
+# --- 3. 表格模型 (虚拟表格：只为可见行格式化文本) ---
+class HistoryTableModel(QAbstractTableModel):
+    """
+    历史数据表格模型
+    - 数据按列保存为 NumPy 数组 (来自 get_history_arrays)，不再为每个单元格创建 QTableWidgetItem
+    - data() 只在视图请求可见单元格时才格式化文本与颜色，百万行也只占数组本身的内存
+    - 流态字符串按类别编码 (少量类别 + 每行一个整数)，颜色按类别预先算好
+    - 最新的记录显示在最上方 (数组为时间升序，行号倒序映射)
+    """
+    HEADERS = ["时间", "水深(m)", "流速(m/s)", "流量(m³/s)", "Fr数", "流态"]
+    COLUMNS = [("depth", "{:.3f}"), ("velocity", "{:.3f}"), ("flow_rate", "{:.2f}"), ("fr", "{:.3f}")]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._n = 0
+        self._time = np.empty(0, dtype="datetime64[ms]")
+        self._values = [np.empty(0)] * len(self.COLUMNS)
+        self._state_names = []
+        self._state_codes = np.empty(0, dtype=np.int32)
+        self._state_style = []
+
+    @staticmethod
+    def encode_states(states):
+        """流态按类别编码，返回 (类别名列表, 每行类别号)；百万行约 0.5 s，可在工作线程中预先计算"""
+        names, codes = np.unique(states.astype(str), return_inverse=True)
+        return [str(n) for n in names], codes.astype(np.int32)
+
+    def set_columns(self, data, states=None):
+        """替换全部数据 (data 为 get_history_arrays 的返回值，states 为 encode_states 的结果，缺省时现场编码)"""
+        if states is None:
+            states = self.encode_states(data["state"])
+        self.beginResetModel()
+        self._n = len(data["time"])
+        self._time = data["time"]
+        self._values = [data[key] for key, _ in self.COLUMNS]
+        self._state_names, self._state_codes = states
+        self._state_style = [self._style(n) for n in self._state_names]
+        self.endResetModel()
+
+    @staticmethod
+    def _style(state):
+        # 智能高亮：急流标红 (深红背景)，缓流标绿
+        if "急流" in state:
+            return QColor("#ff5252"), QColor(60, 0, 0)
+        if "缓流" in state:
+            return QColor("#00e676"), None
+        return None, None
+
+    def state_mask(self, keyword):
+        """流态包含 keyword 的行 (按类别判断后展开，不逐行比较字符串)"""
+        hit = np.array([keyword in n for n in self._state_names], dtype=bool)
+        return hit[self._state_codes] if len(hit) else np.zeros(self._n, dtype=bool)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._n
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        i = self._n - 1 - index.row()
+        col = index.column()
+        if role == Qt.DisplayRole:
+            if col == 0:
+                return str(self._time[i].astype("datetime64[s]")).replace("T", " ")
+            if col == 5:
+                return self._state_names[self._state_codes[i]]
+            fmt = self.COLUMNS[col - 1][1]
+            return fmt.format(self._values[col - 1][i])
+        if col == 5 and role in (Qt.ForegroundRole, Qt.BackgroundRole):
+            fg, bg = self._state_style[self._state_codes[i]]
+            return fg if role == Qt.ForegroundRole else bg
+        return None
+
+# --- 4. 主视图 ---
 class HistoryView(QWidget):
+    data_ready = Signal(int, object)
+
     def __init__(self):
         super().__init__()
         layout = QVBoxLayout(self)
-        self.db = DatabaseManager()
+        # 每个站点的数据在各自的分片中，切换站点即切换数据库
+        self.stations = {s.station_id: s for s in load_stations()}
+        self.station = next(iter(self.stations.values()))
+        self.db = open_station_db(self.station)
         
         # === 顶部工具栏 ===
         tool_bar = QHBoxLayout()
+        # 站点选择 (只有一个站点时不显示)
+        self.combo_station = QComboBox()
+        for sid, station in self.stations.items():
+            self.combo_station.addItem(station.name, sid)
+        self.combo_station.setStyleSheet("background: #252525; color: white; padding: 5px;")
+        self.combo_station.currentIndexChanged.connect(self.change_station)
+        self.combo_station.setVisible(len(self.stations) > 1)
+        tool_bar.addWidget(self.combo_station)
         tool_bar.addWidget(QLabel("📅 数据筛选:"))
         
         # 数量筛选
@@ -101,6 +339,9 @@ class HistoryView(QWidget):
         self.combo_limit.setStyleSheet("background: #252525; color: white; padding: 5px;")
         self.combo_limit.currentIndexChanged.connect(self.load_data)
         tool_bar.addWidget(self.combo_limit)
+        self.lbl_loading = QLabel("")
+        self.lbl_loading.setStyleSheet("color: #888;")
+        tool_bar.addWidget(self.lbl_loading)
         
         tool_bar.addStretch()
         
@@ -134,79 +375,83 @@ class HistoryView(QWidget):
 
         # === 数据表格 ===
         layout.addWidget(QLabel("📋 详细数据列表"))
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["时间", "水深(m)", "流速(m/s)", "流量(m³/s)", "Fr数", "流态"])
+        self.model = HistoryTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # 固定行高：视图无需逐行测量，滚动百万行时只查询可见行
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(28)
         self.table.setStyleSheet("""
-            QTableWidget { background-color: #1e1e1e; alternate-background-color: #252525; }
-            QTableWidget::item { padding: 5px; }
+            QTableView { background-color: #1e1e1e; alternate-background-color: #252525; }
+            QTableView::item { padding: 5px; }
         """)
         self.table.setAlternatingRowColors(True) # 斑马纹
         layout.addWidget(self.table)
         
+        # 读库与流态编码放到工作线程 (全部数据可达百万行、耗时数秒)，结果经信号回到 GUI 线程
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._request = 0
+        self._pending = None
+        self.data_ready.connect(self._on_data_ready)
+
         # 初始加载
         self.load_data()
 
+    def change_station(self):
+        self.station = self.stations[self.combo_station.currentData()]
+        self.db = open_station_db(self.station)
+        self.load_data()
+
     def load_data(self):
+        """在后台读取当前站点的数据；连续切换筛选条件时只应用最后一次请求的结果"""
         # 1. 获取筛选条件
         limit_text = self.combo_limit.currentText()
         if "50" in limit_text: limit = 50
         elif "200" in limit_text: limit = 200
         elif "1000" in limit_text: limit = 1000
-        else: limit = 5000
-        
-        # 2. 从数据库读取
-        rows = self.db.get_history(limit)
-        
-        # 准备数据用于绘图和统计
-        times = []
-        depths = []
-        vels = []
-        alert_count = 0
-        
-        self.table.setRowCount(len(rows))
-        
-        # 3. 填充表格 & 收集数据
-        for i, row in enumerate(rows):
-            # row: (id, time, depth, vel, q, fr, state, float)
-            t_str, h, v, q, fr, state = row[1], row[2], row[3], row[4], row[5], row[6]
-            
-            times.append(t_str)
-            depths.append(h)
-            vels.append(v)
-            
-            if "急流" in state:
-                alert_count += 1
-            
-            # 填表
-            self.table.setItem(i, 0, QTableWidgetItem(str(t_str)))
-            self.table.setItem(i, 1, QTableWidgetItem(f"{h:.3f}"))
-            self.table.setItem(i, 2, QTableWidgetItem(f"{v:.3f}"))
-            self.table.setItem(i, 3, QTableWidgetItem(f"{q:.2f}"))
-            self.table.setItem(i, 4, QTableWidgetItem(f"{fr:.3f}"))
-            
-            item_state = QTableWidgetItem(state)
-            # 智能高亮：如果是急流，把这一行的状态标红
-            if "急流" in state:
-                item_state.setForeground(QColor("#ff5252"))
-                item_state.setBackground(QColor(60, 0, 0)) # 深红背景
-            elif "缓流" in state:
-                item_state.setForeground(QColor("#00e676"))
-                
-            self.table.setItem(i, 5, item_state)
-
-        # 4. 更新趋势图 (翻转数据，因为数据库是倒序出来的)
-        if len(times) > 0:
-            self.chart.plot(list(reversed(times)), list(reversed(depths)), list(reversed(vels)))
-            
+        else: limit = None  # 全部数据 (虚拟表格与降采样趋势图不受行数限制)
+
+        # 2. 从数据库按列读取 (时间升序的 NumPy 数组)，界面保持可操作
+        self._request += 1
+        request = self._request
+        self.lbl_loading.setText("⏳ 正在加载...")
+        if self._pending is not None:
+            self._pending.cancel()  # 尚未开始的旧请求直接取消 (已在读库的无法中断，结果会被丢弃)
+        self._pending = future = self._executor.submit(self._fetch, self.db, limit)
+        # 回调在工作线程执行，经信号排队回到 GUI 线程
+        future.add_done_callback(lambda f: self.data_ready.emit(request, f))
+
+    @staticmethod
+    def _fetch(db, limit):
+        data = db.get_history_arrays(limit)
+        return data, HistoryTableModel.encode_states(data["state"])
+
+    @Slot(int, object)
+    def _on_data_ready(self, request, future):
+        if request != self._request:
+            return  # 已有更新的请求，丢弃过期结果
+        self.lbl_loading.setText("")
+        try:
+            data, states = future.result()
+        except Exception as e:
+            print(f"Warning: 读取历史数据失败: {e}")
+            self.lbl_loading.setText("⚠ 读取失败")
+            return
+        times, depths, vels = data["time"], data["depth"], data["velocity"]
+        n = len(times)
+
+        # 3. 表格只替换模型数据，单元格文本在滚动到可见时才生成
+        self.model.set_columns(data, states)
+        is_alert = self.model.state_mask("急流")
+
+        # 4. 更新趋势图 (数组已是时间升序，无需翻转)
+        self.chart.plot(times, depths, vels)
+        if n > 0:
             # 5. 更新统计面板
-            max_h = max(depths)
-            avg_v = sum(vels) / len(vels)
-            
-            self.card_max_depth.set_value(f"{max_h:.3f} m")
-            self.card_avg_vel.set_value(f"{avg_v:.3f} m/s")
-            self.card_alert_count.set_value(f"{alert_count} 次")
+            self.card_max_depth.set_value(f"{np.nanmax(depths):.3f} m")
+            self.card_avg_vel.set_value(f"{np.nanmean(vels):.3f} m/s")
+            self.card_alert_count.set_value(f"{int(is_alert.sum())} 次")
         else:
             self.card_max_depth.set_value("--")
             self.card_avg_vel.set_value("--")
@@ -214,5 +459,8 @@ class HistoryView(QWidget):
 
     def export_data(self):
         from PySide6.QtWidgets import QMessageBox
-        path = self.db.export_to_csv()
+        if self.station.is_default:
+            path = self.db.export_to_csv()
+        else:
+            path = self.db.export_to_csv(f"export_data_{self.station.station_id}.csv")
         QMessageBox.information(self, "导出成功", f"数据已保存至:\n{path}")
\ No newline at end of file
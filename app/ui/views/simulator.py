@@ -1,21 +1,94 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import datetime  # <--- 标准导入
 import matplotlib
 matplotlib.use('qtagg') 
 
-from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFrame, QLabel, 
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFrame, QLabel, QComboBox,
                                QSlider, QPushButton, QTextEdit, QProgressBar, QSizePolicy)
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt, QTimer, Signal, Slot
 from PySide6.QtGui import QColor, QFont
 
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
 
+from app.config import AppConfig
 from app.core.shared_state import SharedState
+from app.core.stations import load_stations
 from app.core.calculator import HydraulicCalculator
 
+# --- 0. 工况分析 (纯计算，在后台线程执行) ---
+def analyze_scenario(h, v, g=9.81):
+    """
+    计算比能曲线与决策建议，返回可直接用于界面刷新的 dict
+    不访问任何 Qt 对象，可在工作线程中运行
+    """
+    result = {"h": h, "v": v, "curve": None}
+    if h > 0:
+        # 计算比能曲线 E = h + v^2 / 2g
+        # 假设单宽流量 q = h * v (常数)
+        q = h * v
+        # 生成 h 序列 (避免 0)
+        h_vals = np.linspace(0.1, 6.0, 100)
+        # 对应的 E 值
+        e_vals = h_vals + (q**2) / (2 * g * h_vals**2)
+        result["curve"] = {
+            "h": h, "q": q, "h_vals": h_vals, "e_vals": e_vals,
+            "current_e": h + (v**2) / (2 * g),   # 当前点的 E
+            "hc": (q**2 / g)**(1/3),             # 临界水深 (Fr=1)
+        }
+
+    # 水力计算
+    fr = HydraulicCalculator.calc_froude(v, h)
+    
+    # 生成决策建议
+    advice = []
+    score = 100
+    
+    # --- 【修复】正确使用 datetime.datetime.now() ---
+    now_str = datetime.datetime.now().strftime('%H:%M:%S')
+    advice.append(f"⏱️ 分析时间: {now_str}")
+    advice.append(f"📊 当前状态: Fr={fr:.2f}")
+    advice.append("-" * 30)
+
+    if h <= 0.1:
+        advice.append("🔴 [严重] 渠道干涸！")
+        advice.append("   - 建议: 立即检查上游闸门开启情况。")
+        advice.append("   - 建议: 停止所有引水作业。")
+        score = 0
+    elif fr > 1.2:
+        advice.append("🔴 [警告] 出现急流 (Supercritical Flow)")
+        advice.append("   - 风险: 渠底冲刷风险极高，消力池可能失效。")
+        advice.append(f"   - 建议: 需降低流速至 {v*0.8:.1f} m/s 以下。")
+        advice.append("   - 建议: 增大下游糙率或启用跌水消能。")
+        score -= 40
+    elif fr < 1.0 and v > 3.0:
+        advice.append("🟡 [注意] 流速过大")
+        advice.append("   - 风险: 可能对衬砌造成磨损。")
+        score -= 20
+    elif fr < 0.5:
+        advice.append("🟢 [正常] 缓流状态，水流平稳。")
+        advice.append("   - 适宜进行流量观测和水质取样。")
+    else:
+        advice.append("🟡 [临界] 接近临界流状态 (Fr ≈ 1)")
+        advice.append("   - 风险: 水面极不稳定，易产生波状跳跃。")
+        advice.append("   - 建议: 调整工况避开 Fr=1.0 区域。")
+        score -= 10
+        
+    if h > 4.0:
+        advice.append("🔴 [报警] 水位接近堤顶！")
+        advice.append("   - 建议: 紧急开启泄洪闸。")
+        score -= 50
+
+    result["advice"] = "\n".join(advice)
+    result["score"] = max(0, score)
+    return result
+
 # --- 1. 专业图表：比能曲线 (Specific Energy Curve) ---
 class EnergyCurveChart(QWidget):
+    """比能曲线图：图元只创建一次，刷新时原地更新数据"""
     def __init__(self, parent=None):
         super().__init__(parent)
         layout = QVBoxLayout(self)
@@ -28,39 +101,14 @@ class EnergyCurveChart(QWidget):
         
         self.ax = self.fig.add_subplot(111)
         self.ax.set_facecolor('#151924')
-        
-        # 初始绘制
-        self.plot(2.0, 1.5)
 
-    def plot(self, current_h, current_v):
-        self.ax.clear()
-        
-        # 计算比能曲线 E = h + v^2 / 2g
-        # 假设单宽流量 q = h * v (常数)
-        g = 9.81
-        if current_h <= 0: current_h = 0.1
-        q = current_h * current_v 
-        
-        # 生成 h 序列 (避免 0)
-        h_vals = np.linspace(0.1, 6.0, 100)
-        # 对应的 E 值
-        e_vals = h_vals + (q**2) / (2 * g * h_vals**2)
-        
-        # 绘制曲线
-        self.ax.plot(e_vals, h_vals, color='#444', linewidth=1.5, linestyle='--', label='比能曲线')
-        
-        # 计算当前点的 E
-        current_e = current_h + (current_v**2) / (2 * g)
-        
-        # 绘制当前状态点
-        self.ax.scatter([current_e], [current_h], color='#00e5ff', s=100, zorder=5, label='当前工况')
-        
-        # 绘制临界水深线 (Fr=1)
-        hc = (q**2 / g)**(1/3)
-        self.ax.axhline(y=hc, color='#ff5252', linestyle=':', alpha=0.5, label='临界水深')
+        # 比能曲线 / 当前工况点 / 临界水深线
+        self.curve, = self.ax.plot([], [], color='#444', linewidth=1.5, linestyle='--', label='比能曲线')
+        self.point = self.ax.scatter([], [], color='#00e5ff', s=100, zorder=5, label='当前工况')
+        self.critical = self.ax.axhline(y=0, color='#ff5252', linestyle=':', alpha=0.5, label='临界水深')
 
         # 样式
-        self.ax.set_title(f"断面比能曲线 (q={q:.1f} m²/s)", color='white', fontsize=10)
+        self.title = self.ax.set_title("", color='white', fontsize=10)
         self.ax.set_xlabel('比能 E (m)', color='#888', fontsize=8)
         self.ax.set_ylabel('水深 h (m)', color='#888', fontsize=8)
         self.ax.tick_params(colors='#666', labelsize=8)
@@ -69,14 +117,30 @@ class EnergyCurveChart(QWidget):
         # 去边框
         for spine in self.ax.spines.values():
             spine.set_edgecolor('#333')
+        
+        # 初始绘制
+        self.update_curve(analyze_scenario(2.0, 1.5)["curve"])
 
-        self.canvas.draw()
+    def update_curve(self, c):
+        """用 analyze_scenario 的结果更新已有图元"""
+        self.curve.set_data(c["e_vals"], c["h_vals"])
+        self.point.set_offsets([[c["current_e"], c["h"]]])
+        self.critical.set_ydata([c["hc"], c["hc"]])
+        self.title.set_text(f"断面比能曲线 (q={c['q']:.1f} m²/s)")
+        # 曲线范围随单宽流量变化，重新计算坐标范围
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.canvas.draw_idle()
 
 # --- 2. 主模拟器视图 ---
 class SimulatorView(QWidget):
+    analysis_ready = Signal(object)  # 分析结果 dict，分析失败时为 None
+
     def __init__(self):
         super().__init__()
-        self.state = SharedState()
+        # 多站点时模拟所选站点的工况 (缺省为第一个站点)
+        self.stations = {s.station_id: s for s in load_stations()}
+        self.state = SharedState(next(iter(self.stations)))
         
         # 主布局：左右分栏
         self.layout = QHBoxLayout(self)
@@ -94,6 +158,15 @@ class SimulatorView(QWidget):
         title.setStyleSheet("font-size: 16px; font-weight: bold; color: #00e5ff; border-bottom: 1px solid #333; padding-bottom: 10px;")
         left_layout.addWidget(title)
 
+        # 站点选择 (只有一个站点时隐藏)
+        self.combo_station = QComboBox()
+        for sid, station in self.stations.items():
+            self.combo_station.addItem(station.name, sid)
+        self.combo_station.setStyleSheet("background: #252525; color: white; padding: 5px;")
+        self.combo_station.currentIndexChanged.connect(self.change_station)
+        self.combo_station.setVisible(len(self.stations) > 1)
+        left_layout.addWidget(self.combo_station)
+
         # 1. 场景预设按钮
         scene_layout = QHBoxLayout()
         self.create_scene_btn("🌊 洪水工况", 4.5, 4.0, scene_layout)
@@ -164,6 +237,20 @@ class SimulatorView(QWidget):
 
         self.layout.addWidget(right_frame, stretch=6)
         
+        # 分析节拍：滑块拖动时按 SIM_ANALYSIS_FPS 限速，计算放到单独的工作线程
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._interval = 1.0 / AppConfig.SIM_ANALYSIS_FPS
+        self._last_submit = float("-inf")
+        self._busy = False
+        # 最近一次分析所用的 SharedState 版本与输入，版本未变时直接跳过
+        self._analyzed_version = None
+        self._analyzed_inputs = None
+        self._score_color = None
+        self._throttle = QTimer(self)
+        self._throttle.setSingleShot(True)
+        self._throttle.timeout.connect(self._submit_analysis)
+        self.analysis_ready.connect(self._on_analysis_ready)
+
         # 初始化一次分析
         self.run_analysis()
 
@@ -186,82 +273,119 @@ class SimulatorView(QWidget):
         layout.addWidget(btn)
 
     def apply_scene(self, depth, vel):
-        """应用场景预设"""
+        """应用场景预设 (水深、流速一次写入，其他线程不会读到只改了一半的工况)"""
+        self.state.update(depth=depth, velocity=vel)
         self.slider_depth.setValue(int(depth * 10))
         self.slider_vel.setValue(int(vel * 10))
 
+    def change_station(self):
+        """切换模拟的站点：滑块改为显示该站点当前的工况，再按新站点的状态分析"""
+        self.state = SharedState(self.combo_station.currentData())
+        snap = self.state.snapshot()
+        for slider, value in ((self.slider_depth, snap.depth), (self.slider_vel, snap.velocity)):
+            slider.blockSignals(True)  # 只同步显示，不把取整后的滑块值写回新站点
+            slider.setValue(int(value * 10))
+            slider.blockSignals(False)
+        self.lbl_depth.setText(f"模拟水深: {snap.depth} m")
+        self.lbl_vel.setText(f"模拟流速: {snap.velocity} m/s")
+        # 版本号按站点各自计数，清除上一站点的分析记录
+        self._analyzed_version = None
+        self._analyzed_inputs = None
+        self.request_analysis()
+
     def update_depth(self, value):
+        # 滑块拖动时只更新数值与标签，分析按限速合并后在后台执行
         real_val = value / 10.0
         self.state.depth = real_val
         self.lbl_depth.setText(f"模拟水深: {real_val} m")
-        self.run_analysis()
+        self.request_analysis()
 
     def update_vel(self, value):
         real_val = value / 10.0
         self.state.velocity = real_val
         self.lbl_vel.setText(f"模拟流速: {real_val} m/s")
-        self.run_analysis()
+        self.request_analysis()
+
+    def request_analysis(self):
+        """
+        请求一次分析：拖动期间的多次请求合并，始终以最新参数为准
+        - 距上次提交不足一个周期时延后到下一周期 (限速)
+        - 后台仍在计算时不提交，计算完成后若状态版本已变化再提交最新参数
+        """
+        if self._busy or self._throttle.isActive() or not self._stale(self.state.snapshot()):
+            return
+        wait = max(0.0, self._last_submit + self._interval - time.monotonic())
+        self._throttle.start(int(wait * 1000))
+
+    def _stale(self, snap):
+        """快照相对上次分析是否有变化：先比版本号，版本变了再比实际输入 (测量值变化不影响模拟)"""
+        if snap.version == self._analyzed_version:
+            return False
+        if (snap.depth, snap.velocity) == self._analyzed_inputs:
+            self._analyzed_version = snap.version
+            return False
+        return True
+
+    def _mark_analyzed(self, snap):
+        self._analyzed_version = snap.version
+        self._analyzed_inputs = (snap.depth, snap.velocity)
+
+    def _submit_analysis(self):
+        snap = self.state.snapshot()
+        if self._busy or not self._stale(snap):
+            return
+        self._mark_analyzed(snap)
+        self._last_submit = time.monotonic()
+        future = self._executor.submit(analyze_scenario, snap.depth, snap.velocity)
+        # 提交成功后才置忙 (submit 抛出异常时不会一直处于忙状态)
+        self._busy = True
+        # 回调在工作线程执行，经信号排队回到 GUI 线程
+        future.add_done_callback(self._deliver)
+
+    def _deliver(self, future):
+        """工作线程回调：无论分析成功、失败还是被取消都发出信号，GUI 线程据此清除 _busy"""
+        error = None if future.cancelled() else future.exception()
+        if error is not None:
+            print(f"Warning: 工况分析失败: {error}")
+        ok = not future.cancelled() and error is None
+        self.analysis_ready.emit(future.result() if ok else None)
 
     def run_analysis(self):
-        """核心决策逻辑：分析当前参数，给出建议"""
-        h = self.state.depth
-        v = self.state.velocity
-        
-        # 1. 更新图表
-        if h > 0:
-            self.chart.plot(h, v)
+        """同步执行一次分析 (初始化时使用)；状态未变化时跳过"""
+        snap = self.state.snapshot()
+        if not self._stale(snap):
+            return
+        self._mark_analyzed(snap)
+        self.apply_analysis(analyze_scenario(snap.depth, snap.velocity))
 
-        # 2. 水力计算
-        fr = HydraulicCalculator.calc_froude(v, h)
-        
-        # 3. 生成决策建议
-        advice = []
-        score = 100
-        
-        # --- 【修复】正确使用 datetime.datetime.now() ---
-        now_str = datetime.datetime.now().strftime('%H:%M:%S')
-        advice.append(f"⏱️ 分析时间: {now_str}")
-        advice.append(f"📊 当前状态: Fr={fr:.2f}")
-        advice.append("-" * 30)
-
-        if h <= 0.1:
-            advice.append("🔴 [严重] 渠道干涸！")
-            advice.append("   - 建议: 立即检查上游闸门开启情况。")
-            advice.append("   - 建议: 停止所有引水作业。")
-            score = 0
-        elif fr > 1.2:
-            advice.append("🔴 [警告] 出现急流 (Supercritical Flow)")
-            advice.append("   - 风险: 渠底冲刷风险极高，消力池可能失效。")
-            advice.append(f"   - 建议: 需降低流速至 {v*0.8:.1f} m/s 以下。")
-            advice.append("   - 建议: 增大下游糙率或启用跌水消能。")
-            score -= 40
-        elif fr < 1.0 and v > 3.0:
-            advice.append("🟡 [注意] 流速过大")
-            advice.append("   - 风险: 可能对衬砌造成磨损。")
-            score -= 20
-        elif fr < 0.5:
-            advice.append("🟢 [正常] 缓流状态，水流平稳。")
-            advice.append("   - 适宜进行流量观测和水质取样。")
-        else:
-            advice.append("🟡 [临界] 接近临界流状态 (Fr ≈ 1)")
-            advice.append("   - 风险: 水面极不稳定，易产生波状跳跃。")
-            advice.append("   - 建议: 调整工况避开 Fr=1.0 区域。")
-            score -= 10
-            
-        if h > 4.0:
-            advice.append("🔴 [报警] 水位接近堤顶！")
-            advice.append("   - 建议: 紧急开启泄洪闸。")
-            score -= 50
+    @Slot(object)
+    def _on_analysis_ready(self, result):
+        self._busy = False
+        try:
+            if result is not None:
+                self.apply_analysis(result)
+        finally:
+            # 计算期间参数又有变化时，按最新快照再算一次
+            self.request_analysis()
+
+    def apply_analysis(self, result):
+        """把分析结果应用到界面 (GUI 线程)"""
+        # 1. 更新图表 (水深为 0 时保留上一条曲线)
+        if result["curve"] is not None:
+            self.chart.update_curve(result["curve"])
 
         # 更新 UI
-        self.txt_advice.setText("\n".join(advice))
+        self.txt_advice.setText(result["advice"])
         
-        # 更新评分条颜色和数值
-        score = max(0, score)
+        # 更新评分条颜色和数值 (颜色档位不变时不重设样式表)
+        score = result["score"]
         self.progress_safe.setValue(score)
         if score > 80:
-            self.progress_safe.setStyleSheet("QProgressBar::chunk { background-color: #00e676; }")
+            color = "#00e676"
         elif score > 50:
-            self.progress_safe.setStyleSheet("QProgressBar::chunk { background-color: #ffab00; }")
+            color = "#ffab00"
         else:
-            self.progress_safe.setStyleSheet("QProgressBar::chunk { background-color: #ff5252; }")
\ No newline at end of file
+            color = "#ff5252"
+        if color != self._score_color:
+            self._score_color = color
+            self.progress_safe.setStyleSheet(f"QProgressBar::chunk {{ background-color: {color}; }}")
@@ -7,13 +7,34 @@ import os
 os.environ["QT_MAC_WANTS_LAYER"] = "1"
 # -------------------------------------------------------------
 
-from PySide6.QtWidgets import QApplication
-from app.ui.views.login import LoginWindow
-from app.ui.main_window import MainWindow
+import argparse
+import threading
 
 # 全局变量引用，防止窗口被垃圾回收
 main_win = None
 
+# 主界面依赖的重量级模块：登录窗口显示后在后台线程预先导入，
+# 用户输入密码期间完成加载，登录成功时主窗口即可直接创建
+PRELOAD_MODULES = [
+    "numpy",
+    "cv2",
+    "matplotlib.figure",
+    "matplotlib.backends.backend_qtagg",
+    "mpl_toolkits.mplot3d",
+    "app.core.service",
+    "app.ui.main_window",
+    "app.ui.views.dashboard",
+]
+
+def preload_heavy_modules():
+    import importlib
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            # 预加载失败不影响启动，首次使用时会再次导入并正常报错
+            print(f"Warning: preload {name} failed: {e}")
+
 def get_resource_path(relative_path):
     """
     获取资源的绝对路径。
@@ -29,12 +50,33 @@ def start_main_app(username):
     登录成功后的回调：关闭登录窗口，打开主窗口
     """
     global main_win
+    from app.ui.main_window import MainWindow  # 通常已由后台线程预加载
     main_win = MainWindow(username)
     main_win.show()
 
-if __name__ == "__main__":
+def parse_args():
+    parser = argparse.ArgumentParser(description="明渠非均匀流流量监测系统")
+    parser.add_argument("--headless", action="store_true",
+                        help="无界面运行采集服务 (采集、识别、水力计算与入库)，不导入 PySide6")
+    parser.add_argument("--source", default=None, help="采集源：摄像头序号 / 视频文件 / 图片文件夹")
+    parser.add_argument("--no-ai", action="store_true", help="无头模式下不做漂浮物识别")
+    parser.add_argument("--duration", type=float, default=None, help="无头模式运行的秒数，缺省一直运行")
+    parser.add_argument("--sensors", action="store_true", help="无头模式下接入传感器 (见 AppConfig.SENSORS)")
+    parser.add_argument("--api", action="store_true", help="无头模式下开启 HTTP / WebSocket 接口 (见 AppConfig.API_*)")
+    # Qt 自身的命令行参数 (如 -platform) 原样交给 QApplication
+    return parser.parse_known_args()
+
+def run_headless(args):
+    from app.core.service import run_headless as run_service
+    return run_service(source=args.source, ai=not args.no_ai, duration=args.duration,
+                       api=True if args.api else None, sensors=True if args.sensors else None)
+
+def run_gui(qt_argv):
+    from PySide6.QtWidgets import QApplication
+    from app.ui.views.login import LoginWindow
+
     # 初始化 Qt 应用
-    app = QApplication(sys.argv)
+    app = QApplication(qt_argv)
     
     # --- 加载 QSS 样式表 ---
     # 使用 get_resource_path 确保打包后也能找到样式文件
@@ -57,5 +99,14 @@ if __name__ == "__main__":
     # 3. 显示登录窗口
     login.show()
 
+    # 登录窗口出现后再在后台导入主界面依赖的重量级模块
+    threading.Thread(target=preload_heavy_modules, daemon=True).start()
+
     # 4. 进入事件循环
-    sys.exit(app.exec())
\ No newline at end of file
+    return app.exec()
+
+if __name__ == "__main__":
+    args, qt_args = parse_args()
+    if args.headless:
+        sys.exit(run_headless(args))
+    sys.exit(run_gui(sys.argv[:1] + qt_args))
\ No newline at end of file
@@ -0,0 +1,30 @@
+# tests/test_chart_2d.py
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PySide6.QtGui import QPixmap
+from PySide6.QtWidgets import QApplication
+
+from app.ui.components.chart_2d import Channel2DWidget
+
+
+def test_background_follows_channel_geometry():
+    app = QApplication.instance() or QApplication([])
+    w = Channel2DWidget()
+    w.resize(600, 300)
+    target = QPixmap(w.size())
+    w.render(target)
+    bg, outline = w._bg, w._outline(600, 300)
+
+    w.render(target)
+    assert w._bg is bg  # 尺寸与几何不变：复用缓存
+
+    w.set_channel(bottom_width=6.0, side_slope=0.5)
+    w.render(target)
+    assert w._bg is not bg
+    (p1, p2, p3, p4), _ = w._outline(600, 300)
+    assert p3[0] - p2[0] > outline[0][2][0] - outline[0][1][0]  # 底宽更宽
+    # 最大水深处的水面宽占满可用宽度：底宽 / 水面宽 = b / (b + 2mH)
+    assert (p3[0] - p2[0]) / (p4[0] - p1[0]) == pytest.approx(6.0 / (6.0 + 2 * 0.5 * w.max_depth), abs=0.01)
@@ -0,0 +1,70 @@
+# tests/test_detectors.py
+import numpy as np
+import pytest
+
+import app.core.ai_engine as ai_engine
+from app.core.ai_engine import AIEngine
+from app.core.detectors import HSVDetector, TiledDetector
+
+GREEN = (0, 200, 0)
+
+
+def test_hsv_filters_by_contour_area():
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    # 中间有洞的方块：像素数 (460) 不到 500，但轮廓面积 (含洞) 超过 500，按原规则计为一处
+    frame[20:48, 20:48] = GREEN
+    frame[25:43, 25:43] = 0
+    # 实心小块：轮廓面积不足 500，忽略
+    frame[150:170, 150:170] = GREEN
+    boxes = HSVDetector().detect(frame)
+    assert len(boxes) == 1
+    x, y, w, h, area, label = boxes[0]
+    assert (x, y, w, h) == (20, 20, 28, 28) and label == "Duckweed"
+    assert area == 27 * 27
+
+
+def test_tiled_matches_single_pass():
+    frame = np.zeros((300, 400, 3), dtype=np.uint8)
+    # 跨越分块边界 (x=128, y=128) 的目标只计一处
+    frame[100:160, 100:170] = GREEN
+    frame[20:50, 300:380] = GREEN
+    expected = sorted(HSVDetector().detect(frame))
+    tiled = TiledDetector(HSVDetector(), tile=128, overlap=16, workers=2, min_pixels=0)
+    assert sorted(tiled.detect(frame)) == expected
+    tiled.close()
+
+    # 单工作线程：不分块，直接单次全图检测
+    single = TiledDetector(HSVDetector(), tile=128, overlap=16, workers=1, min_pixels=0)
+    single.tiles = lambda h, w: pytest.fail("分块不应被调用")
+    assert sorted(single.detect(frame)) == expected
+    single.close()
+
+
+def test_failed_load_keeps_newer_selection(monkeypatch):
+    engine = AIEngine("hsv")
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+
+    class Broken:
+        def load(self):
+            # 加载期间界面又选择了别的后端 (未知名称按 HSV 创建)
+            engine.set_backend("hsv-tuned")
+            raise RuntimeError("no weights")
+
+    created = ai_engine.create_detector
+    monkeypatch.setattr(ai_engine, "create_detector",
+                        lambda name: Broken() if name == "yolo" else created(name))
+    events = []
+    engine.on_event = lambda level, message: events.append(level)
+    engine.set_backend("yolo")
+    engine.detect(frame, 0.0)
+    assert events == ["ERROR"]
+    assert engine.requested_backend == "hsv-tuned"
+    engine.detect(frame, 0.05)
+    assert engine.backend_name == "hsv-tuned"
+    assert events == ["ERROR", "INFO"]
+
+    # 加载失败且期间没有新的选择：撤销为正在使用的后端
+    monkeypatch.setattr(ai_engine, "create_detector", lambda name: (_ for _ in ()).throw(ImportError("torch")))
+    engine.set_backend("yolo")
+    engine.detect(frame, 0.1)
+    assert engine.requested_backend == "hsv-tuned"
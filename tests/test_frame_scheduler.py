@@ -0,0 +1,26 @@
+# tests/test_frame_scheduler.py
+import time
+
+from app.core.frame_scheduler import FrameRateController
+
+
+def _overrun(ctrl):
+    """模拟一帧处理耗时远超周期"""
+    ctrl.begin_frame()
+    ctrl.wait_time()
+    time.sleep(3.5 / ctrl.target_fps)
+    ctrl.wait_time()
+
+
+def test_live_overrun_skips_next_inference():
+    ctrl = FrameRateController(target_fps=100.0, cpu_limit=101.0)
+    _overrun(ctrl)
+    assert ctrl.begin_frame() is False
+    assert ctrl.skipped_inference == 1
+
+
+def test_paced_source_always_runs_inference():
+    ctrl = FrameRateController(target_fps=100.0, cpu_limit=101.0)
+    _overrun(ctrl)
+    assert all(ctrl.begin_frame(paced=True) for _ in range(10))
+    assert ctrl.skipped_inference == 0
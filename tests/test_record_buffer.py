@@ -0,0 +1,50 @@
+# tests/test_record_buffer.py
+import sqlite3
+
+import pytest
+
+from app.db.database import DatabaseManager, RecordBuffer
+
+
+def _record(depth):
+    return {"depth": depth, "velocity": 1.0, "flow_rate": 2.0, "fr": 0.3, "state": "缓流", "float_count": 0}
+
+
+def _depths(db):
+    conn = db.get_connection()
+    rows = [r[0] for r in conn.execute("SELECT depth FROM monitor_logs ORDER BY id")]
+    conn.close()
+    return rows
+
+
+def test_failed_flush_keeps_rows_for_retry(tmp_path, monkeypatch):
+    db = DatabaseManager(str(tmp_path / "s.db"), shard=True)
+    buf = RecordBuffer(db)
+    buf.insert_record(_record(1.0))
+    buf.insert_record(_record(2.0))
+
+    real = db.insert_records
+
+    def locked(rows):
+        raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(db, "insert_records", locked)
+    with pytest.raises(sqlite3.OperationalError):
+        buf.flush()
+    buf.insert_record(_record(3.0))  # 失败期间继续攒批
+
+    monkeypatch.setattr(db, "insert_records", real)
+    assert buf.flush() == 3
+    assert _depths(db) == [1.0, 2.0, 3.0]
+    assert buf.flush() == 0
+
+
+def test_backlog_is_capped(tmp_path, monkeypatch):
+    db = DatabaseManager(str(tmp_path / "s.db"), shard=True)
+    buf = RecordBuffer(db, max_rows=3)
+    monkeypatch.setattr(db, "insert_records", lambda rows: 1 / 0)
+    for i in range(5):
+        buf.insert_record(_record(float(i)))
+        with pytest.raises(ZeroDivisionError):
+            buf.flush()
+    assert buf.dropped == 2
+    assert [r[1] for r in buf._rows] == [2.0, 3.0, 4.0]
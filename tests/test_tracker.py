@@ -0,0 +1,40 @@
+# tests/test_tracker.py
+import numpy as np
+
+from app.core.ai_engine import AIEngine
+
+FPS = 30.0
+
+
+def _frame(x, y=200, size=60):
+    """深色水面上的一块绿色“浮萍” (HSV 后端可检出)"""
+    frame = np.full((480, 640, 3), (60, 40, 20), dtype=np.uint8)
+    frame[y:y + size, x:x + size] = (0, 200, 0)
+    return frame
+
+
+def test_stationary_object_keeps_id_and_does_not_cross_while_gated():
+    engine = AIEngine("hsv")
+    assert engine.motion_gate is not None
+    ts = 0.0
+    # 先向计数线漂移 (建立非零速度)，然后停在计数线左侧
+    for x in range(100, 220, 4):
+        engine.detect(_frame(x), ts)
+        ts += 1 / FPS
+    ids = {t.id for t in engine.tracker.active_tracks()}
+    assert len(ids) == 1
+
+    alerts = []
+    for _ in range(600):  # 20 秒静止画面：大部分帧被运动门控跳过
+        _, _, msg = engine.detect(_frame(220), ts)
+        ts += 1 / FPS
+        if msg:
+            alerts.append(msg)
+        assert {t.id for t in engine.tracker.active_tracks()} == ids
+        for t in engine.tracker.tracks:
+            assert t.centroid[0] < engine.tracker.line_x
+
+    assert engine.motion_gate.skipped > 0
+    assert engine.tracker.crossed_count == 0
+    assert engine.tracker.unique_count == 1
+    assert alerts == []
@@ -0,0 +1,119 @@
+# tools/bench_api.py
+"""
+接口服务基准
+- 实时推送：一个发布线程按固定速率发布 samples，N 个正常客户端 + M 个“卡住”不读的慢客户端，
+  统计发布耗时 (慢客户端不应拖慢发布)、正常客户端收到的条数与降级的客户端数
+- 历史查询：同一时间范围分别以 JSON 与二进制列格式读取，比较耗时与体积
+用法: python tools/bench_api.py [--db canal_data.db] [--clients 200] [--slow 20] [--rate 1000] [--seconds 5]
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.server import ApiServer
+from app.core.data_bus import SAMPLES, Sample
+from app.core.service import StationRuntime
+from app.core.stations import DEFAULT_STATION, Station
+from app.db.database import DatabaseManager
+
+
+async def ws_client(port, received, stop, slow):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write((f"GET /ws?topics={SAMPLES} HTTP/1.1\r\nHost: x\r\nUpgrade: websocket\r\n"
+                  f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+    await reader.readuntil(b"\r\n\r\n")
+    if slow:
+        # 慢客户端：连上后不再读取，让服务端的发送缓冲区积压
+        await stop.wait()
+        writer.close()
+        return
+    try:
+        while not stop.is_set():
+            b1, b2 = await reader.readexactly(2)
+            n = b2 & 0x7F
+            if n == 126:
+                n = int.from_bytes(await reader.readexactly(2), "big")
+            elif n == 127:
+                n = int.from_bytes(await reader.readexactly(8), "big")
+            msg = json.loads(await reader.readexactly(n))
+            received.append(len(msg["items"]))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    writer.close()
+
+
+def run_clients(port, n, slow, seconds, received):
+    async def main():
+        stop = asyncio.Event()
+        tasks = [asyncio.create_task(ws_client(port, received, stop, i < slow)) for i in range(n + slow)]
+        await asyncio.sleep(seconds)
+        stop.set()
+        await asyncio.wait(tasks, timeout=2)
+    asyncio.run(main())
+
+
+def http_get(port, path):
+    t0 = time.perf_counter()
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}") as r:
+        body = r.read()
+    return time.perf_counter() - t0, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="接口服务基准")
+    parser.add_argument("--db", default="canal_data.db")
+    parser.add_argument("--clients", type=int, default=200, help="正常读取的客户端数")
+    parser.add_argument("--slow", type=int, default=20, help="不读取数据的慢客户端数")
+    parser.add_argument("--rate", type=int, default=1000, help="每秒发布的 samples 条数")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    station = StationRuntime(Station(DEFAULT_STATION, "bench", camera=False), db=DatabaseManager(args.db))
+    bus = station.bus
+    server = ApiServer({DEFAULT_STATION: station}, port=0)
+    server.start()
+
+    # 1. 实时推送
+    received = []
+    clients = threading.Thread(target=run_clients,
+                               args=(server.port, args.clients, args.slow, args.seconds + 1, received))
+    clients.start()
+    time.sleep(1.0)  # 等待连接建立
+    costs = []
+    t_end = time.perf_counter() + args.seconds
+    interval = 1.0 / args.rate
+    while time.perf_counter() < t_end:
+        t0 = time.perf_counter()
+        bus.publish(SAMPLES, Sample(time.time(), 2.0, 1.5, 3.0, 0.4, 4.0, 0.5, "缓流", "均匀流"))
+        costs.append(time.perf_counter() - t0)
+        time.sleep(max(0.0, interval - (time.perf_counter() - t0)))
+    _, body = http_get(server.port, "/api/status")
+    status = json.loads(body)
+    clients.join()
+
+    costs.sort()
+    published = len(costs)
+    print(f"发布 {published} 条  p50={statistics.median(costs) * 1e6:.1f}us  "
+          f"p99={costs[int(published * 0.99)] * 1e6:.1f}us  max={costs[-1] * 1e3:.2f}ms")
+    print(f"客户端 {status['clients']} 个 (降级 {status['lagging']})  "
+          f"正常客户端平均收到 {sum(received) / max(1, args.clients):.0f} 条 / 每客户端 {published} 条")
+
+    # 2. 历史查询
+    for fmt in ("json", "binary"):
+        dt, body = http_get(server.port, f"/api/history?format={fmt}")
+        print(f"history {fmt:<7} {len(body) / 1e6:7.2f} MB  {dt * 1e3:7.1f} ms")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
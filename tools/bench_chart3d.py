@@ -0,0 +1,89 @@
+# tools/bench_chart3d.py
+"""
+3D 渠道图刷新耗时对比：完整重建 (axes.clear + 重绘) vs 更新水面图元后整图重绘 vs 贴回背景后只重绘水面 (blit)
+用法: python tools/bench_chart3d.py [--repeat 30]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PySide6.QtWidgets import QApplication
+
+from app.ui.components.chart_3d import Channel3DWidget
+
+
+def depths(n, seed=0):
+    """模拟仪表盘的水位序列 (每次变化都超过一个像素)"""
+    rng = np.random.default_rng(seed)
+    return 1.0 + np.abs(np.cumsum(rng.uniform(0.05, 0.15, n))) % 2.0
+
+
+def bench_rebuild(widget, series):
+    t0 = time.perf_counter()
+    for d in series:
+        widget.rebuild(d)
+    return (time.perf_counter() - t0) / len(series)
+
+
+def bench_update(widget, series):
+    t0 = time.perf_counter()
+    for d in series:
+        widget.update_water_level(d, force=True)
+        widget.canvas.draw()  # 整图重绘 (未缓存背景时的路径)
+    return (time.perf_counter() - t0) / len(series)
+
+
+def bench_blit(widget, series, app):
+    widget.canvas.draw()  # 截取背景
+    app.processEvents()
+    t0 = time.perf_counter()
+    for d in series:
+        widget.update_water_level(d, force=True)
+        app.processEvents()  # 执行 blit 触发的重绘
+    return (time.perf_counter() - t0) / len(series)
+
+
+def blit_matches_full_draw(widget, depth, app):
+    """blit 后的画面与同一水深整图重绘的画面逐像素比较"""
+    widget.update_water_level(depth, force=True)
+    app.processEvents()
+    blitted = np.asarray(widget.canvas.buffer_rgba()).copy()
+    widget.canvas.draw()
+    return np.array_equal(blitted, np.asarray(widget.canvas.buffer_rgba()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="3D 渠道图刷新基准")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    widget = Channel3DWidget()
+    widget.resize(600, 400)
+    widget.show()
+    app.processEvents()
+    series = depths(args.repeat)
+
+    full = bench_rebuild(widget, series)
+    print(f"full rebuild : {full * 1000:7.1f} ms/update")
+    fast = bench_update(widget, series)
+    print(f"artist update: {fast * 1000:7.1f} ms/update  speed-up={full / fast:.2f}x  (整图重绘)")
+    blit = bench_blit(widget, series, app)
+    print(f"blit update  : {blit * 1000:7.1f} ms/update  speed-up={full / blit:.2f}x")
+    print(f"blit matches full draw: {blit_matches_full_draw(widget, 1.7, app)}")
+
+    # 亚像素抖动：应全部跳过重绘
+    widget.update_water_level(2.0, force=True)
+    jitter = 2.0 + np.random.default_rng(1).uniform(-1e-3, 1e-3, args.repeat)
+    redrawn = sum(widget.update_water_level(d) for d in jitter)
+    print(f"sub-pixel jitter: {redrawn}/{args.repeat} updates redrawn")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
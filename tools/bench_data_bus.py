@@ -0,0 +1,67 @@
+# tools/bench_data_bus.py
+"""
+数据总线吞吐基准：多个发布线程 + every-sample / latest-only 订阅者，统计每秒消息数
+用法: python tools/bench_data_bus.py [--messages 200000] [--publishers 2]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.data_bus import SAMPLES, Sample, create_data_bus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据总线吞吐基准")
+    parser.add_argument("--messages", type=int, default=200000, help="每个发布线程的消息数")
+    parser.add_argument("--publishers", type=int, default=2)
+    args = parser.parse_args()
+
+    bus = create_data_bus()
+    every = bus.subscribe(SAMPLES, mode="all", maxlen=args.messages * args.publishers)
+    latest = bus.subscribe(SAMPLES, mode="latest")
+    received = [0]
+    done = threading.Event()
+
+    def consume():
+        # 模拟界面 / 写库线程：定期批量取走消息
+        while not done.is_set() or every.latest is not None:
+            batch = every.poll()
+            received[0] += len(batch)
+            latest.poll()
+            if not batch:
+                time.sleep(0.001)
+
+    def publish(n):
+        now = time.time()
+        for i in range(n):
+            bus.publish(SAMPLES, Sample(now + i * 1e-6, 2.0, 1.5, 3.0, 0.4, 4.0, 0.5, "缓流", "均匀流"))
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    threads = [threading.Thread(target=publish, args=(args.messages,)) for _ in range(args.publishers)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    done.set()
+    consumer.join()
+
+    total = args.messages * args.publishers
+    print(f"published={total}  elapsed={elapsed:.2f}s  rate={total / elapsed:,.0f} msg/s  "
+          f"received={received[0]}  dropped={every.dropped}")
+
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        window = bus.topic(SAMPLES).window(n=3600)
+    print(f"window(n=3600): {(time.perf_counter() - t0):.3f} ms/call  fields={len(window)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# tools/bench_pipeline.py
+"""
+整条识别流水线的离线基准 (无需摄像头与图形界面，适合无头 Linux / CI)
+用法:
+    python tools/bench_pipeline.py                      # 合成画面
+    python tools/bench_pipeline.py incident.mp4         # 视频文件
+    python tools/bench_pipeline.py frames/ --frames 500 # 图片文件夹
+    python tools/bench_pipeline.py --snapshot perf.jsonl # 同时记录分段耗时快照
+    python tools/bench_pipeline.py clip.mp4 --backend yolo --batch 8  # 离线重分析：检测后端批量推理
+回放源以“最快速度”模式运行，不做任何 sleep
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import AppConfig
+from app.core.ai_engine import AIEngine
+from app.core.detectors import create_detector
+from app.core.frame_source import MockSource, open_source
+from app.core.perf import PerfRecorder
+from app.core.stage_gauge import create_level_detector
+from app.core.velocimetry import create_velocimeter
+
+
+def detect_batch(engine, detector, batch):
+    """对一批 (帧, 时间戳) 批量检测，再按时间顺序逐帧更新跟踪；返回新目标出现的帧数 (即报警次数)"""
+    if engine.tracker.line_x is None:
+        engine.tracker.line_x = batch[0][0].shape[1] * AppConfig.TRACK_LINE_X
+    alerts = 0
+    for (_, ts), boxes in zip(batch, detector.detect_batch([f for f, _ in batch])):
+        alerts += bool(engine.tracker.update(boxes, ts))
+    return alerts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="识别流水线基准测试")
+    parser.add_argument("source", nargs="?", help="视频文件或图片文件夹，缺省为合成画面")
+    parser.add_argument("--frames", type=int, default=300, help="最多处理的帧数")
+    parser.add_argument("--no-ai", action="store_true", help="只做测量，不做漂浮物识别")
+    parser.add_argument("--backend", default=None, help="识别后端 hsv / yolo")
+    parser.add_argument("--snapshot", default=None, help="把分段耗时快照追加到此 JSON Lines 文件")
+    parser.add_argument("--batch", type=int, default=1,
+                        help="每次批量推理的帧数；大于 1 时直接调用检测后端 detect_batch 并更新跟踪，不绘制 HUD")
+    args = parser.parse_args()
+
+    source = open_source(args.source, max_speed=True) if args.source else MockSource(max_speed=True)
+    if not source.open():
+        print(f"无法打开采集源: {args.source}")
+        return 1
+
+    engine = AIEngine(args.backend, on_event=lambda level, message: print(f"[{level}] {message}"))
+    detector = None
+    if args.batch > 1 and not args.no_ai:
+        # 批量模式不经过 AIEngine 的逐帧切换，直接加载所选后端 (加载失败时报错退出)
+        detector = create_detector(args.backend or AppConfig.AI_BACKEND)
+        detector.load()
+    batch = []
+    velocimeter = create_velocimeter()
+    level = create_level_detector()
+    perf = PerfRecorder(enabled=args.snapshot is not None)
+
+    n = 0
+    alerts = 0
+    t0 = time.perf_counter()
+    while n < args.frames:
+        with perf.span("capture"):
+            ok, frame, ts = source.read()
+        if not ok:
+            break
+        with perf.span("measure"):
+            velocimeter.process(frame, ts)
+            if level is not None:
+                level.process(frame)
+        if detector is not None:
+            batch.append((frame, ts))
+            if len(batch) == args.batch:
+                with perf.span("ai.detect_batch"):
+                    alerts += detect_batch(engine, detector, batch)
+                batch = []
+        elif not args.no_ai:
+            with perf.span("ai.detect"):
+                _, _, msg = engine.detect(frame, ts)
+            alerts += bool(msg)
+        n += 1
+    if batch:
+        alerts += detect_batch(engine, detector, batch)
+    elapsed = time.perf_counter() - t0
+    source.release()
+    if detector is not None:
+        detector.close()
+
+    if n == 0:
+        print("没有读取到任何帧")
+        return 1
+    print(f"frames={n}  elapsed={elapsed:.2f}s  fps={n / elapsed:.1f}  "
+          f"ms/frame={1000 * elapsed / n:.2f}  alerts={alerts}  "
+          f"unique={engine.tracker.unique_count}  crossed={engine.tracker.crossed_count}")
+    if args.snapshot:
+        perf.write_snapshot(args.snapshot)
+        for name, st in perf.snapshot()["stages"].items():
+            print(f"  {name:<12} p50={st['p50']:.2f}ms  p99={st['p99']:.2f}ms  max={st['max']:.2f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+# tools/bench_stations.py
+"""
+多站点基准：一个进程内运行 N 个站点 (不接摄像头，只跑数据节拍与写库)，
+统计每站点实际节拍数 / 应有节拍数、单站 tick 与批量写库耗时、各分片行数与进程内存
+用法: python tools/bench_stations.py [--stations 100] [--interval 0.15] [--seconds 10] [--dir 临时目录]
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.perf import get_recorder
+from app.core.service import AcquisitionService
+from app.core.stations import Station
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多站点基准")
+    parser.add_argument("--stations", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=0.15, help="数据节拍周期 (秒)")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--dir", default=None, help="分片目录 (缺省为临时目录)")
+    args = parser.parse_args()
+
+    root = args.dir or tempfile.mkdtemp(prefix="stations-")
+    stations = [Station(f"s{i:03d}", f"站点 {i}", camera=False, db_path=os.path.join(root, f"s{i:03d}.db"),
+                        bottom_width=2.0 + (i % 5) * 0.5)
+                for i in range(args.stations)]
+    rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    service = AcquisitionService(interval=args.interval, api=False, sensors=False, stations=stations)
+    rss1 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    perf = get_recorder()
+    perf.set_enabled(True)
+
+    t0 = time.monotonic()
+    service.start()
+    time.sleep(args.seconds)
+    service.stop()
+    elapsed = time.monotonic() - t0
+
+    ticks = [rt.monitor.tick_counter for rt in service.stations.values()]
+    rows = [rt.db.get_connection().execute("SELECT COUNT(*) FROM monitor_logs").fetchone()[0]
+            for rt in service.stations.values()]
+    expected = elapsed / args.interval
+    stages = perf.snapshot()["stages"]
+    rss2 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(f"{len(stations)} 个站点  运行 {elapsed:.1f}s  分片目录 {root}")
+    print(f"每站节拍 min={min(ticks)} max={max(ticks)} / 应有 {expected:.0f}  "
+          f"入库行数 min={min(rows)} max={max(rows)} 合计 {sum(rows)}")
+    for name in ("monitor.tick", "db.insert_records"):
+        s = stages.get(name)
+        if s:
+            print(f"{name:<18} n={s['count']:>6}  p50={s['p50']:.3f}ms  p99={s['p99']:.3f}ms  max={s['max']:.2f}ms")
+    tick = stages.get("monitor.tick")
+    if tick:
+        print(f"一轮 {len(stations)} 站点节拍约 {tick['mean'] * len(stations):.1f}ms / 周期 {args.interval * 1e3:.0f}ms")
+    print(f"内存 (maxrss) 启动前 {rss0:.0f}MB  创建站点后 {rss1:.0f}MB  结束 {rss2:.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
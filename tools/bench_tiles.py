@@ -0,0 +1,90 @@
+# tools/bench_tiles.py
+"""
+分块并行检测与改动前单次全图检测 (原 AIEngine 的 HSV 逻辑，原样保留在 original_detect) 的吞吐对比
+用法: python tools/bench_tiles.py [--size 4k|1080p] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from app.config import AppConfig
+from app.core.detectors import HSVDetector, TiledDetector, create_detector
+
+SIZES = {"1080p": (1080, 1920), "4k": (2160, 3840)}
+
+
+def make_frame(h, w, n_blobs=120, seed=0):
+    """合成带大量绿色浮萍斑块的水面画面"""
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(30, 90, (h, w, 3), dtype=np.uint8)
+    for _ in range(n_blobs):
+        cx, cy = int(rng.integers(0, w)), int(rng.integers(0, h))
+        ax, ay = int(rng.integers(15, 80)), int(rng.integers(10, 50))
+        cv2.ellipse(frame, (cx, cy), (ax, ay), float(rng.uniform(0, 180)), 0, 360, (40, 190, 60), -1)
+    return frame
+
+
+def original_detect(frame, min_area=500):
+    """基线：分块改动前的单次全图检测 (逐字保留，不随 HSVDetector 的后续修改变化)"""
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    mask = cv2.inRange(hsv, np.array([35, 43, 46]), np.array([85, 255, 255]))
+    mask = cv2.erode(mask, None, iterations=2)
+    mask = cv2.dilate(mask, None, iterations=2)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    boxes = []
+    for c in contours:
+        area = cv2.contourArea(c)
+        if area < min_area:
+            continue
+        (x, y, w, h) = cv2.boundingRect(c)
+        boxes.append((x, y, w, h, float(area), "Duckweed"))
+    return boxes
+
+
+def bench(detect, frame, repeat):
+    detect(frame)  # 预热
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        boxes = detect(frame)
+    return (time.perf_counter() - t0) / repeat, boxes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分块并行检测基准")
+    parser.add_argument("--size", choices=SIZES, default="4k")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--tile", type=int, default=512)
+    args = parser.parse_args()
+
+    frame = make_frame(*SIZES[args.size])
+    base_t, base_boxes = bench(original_detect, frame, args.repeat)
+    expected = sorted(base_boxes)
+    print(f"{args.size}  original     : {base_t * 1000:7.1f} ms  objects={len(base_boxes)}")
+
+    def report(label, detector):
+        t, boxes = bench(detector.detect, frame, args.repeat)
+        same = "same" if sorted(boxes) == expected else "DIFFERENT"
+        print(f"{args.size}  {label:<13}: {t * 1000:7.1f} ms  objects={len(boxes)} ({same})  "
+              f"speed-up={base_t / t:.2f}x")
+        if hasattr(detector, "close"):
+            detector.close()
+
+    report("single-pass", HSVDetector())
+    cores = os.cpu_count() or 1
+    default = create_detector("hsv")
+    report(f"default x{default.workers}", default)  # 应用实际使用的检测器 (AppConfig.TILE_*)
+    # 强制分块 (min_pixels=0)；单工作线程时 TiledDetector 回退为单次检测，不单独测量
+    for n in sorted({2, 4, cores} & set(range(2, cores + 1))):
+        report(f"tiled x{n}", TiledDetector(HSVDetector(), tile=args.tile, overlap=AppConfig.TILE_OVERLAP,
+                                            workers=n, min_pixels=0))
+    if cores < 2:
+        print("单核主机：分块并行没有可用的并行度，默认检测器回退为单次全图检测")
+
+if __name__ == "__main__":
+    main()
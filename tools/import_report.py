@@ -0,0 +1,99 @@
+# tools/import_report.py
+"""
+启动耗时回归检查 (基于 python -X importtime)
+1. 统计登录窗口导入链的总耗时与最慢的模块，并确认未提前导入重量级依赖
+2. 测量从进程启动到登录窗口显示的时间
+3. 确认无头采集服务 (main.py --headless) 的导入链不包含 PySide6
+超出预算或提前导入了重量级模块时以非零状态码退出，可直接用于 CI
+用法: python tools/import_report.py [--budget-ms 1000] [--top 15]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 登录窗口出现前不应导入的模块 (主界面首次使用或后台预加载时才导入)
+HEAVY_MODULES = ("cv2", "numpy", "matplotlib", "mpl_toolkits", "torch", "ultralytics")
+
+# 无头采集服务的入口，导入链中不允许出现的模块
+HEADLESS_MODULE = "app.core.service"
+HEADLESS_FORBIDDEN = ("PySide6", "shiboken6", "matplotlib")
+
+FIRST_WINDOW = """
+import time
+t0 = time.perf_counter()
+from PySide6.QtWidgets import QApplication
+from app.ui.views.login import LoginWindow
+app = QApplication([])
+login = LoginWindow()
+login.show()
+app.processEvents()
+print("FIRST_WINDOW", time.perf_counter() - t0)
+"""
+
+
+def run_python(args):
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return subprocess.run([sys.executable] + args, cwd=ROOT, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def import_times(module):
+    """返回 [(模块名, 自身耗时 us, 累计耗时 us, 层级)]，按导入顺序"""
+    proc = run_python(["-X", "importtime", "-c", f"import {module}"])
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cum_us), depth))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动导入耗时报告")
+    parser.add_argument("--module", default="app.ui.views.login")
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="首个窗口出现的时间预算")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    rows = import_times(args.module)
+    total = sum(r[1] for r in rows) / 1000
+    print(f"import {args.module}: {total:.1f} ms ({len(rows)} modules)")
+    print(f"{'cumulative ms':>14}  {'self ms':>8}  module")
+    for name, self_us, cum_us, depth in sorted(rows, key=lambda r: -r[2])[:args.top]:
+        print(f"{cum_us / 1000:14.1f}  {self_us / 1000:8.1f}  {'  ' * (depth - 1)}{name}")
+
+    failed = False
+    heavy = sorted({r[0] for r in rows if r[0].split(".")[0] in HEAVY_MODULES})
+    if heavy:
+        print(f"FAIL: heavy modules imported before first window: {', '.join(heavy)}")
+        failed = True
+
+    rows = import_times(HEADLESS_MODULE)
+    print(f"import {HEADLESS_MODULE} (headless): {sum(r[1] for r in rows) / 1000:.1f} ms ({len(rows)} modules)")
+    gui = sorted({r[0] for r in rows if r[0].split(".")[0] in HEADLESS_FORBIDDEN})
+    if gui:
+        print(f"FAIL: headless service imports GUI modules: {', '.join(gui)}")
+        failed = True
+
+    t0 = time.perf_counter()
+    out = run_python(["-c", FIRST_WINDOW]).stdout
+    wall = (time.perf_counter() - t0) * 1000
+    in_proc = float(out.split("FIRST_WINDOW")[1]) * 1000
+    print(f"first window: {in_proc:.0f} ms after interpreter start-up "
+          f"({wall:.0f} ms including start-up and exit)")
+    if in_proc > args.budget_ms:
+        print(f"FAIL: first window exceeds budget of {args.budget_ms:.0f} ms")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
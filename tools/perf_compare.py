@@ -0,0 +1,49 @@
+# tools/perf_compare.py
+"""
+对比两份性能快照 (PERF_SNAPSHOT_PATH 或 bench_pipeline.py --snapshot 写出的 JSON Lines)
+默认取每个文件的最后一条快照，逐个分段列出 p50 / p99 及变化比例
+用法: python tools/perf_compare.py baseline.jsonl candidate.jsonl [--index -1]
+"""
+import argparse
+import json
+import sys
+
+
+def load_snapshot(path, index=-1):
+    with open(path, encoding="utf-8") as f:
+        snapshots = [json.loads(line) for line in f if line.strip()]
+    if not snapshots:
+        raise SystemExit(f"{path}: 没有快照")
+    return snapshots[index]
+
+
+def change(old, new):
+    if old <= 0:
+        return "     -"
+    return f"{(new - old) / old * 100:+6.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="性能快照对比")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--index", type=int, default=-1, help="使用文件中的第几条快照 (默认最后一条)")
+    args = parser.parse_args()
+
+    base = load_snapshot(args.baseline, args.index)["stages"]
+    cand = load_snapshot(args.candidate, args.index)["stages"]
+
+    print(f"{'stage':<20}{'n':>8}{'p50 base':>10}{'new':>10}{'':>8}{'p99 base':>10}{'new':>10}")
+    for name in sorted(set(base) | set(cand)):
+        b, c = base.get(name), cand.get(name)
+        if b is None or c is None:
+            only = "baseline" if c is None else "candidate"
+            print(f"{name:<20}  (only in {only})")
+            continue
+        print(f"{name:<20}{c['count']:>8}{b['p50']:>10.2f}{c['p50']:>10.2f} {change(b['p50'], c['p50'])}"
+              f"{b['p99']:>10.2f}{c['p99']:>10.2f} {change(b['p99'], c['p99'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())